@@ -1,8 +1,17 @@
-import requests
 import xml.etree.ElementTree as ET
 import json
+import os
+import sys
 from datetime import datetime
 
+# Permite importar o pacote compartilhado `camara/` da raiz do repositório
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from camara.cliente import CAMINHO_DEPUTADOS, ErroCamara, cliente_padrao
+from camara.esquemas import EXTRATOR_LISTA_DEPUTADOS_APP
+from camara.parsers import iterar_elementos
+
+
 def obter_deputados_json():
     """
     Obtém dados dos deputados em exercício da API da Câmara dos Deputados.
@@ -30,58 +39,30 @@ def obter_deputados_json():
         Retorna None em caso de erro na requisição ou parse dos dados.
     
     Raises:
-        requests.exceptions.RequestException: Erros relacionados à requisição HTTP
+        camara.cliente.ErroCamara: Erros relacionados à requisição HTTP
         xml.etree.ElementTree.ParseError: Erros no parsing do XML
         Exception: Outros erros inesperados
-    """
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterDeputados"
-    
-    # Headers para simular um navegador
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
     
+    Notes:
+        Se 'www.camara.leg.br' falhar ou estiver com restrições de acesso, o
+        cliente compartilhado (`camara.cliente`) tenta 'www.camara.gov.br'.
+    """
     try:
         print("Fazendo requisição para a API...")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  
-        
-        print("Processando dados XML...")
-        root = ET.fromstring(response.content)
-        
+        # O cliente compartilhado já tenta www.camara.gov.br se www.camara.leg.br falhar
         deputados = []
         
-        for deputado_elem in root.findall('deputado'):
-            deputado = {}
-            
-            campos = [
-                'ideCadastro', 'condicao', 'nome', 'nomeParlamentar', 
-                'urlFoto', 'sexo', 'uf', 'partido', 'gabinete', 
-                'anexo', 'fone', 'email'
-            ]
+        with cliente_padrao().abrir(CAMINHO_DEPUTADOS) as response:
+            response.raise_for_status()
             
-            for campo in campos:
-                elemento = deputado_elem.find(campo)
-                if elemento is not None and elemento.text is not None:
-                    if campo in ['ideCadastro']:
-                        try:
-                            deputado[campo] = int(elemento.text)
-                        except ValueError:
-                            deputado[campo] = elemento.text.strip()
-                    else:
-                        deputado[campo] = elemento.text.strip()
-                else:
-                    deputado[campo] = None
-            
-            deputados.append(deputado)
+            # XML processado em streaming, à medida que o corpo chega
+            print("Processando dados XML...")
+            for deputado_elem in iterar_elementos(response.iter_blocos(), 'deputado'):
+                deputados.append(EXTRATOR_LISTA_DEPUTADOS_APP(deputado_elem))
         
         return deputados
         
-    except requests.exceptions.RequestException as e:
+    except ErroCamara as e:
         print(f"Erro na requisição HTTP: {e}")
         return None
     except ET.ParseError as e:
@@ -128,70 +109,9 @@ def exportar_para_json(deputados, nome_arquivo=None):
         return False
 
 
-def obter_deputados_alternativo():
-    """
-    Alternativa para obtenção de dados de deputados usando endpoint secundário.
-    
-    Esta função tenta acessar uma URL alternativa da API da Câmara dos Deputados
-    quando o endpoint principal retorna erro. Utiliza método simplificado de
-    parsing XML com findtext para maior robustez.
-    
-    Returns:
-        list[dict] or None: Lista de dicionários com dados dos deputados no
-        mesmo formato da função principal, ou None em caso de falha.
-    
-    Notes:
-        Utiliza a URL 'www.camara.gov.br' como alternativa à 'www.camara.leg.br'
-        que pode estar com restrições de acesso.
-    """
-    url_alternativa = "https://www.camara.gov.br/SitCamaraWS/Deputados.asmx/ObterDeputados"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/xml, text/xml, */*',
-    }
-    
-    try:
-        print("Tentando URL alternativa...")
-        response = requests.get(url_alternativa, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        print("Processando dados XML da URL alternativa...")
-        root = ET.fromstring(response.content)
-        deputados = []
-        
-        for deputado_elem in root.findall('.//deputado'):
-            deputado = {
-                'ideCadastro': deputado_elem.findtext('ideCadastro'),
-                'condicao': deputado_elem.findtext('condicao'),
-                'nome': deputado_elem.findtext('nome'),
-                'nomeParlamentar': deputado_elem.findtext('nomeParlamentar'),
-                'urlFoto': deputado_elem.findtext('urlFoto'),
-                'sexo': deputado_elem.findtext('sexo'),
-                'uf': deputado_elem.findtext('uf'),
-                'partido': deputado_elem.findtext('partido'),
-                'gabinete': deputado_elem.findtext('gabinete'),
-                'anexo': deputado_elem.findtext('anexo'),
-                'fone': deputado_elem.findtext('fone'),
-                'email': deputado_elem.findtext('email')
-            }
-            deputados.append(deputado)
-        
-        return deputados
-        
-    except Exception as e:
-        print(f"Erro na URL alternativa: {e}")
-        return None
-
 if __name__ == "__main__":
-    # Primeira tentativa com a URL principal
     deputados = obter_deputados_json()
     
-    # Se falhar, tentar URL alternativa
-    if not deputados:
-        print("Tentando método alternativo...")
-        deputados = obter_deputados_alternativo()
-    
     if deputados:
         print(f"Dados de {len(deputados)} deputados obtidos com sucesso!")
         
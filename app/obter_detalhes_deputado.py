@@ -1,8 +1,22 @@
-import requests
 import xml.etree.ElementTree as ET
 import json
+import os
+import sys
 from datetime import datetime
-import time
+
+# Permite importar o pacote compartilhado `camara/` da raiz do repositório
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from camara.cliente import CAMINHO_DEPUTADOS, CAMINHO_DETALHES, ErroCamara, cliente_padrao
+from camara.esquemas import EXTRATOR_DEPUTADO, esquema_detalhes
+from camara.extrator import Extrator
+from camara.limitador import TAXA_PADRAO_APP, limitador_padrao
+from camara.parsers import DocumentoVazio, iterar_elementos
+from camara.tabelas import contar_itens, separar_tabelas
+
+# Mesmos esquemas da Lambda de detalhes (`camara/esquemas.py`); aqui o
+# gabinete dos detalhes é gravado como 'gabinete'
+EXTRATOR_DETALHES = Extrator(esquema_detalhes('gabinete'))
 
 def obter_lista_deputados():
     """
@@ -12,36 +26,15 @@ def obter_lista_deputados():
         list[dict] or None: Lista de dicionários contendo informações básicas
         dos deputados, incluindo o ideCadastro necessário para obter detalhes.
     """
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterDeputados"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/xml, text/xml, */*',
-    }
-    
     try:
         print("Obtendo lista de deputados...")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        root = ET.fromstring(response.content)
         deputados = []
         
-        for deputado_elem in root.findall('deputado'):
-            deputado = {
-                'ideCadastro': deputado_elem.findtext('ideCadastro'),
-                'nome': deputado_elem.findtext('nome'),
-                'nomeParlamentar': deputado_elem.findtext('nomeParlamentar'),
-                'partido': deputado_elem.findtext('partido'),
-                'uf': deputado_elem.findtext('uf'),
-                'urlFoto': deputado_elem.findtext('urlFoto'),
-                'condicao': deputado_elem.findtext('condicao'),
-                'gabinete': deputado_elem.findtext('gabinete'),
-                'anexo': deputado_elem.findtext('anexo'),
-                'fone': deputado_elem.findtext('fone'),
-                'email': deputado_elem.findtext('email')
-            }
-            deputados.append(deputado)
+        with cliente_padrao().abrir(CAMINHO_DEPUTADOS) as response:
+            response.raise_for_status()
+            
+            for deputado_elem in iterar_elementos(response.iter_blocos(), 'deputado'):
+                deputados.append(EXTRATOR_DEPUTADO(deputado_elem))
         
         print(f"Encontrados {len(deputados)} deputados")
         return deputados
@@ -58,130 +51,74 @@ def obter_detalhes_deputado(ide_cadastro):
         ide_cadastro (str): ID do deputado
         
     Returns:
-        dict or None: Dicionário com detalhes do deputado
+        dict or None: Dicionário com detalhes do deputado, incluindo as listas
+        `comissoes`, `periodos_exercicio` e `liderancas` (ver `camara.tabelas`)
     """
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterDetalhesDeputado"
-    
     # Parâmetros como na URL que funciona no navegador
     params = {
         'ideCadastro': ide_cadastro,
         'numLegislatura': ''  # Parâmetro vazio
     }
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-    }
-    
     try:
         print(f"  Obtendo detalhes para ID {ide_cadastro}...")
-        response = requests.get(url, params=params, headers=headers, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"  Erro HTTP {response.status_code} para ID {ide_cadastro}")
-            return None
+        with cliente_padrao().abrir(CAMINHO_DETALHES, params) as response:
+            if response.status != 200:
+                print(f"  Erro HTTP {response.status} para ID {ide_cadastro}")
+                return None
             
-        # Verifica se o conteúdo é XML válido
-        content = response.content.decode('utf-8').strip()
-        if not content:
-            print(f"  Resposta vazia para ID {ide_cadastro}")
-            return None
-        
-        # Parse do XML
-        root = ET.fromstring(content)
-        
-        # Encontrar o elemento deputado
-        deputado_elem = root.find('.//Deputado')
-        if deputado_elem is None:
-            print(f"  Elemento 'Deputado' não encontrado para ID {ide_cadastro}")
-            return None
-        
-        # Extrair campos básicos
-        detalhes = {}
-        campos_basicos = [
-            'email', 'nomeProfissao', 'dataNascimento', 'dataFalecimento',
-            'ufRepresentacaoAtual', 'situacaoNaLegislaturaAtual', 'ideCadastro',
-            'nomeParlamentarAtual', 'nomeCivil', 'sexo'
-        ]
-        
-        for campo in campos_basicos:
-            elemento = deputado_elem.find(campo)
-            if elemento is not None and elemento.text is not None:
-                detalhes[campo] = elemento.text.strip()
-            else:
-                detalhes[campo] = None
-        
-        # Partido atual
-        partido_elem = deputado_elem.find('partidoAtual')
-        if partido_elem is not None:
-            detalhes['partidoAtual'] = {
-                'sigla': partido_elem.findtext('sigla'),
-                'nome': partido_elem.findtext('nome')
-            }
-        else:
-            detalhes['partidoAtual'] = {}
-        
-        # Gabinete
-        gabinete_elem = deputado_elem.find('gabinete')
-        if gabinete_elem is not None:
-            detalhes['gabinete'] = {
-                'numero': gabinete_elem.findtext('numero'),
-                'anexo': gabinete_elem.findtext('anexo'),
-                'telefone': gabinete_elem.findtext('telefone')
-            }
-        else:
-            detalhes['gabinete'] = {}
-        
-        # Comissões (apenas contagem)
-        comissoes_elem = deputado_elem.find('comissoes')
-        if comissoes_elem is not None and len(comissoes_elem) > 0:
-            detalhes['num_comissoes'] = len(comissoes_elem)
-        else:
-            detalhes['num_comissoes'] = 0
-        
-        # Períodos de exercício
-        periodos_elem = deputado_elem.find('periodosExercicio')
-        if periodos_elem is not None and len(periodos_elem) > 0:
-            detalhes['num_periodos_exercicio'] = len(periodos_elem)
-        else:
-            detalhes['num_periodos_exercicio'] = 0
-        
-        # Histórico de liderança
-        historico_lider_elem = deputado_elem.find('historicoLider')
-        if historico_lider_elem is not None and len(historico_lider_elem) > 0:
-            detalhes['num_liderancas'] = len(historico_lider_elem)
-        else:
-            detalhes['num_liderancas'] = 0
+            # Parse incremental do XML, à medida que o corpo chega
+            blocos = response.iter_blocos()
+            try:
+                deputado_elem = next(iterar_elementos(blocos, 'Deputado'), None)
+            except DocumentoVazio:
+                print(f"  Resposta vazia para ID {ide_cadastro}")
+                return None
+            
+            if deputado_elem is None:
+                print(f"  Elemento 'Deputado' não encontrado para ID {ide_cadastro}")
+                return None
+            
+            detalhes = contar_itens(EXTRATOR_DETALHES(deputado_elem))
+            
+            # Restante do corpo lido sem parse, para a conexão voltar ao pool
+            for _ in blocos:
+                pass
         
         print(f"  ✓ Detalhes obtidos para ID {ide_cadastro}")
         return detalhes
         
-    except requests.exceptions.RequestException as e:
+    except ErroCamara as e:
         print(f"  Erro de requisição para ID {ide_cadastro}: {e}")
         return None
     except ET.ParseError as e:
         print(f"  Erro no parse do XML para ID {ide_cadastro}: {e}")
-        # Tenta ver o conteúdo que causou o erro
-        try:
-            print(f"  Conteúdo da resposta: {response.content[:200]}...")
-        except:
-            pass
         return None
     except Exception as e:
         print(f"  Erro inesperado para ID {ide_cadastro}: {e}")
         return None
 
-def obter_detalhes_completos_deputados(limite=None):
+def obter_detalhes_completos_deputados(limite=None, taxa_max=None, rajada=None):
     """
     Obtém lista de deputados e depois detalhes de cada um.
     
+    O ritmo das requisições é controlado pelo limitador de taxa compartilhado
+    do cliente: só há espera quando as respostas chegam mais rápido que a taxa.
+    
     Args:
         limite (int, optional): Número máximo de deputados para processar
+        taxa_max (float, optional): Requisições por segundo, 0 = sem limite (padrão:
+            CAMARA_TAXA_MAX ou `TAXA_PADRAO_APP`, o ritmo da antiga pausa de 0,5 s)
+        rajada (float, optional): Requisições liberadas de uma vez após uma pausa
     
     Returns:
         list[dict]: Lista completa com informações de todos os deputados
     """
+    if taxa_max is None and not os.environ.get('CAMARA_TAXA_MAX'):
+        taxa_max = TAXA_PADRAO_APP
+    if taxa_max is not None:
+        limitador_padrao().configurar(taxa_max, rajada)
+    
     # Primeiro obtém a lista de deputados
     deputados = obter_lista_deputados()
     
@@ -220,9 +157,6 @@ def obter_detalhes_completos_deputados(limite=None):
             falhas += 1
         
         detalhes_completos.append(deputado_completo)
-        
-        # Pequena pausa para não sobrecarregar o servidor
-        time.sleep(0.5)
     
     print("=" * 60)
     print(f"Processamento concluído!")
@@ -237,6 +171,11 @@ def exportar_dados_completos(dados, nome_arquivo=None):
     """
     Exporta todos os dados para um arquivo JSON.
     
+    As comissões, os períodos de exercício e as lideranças são retirados dos
+    registros e exportados como tabelas normalizadas, chaveadas por
+    ideCadastro, em arquivos com o sufixo da tabela
+    (ex.: deputados_completos_<data>_comissoes.json).
+    
     Args:
         dados (list): Lista com dados completos dos deputados
         nome_arquivo (str, optional): Nome do arquivo de saída
@@ -246,11 +185,20 @@ def exportar_dados_completos(dados, nome_arquivo=None):
         nome_arquivo = f"deputados_completos_{data_hora}.json"
     
     try:
+        tabelas = separar_tabelas(dados)
+        
         with open(nome_arquivo, 'w', encoding='utf-8') as f:
             json.dump(dados, f, ensure_ascii=False, indent=2)
         
+        base, extensao = os.path.splitext(nome_arquivo)
+        for nome, linhas in tabelas.items():
+            with open(f"{base}_{nome}{extensao}", 'w', encoding='utf-8') as f:
+                json.dump(linhas, f, ensure_ascii=False, indent=2)
+        
         print(f"\nDados exportados com sucesso para: {nome_arquivo}")
         print(f"Total de deputados: {len(dados)}")
+        for nome, linhas in tabelas.items():
+            print(f"Tabela {nome}: {len(linhas)} linhas ({base}_{nome}{extensao})")
         
         return True
     except Exception as e:
@@ -1,8 +1,16 @@
-import requests
 import xml.etree.ElementTree as ET
 import json
+import os
+import sys
 from datetime import datetime
 
+# Permite importar o pacote compartilhado `camara/` da raiz do repositório
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from camara.cliente import CAMINHO_PARTIDOS, ErroCamara, cliente_padrao
+from camara.esquemas import EXTRATOR_PARTIDO
+from camara.parsers import iterar_elementos
+
 def obter_partidos_json():
     """
     Obtém dados dos partidos políticos da API da Câmara dos Deputados.
@@ -23,51 +31,30 @@ def obter_partidos_json():
         Retorna None em caso de erro na requisição ou parse dos dados.
     
     Raises:
-        requests.exceptions.RequestException: Erros relacionados à requisição HTTP
+        camara.cliente.ErroCamara: Erros relacionados à requisição HTTP
         xml.etree.ElementTree.ParseError: Erros no parsing do XML
         Exception: Outros erros inesperados
-    """
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterPartidosCD"
-    
-    # Headers para simular um navegador
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
     
+    Notes:
+        Se 'www.camara.leg.br' falhar ou estiver com restrições de acesso, o
+        cliente compartilhado (`camara.cliente`) tenta 'www.camara.gov.br'.
+    """
     try:
         print("Fazendo requisição para a API de partidos...")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  
-        
-        print("Processando dados XML...")
-        root = ET.fromstring(response.content)
-        
+        # O cliente compartilhado já tenta www.camara.gov.br se www.camara.leg.br falhar
         partidos = []
         
-        for partido_elem in root.findall('partido'):
-            partido = {}
-            
-            campos = [
-                'idPartido', 'siglaPartido', 'nomePartido', 
-                'dataCriacao', 'dataExtincao'
-            ]
+        with cliente_padrao().abrir(CAMINHO_PARTIDOS) as response:
+            response.raise_for_status()
             
-            for campo in campos:
-                elemento = partido_elem.find(campo)
-                if elemento is not None and elemento.text is not None:
-                    partido[campo] = elemento.text.strip()
-                else:
-                    partido[campo] = None
-            
-            partidos.append(partido)
+            # XML processado em streaming, à medida que o corpo chega
+            print("Processando dados XML...")
+            for partido_elem in iterar_elementos(response.iter_blocos(), 'partido'):
+                partidos.append(EXTRATOR_PARTIDO(partido_elem))
         
         return partidos
         
-    except requests.exceptions.RequestException as e:
+    except ErroCamara as e:
         print(f"Erro na requisição HTTP: {e}")
         return None
     except ET.ParseError as e:
@@ -107,49 +94,6 @@ def exportar_partidos_para_json(partidos, nome_arquivo=None):
         print(f"Erro ao exportar para JSON: {e}")
         return False
 
-def obter_partidos_alternativo():
-    """
-    Alternativa para obtenção de dados de partidos usando endpoint secundário.
-    
-    Esta função tenta acessar uma URL alternativa da API da Câmara dos Deputados
-    quando o endpoint principal retorna erro.
-    
-    Returns:
-        list[dict] or None: Lista de dicionários com dados dos partidos no
-        mesmo formato da função principal, ou None em caso de falha.
-    """
-    url_alternativa = "https://www.camara.gov.br/SitCamaraWS/Deputados.asmx/ObterPartidosCD"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/xml, text/xml, */*',
-    }
-    
-    try:
-        print("Tentando URL alternativa...")
-        response = requests.get(url_alternativa, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        print("Processando dados XML da URL alternativa...")
-        root = ET.fromstring(response.content)
-        partidos = []
-        
-        for partido_elem in root.findall('.//partido'):
-            partido = {
-                'idPartido': partido_elem.findtext('idPartido'),
-                'siglaPartido': partido_elem.findtext('siglaPartido'),
-                'nomePartido': partido_elem.findtext('nomePartido'),
-                'dataCriacao': partido_elem.findtext('dataCriacao'),
-                'dataExtincao': partido_elem.findtext('dataExtincao')
-            }
-            partidos.append(partido)
-        
-        return partidos
-        
-    except Exception as e:
-        print(f"Erro na URL alternativa: {e}")
-        return None
-
 def filtrar_partidos_ativos(partidos):
     """
     Filtra apenas os partidos ativos (sem data de extinção).
@@ -177,10 +121,6 @@ def filtrar_partidos_extintos(partidos):
 if __name__ == "__main__":
     partidos = obter_partidos_json()
     
-    if not partidos:
-        print("Tentando método alternativo...")
-        partidos = obter_partidos_alternativo()
-    
     if partidos:
         print(f"Dados de {len(partidos)} partidos obtidos com sucesso!")
         
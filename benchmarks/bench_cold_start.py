@@ -0,0 +1,131 @@
+"""
+Benchmark de cold start das Lambdas: tempo de importação e da primeira invocação.
+
+Cada medição roda em um processo Python novo, como um container recém-criado:
+o processo filho importa o módulo do handler (fase de init da Lambda), mede o
+tempo e, opcionalmente, executa a primeira invocação. Também informa quais
+módulos pesados (boto3, pymongo, pyarrow, asyncio) já estavam carregados ao
+fim da importação.
+
+A invocação só é feita com `--hosts` (ex.: um servidor stub local), para não
+depender da API real da Câmara; a gravação vai para um `CAMARA_LANDING_DIR`
+temporário, novo a cada processo. `mongo_mflix` é medido apenas na importação
+(a invocação exige Secrets Manager e MongoDB).
+
+Uso:
+    python benchmarks/bench_cold_start.py [--repeticoes N] [--hosts URL] [--detalhar]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# handler -> event da primeira invocação (None: só importação)
+HANDLERS = {
+    'obter_deputados': {'forcar': True},
+    'obter_partidos': {'forcar': True},
+    'obter_detalhes_deputado': {'forcar': True},
+    'mongo_mflix': None,
+}
+
+MODULOS_PESADOS = ('boto3', 'pymongo', 'bson', 'pyarrow', 'asyncio')
+
+# Executado no processo filho: argv = módulo, event em JSON ('null' para não invocar)
+SCRIPT_FILHO = """
+import importlib, json, logging, sys, time
+logging.disable(logging.CRITICAL)
+inicio = time.perf_counter()
+modulo = importlib.import_module(sys.argv[1])
+importacao = time.perf_counter() - inicio
+carregados = [m for m in sys.argv[3:] if m in sys.modules]
+event = json.loads(sys.argv[2])
+invocacao = status = None
+if event is not None:
+    inicio = time.perf_counter()
+    resposta = modulo.lambda_handler(event, None)
+    invocacao = time.perf_counter() - inicio
+    status = resposta.get('statusCode') if isinstance(resposta, dict) else None
+print(json.dumps({'importacao_s': importacao, 'invocacao_s': invocacao,
+                  'status': status, 'carregados': carregados}))
+"""
+
+
+def ambiente(landing_dir, hosts):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([RAIZ, os.path.join(RAIZ, 'lambda')])
+    env['CAMARA_LANDING_DIR'] = landing_dir
+    if hosts:
+        env['CAMARA_HOSTS'] = hosts
+    return env
+
+
+def medir_uma_vez(handler, event, hosts):
+    with tempfile.TemporaryDirectory(prefix='cold_start_') as landing_dir:
+        saida = subprocess.run(
+            [sys.executable, '-c', SCRIPT_FILHO, handler, json.dumps(event), *MODULOS_PESADOS],
+            env=ambiente(landing_dir, hosts), capture_output=True, text=True, check=True
+        )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def maiores_importacoes(handler, quantidade=8):
+    """Módulos de nível mais alto com maior tempo acumulado em `-X importtime`"""
+    with tempfile.TemporaryDirectory(prefix='cold_start_') as landing_dir:
+        saida = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f"import {handler}"],
+            env=ambiente(landing_dir, None), capture_output=True, text=True, check=True
+        )
+    # As linhas saem em pós-ordem: a subárvore do handler são as linhas com
+    # profundidade > 0 logo antes da linha dele (profundidade 0)
+    subarvore = []
+    for linha in saida.stderr.splitlines():
+        partes = linha.split('|')
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nome = partes[2].rstrip()
+        profundidade = (len(nome) - len(nome.lstrip()) - 1) // 2
+        if profundidade == 0:
+            if nome.strip() == handler:
+                break
+            subarvore = []
+        elif profundidade == 1:
+            subarvore.append((int(partes[1]), nome.strip()))
+    return sorted(subarvore, reverse=True)[:quantidade]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5, help="processos novos por handler")
+    parser.add_argument('--hosts', help="CAMARA_HOSTS para a primeira invocação (ex.: stub local)")
+    parser.add_argument('--detalhar', action='store_true', help="mostra as maiores importações")
+    args = parser.parse_args()
+
+    print(f"Mediana de {args.repeticoes} processos novos por handler")
+    resultados = {}
+    for handler, event in HANDLERS.items():
+        if not args.hosts:
+            event = None
+        medidas = [medir_uma_vez(handler, event, args.hosts) for _ in range(args.repeticoes)]
+        importacao = statistics.median(m['importacao_s'] for m in medidas)
+        linha = f"{handler:<25} importação: {importacao * 1000:7.1f} ms"
+        if event is not None:
+            invocacao = statistics.median(m['invocacao_s'] for m in medidas)
+            linha += f"  1ª invocação: {invocacao * 1000:7.1f} ms (status {medidas[-1]['status']})"
+        carregados = medidas[-1]['carregados']
+        linha += f"  carregados: {', '.join(carregados) or '-'}"
+        print(linha)
+        resultados[handler] = medidas
+
+        if args.detalhar:
+            for micros, nome in maiores_importacoes(handler):
+                print(f"    {micros / 1000:7.1f} ms  {nome}")
+    return resultados
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Benchmark ponta a ponta das coletas contra o servidor stub da Câmara.
+
+Sobe `benchmarks/servidor_stub.py` em um processo próprio (com a latência,
+o jitter, a cauda e os erros pedidos) e executa os pipelines de `app/` e de
+`lambda/` contra ele, cada execução em um processo Python novo com
+`CAMARA_HOSTS` apontando para o stub e um `CAMARA_LANDING_DIR` temporário:
+
+* `app-detalhes`: `app/obter_detalhes_deputado.obter_detalhes_completos_deputados` (sequencial);
+* `lambda-threads` / `lambda-asyncio`: `lambda_handler` de detalhes, com
+  concorrência fixa em cada valor de `--workers`;
+* `app-listas` / `lambda-listas`: lista de deputados e de partidos.
+
+Para cada execução são medidos a duração, a vazão (itens por segundo), os
+percentis de latência por requisição (p50/p95/p99), a memória residente
+de pico do processo e as requisições que chegaram ao stub (inclusive
+retentativas e hedges). Nas Lambdas de detalhes a latência é a fase `total`
+de `stats.metricas`, que inclui a espera na fila do pool (no motor asyncio,
+todas as tarefas entram na fila de uma vez). O resultado vai para um JSON em
+`benchmarks/resultados/` (ou `--saida`); `--comparar` mostra a variação das
+medianas em relação a um JSON anterior, para provar uma mudança de
+desempenho sem acessar a API real.
+
+Uso:
+    python benchmarks/bench_e2e.py [--cenarios lambda-threads lambda-asyncio] [--workers 1 8 32]
+        [--deputados 200] [--latencia 50] [--jitter 20] [--erro 0.01] [--cauda-prob 0.01 --cauda 1000]
+        [--repeticoes 3] [--saida resultados.json] [--comparar anterior.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+DIR_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.abspath(os.path.join(DIR_BENCHMARKS, '..'))
+
+# cenário -> (diretório dos módulos, usa --workers)
+CENARIOS = {
+    'app-detalhes': ('app', False),
+    'lambda-threads': ('lambda', True),
+    'lambda-asyncio': ('lambda', True),
+    'app-listas': ('app', False),
+    'lambda-listas': ('lambda', False),
+}
+
+PERCENTIS = ('p50_s', 'p95_s', 'p99_s')
+
+
+def _cronometrar(modulo, nome, histograma):
+    """Envolve `modulo.nome` registrando a duração de cada chamada no histograma"""
+    funcao = getattr(modulo, nome)
+
+    def cronometrada(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            histograma.registrar(time.perf_counter() - inicio)
+    setattr(modulo, nome, cronometrada)
+
+
+def _corpo(resposta):
+    return json.loads(resposta['body'])
+
+
+def executar_cenario(cenario, workers):
+    """
+    Executa um cenário no processo atual (filho).
+
+    Returns:
+        dict: itens, sucessos e, quando o pipeline não mede por conta
+        própria, o resumo de latência das requisições
+    """
+    from camara.metricas import Histograma
+
+    histograma = Histograma()
+    if cenario == 'app-detalhes':
+        import obter_detalhes_deputado as app
+        _cronometrar(app, 'obter_detalhes_deputado', histograma)
+        dados = app.obter_detalhes_completos_deputados() or []
+        sucessos = sum(1 for deputado in dados if 'detalhes_error' not in deputado)
+        return {'itens': len(dados), 'sucessos': sucessos, 'latencia': histograma.resumo()}
+
+    if cenario in ('lambda-threads', 'lambda-asyncio'):
+        import obter_detalhes_deputado as detalhes
+        engine = cenario.split('-', 1)[1]
+        event = {'forcar': True, 'engine': engine, 'concorrencia': 'fixa', 'checkpoint': False}
+        event['max_conexoes' if engine == 'asyncio' else 'max_workers'] = workers
+        resposta = detalhes.lambda_handler(event, None)
+        stats = _corpo(resposta).get('stats') or {}
+        resultados = stats.get('resultados') or {}
+        return {
+            'status': resposta.get('statusCode'),
+            'itens': resultados.get('total_deputados', 0),
+            'sucessos': resultados.get('sucessos', 0),
+            'latencia': ((stats.get('metricas') or {}).get('fases') or {}).get('total')
+        }
+
+    if cenario == 'app-listas':
+        import obter_deputados
+        import obter_partidos
+        _cronometrar(obter_deputados, 'obter_deputados_json', histograma)
+        _cronometrar(obter_partidos, 'obter_partidos_json', histograma)
+        itens = len(obter_deputados.obter_deputados_json() or []) + len(obter_partidos.obter_partidos_json() or [])
+        return {'itens': itens, 'sucessos': itens, 'latencia': histograma.resumo()}
+
+    if cenario == 'lambda-listas':
+        import obter_deputados
+        import obter_partidos
+        itens = 0
+        for modulo, campo in ((obter_deputados, 'total_deputados'), (obter_partidos, 'total_partidos')):
+            inicio = time.perf_counter()
+            resposta = modulo.lambda_handler({'forcar': True}, None)
+            histograma.registrar(time.perf_counter() - inicio)
+            itens += (_corpo(resposta).get('stats') or {}).get(campo, 0)
+        return {'itens': itens, 'sucessos': itens, 'latencia': histograma.resumo()}
+
+    raise ValueError(f"Cenário desconhecido: {cenario}")
+
+
+def _rss_pico_mb():
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KB no Linux, bytes no macOS
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def processo_filho(configuracao):
+    """Ponto de entrada do processo filho: mede um cenário e grava o resultado em JSON"""
+    import logging
+    logging.disable(logging.CRITICAL)
+    diretorio = CENARIOS[configuracao['cenario']][0]
+    sys.path[:0] = [RAIZ, os.path.join(RAIZ, diretorio)]
+
+    rss_inicial = _rss_pico_mb()
+    inicio = time.perf_counter()
+    # Os scripts de app/ imprimem o progresso de cada deputado
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = executar_cenario(configuracao['cenario'], configuracao['workers'])
+    duracao = time.perf_counter() - inicio
+
+    resultado.update({
+        'duracao_s': round(duracao, 4),
+        'vazao_itens_s': round(resultado['itens'] / duracao, 2) if duracao else None,
+        'rss_inicial_mb': rss_inicial,
+        'rss_pico_mb': _rss_pico_mb()
+    })
+    with open(configuracao['saida'], 'w', encoding='utf-8') as f:
+        json.dump(resultado, f)
+
+
+class Stub:
+    """Servidor stub em um processo próprio (não disputa o GIL com a coleta medida)"""
+
+    def __init__(self, argumentos):
+        self.processo = subprocess.Popen(
+            [sys.executable, os.path.join(DIR_BENCHMARKS, 'servidor_stub.py'), *argumentos],
+            stdout=subprocess.PIPE, text=True
+        )
+        self.url = self.processo.stdout.readline().strip()
+        if not self.url.startswith('http'):
+            self.parar()
+            raise RuntimeError("Servidor stub não iniciou")
+
+    def _get(self, caminho):
+        with urllib.request.urlopen(f"{self.url}{caminho}", timeout=10) as resposta:
+            return json.loads(resposta.read())
+
+    def zerar(self):
+        self._get('/_stub/zerar')
+
+    def estatisticas(self):
+        return self._get('/_stub/estatisticas')
+
+    def parar(self):
+        self.processo.terminate()
+        self.processo.wait(timeout=10)
+
+
+def medir(stub, cenario, workers):
+    """Executa um cenário em um processo novo e devolve as medidas"""
+    with tempfile.TemporaryDirectory(prefix='bench_e2e_') as temporario:
+        saida = os.path.join(temporario, 'resultado.json')
+        env = dict(os.environ)
+        env.update({
+            'CAMARA_HOSTS': stub.url,
+            'CAMARA_LANDING_DIR': os.path.join(temporario, 'landing'),
+            'PYTHONPATH': RAIZ
+        })
+        # Contra o stub, app-detalhes também sem a taxa padrão do script (a menos que o ambiente defina uma)
+        env.setdefault('CAMARA_TAXA_MAX', '0')
+        configuracao = {'cenario': cenario, 'workers': workers, 'saida': saida}
+        stub.zerar()
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--filho', json.dumps(configuracao)],
+            env=env, check=True
+        )
+        with open(saida, encoding='utf-8') as f:
+            resultado = json.load(f)
+    servidor = stub.estatisticas()
+    resultado['requisicoes_servidor'] = servidor['requisicoes']
+    resultado['status_servidor'] = servidor['status']
+    return resultado
+
+
+def _mediana(medidas, campo):
+    valores = [medida[campo] for medida in medidas if medida.get(campo) is not None]
+    return round(statistics.median(valores), 4) if valores else None
+
+
+def resumir(medidas):
+    """Medianas das repetições (pico de memória: o maior)"""
+    latencias = [medida['latencia'] for medida in medidas if medida.get('latencia')]
+    return {
+        'duracao_s': _mediana(medidas, 'duracao_s'),
+        'vazao_itens_s': _mediana(medidas, 'vazao_itens_s'),
+        'itens': _mediana(medidas, 'itens'),
+        'sucessos': _mediana(medidas, 'sucessos'),
+        'requisicoes_servidor': _mediana(medidas, 'requisicoes_servidor'),
+        **{f'latencia_{percentil}': _mediana(latencias, percentil) for percentil in PERCENTIS},
+        'rss_pico_mb': max(medida['rss_pico_mb'] for medida in medidas)
+    }
+
+
+def _chave(resultado):
+    return f"{resultado['cenario']}/{resultado['workers']}"
+
+
+def _variacao(atual, anterior):
+    if atual is None or not anterior:
+        return '     -'
+    return f"{(atual - anterior) / anterior * 100:+6.1f}%"
+
+
+def imprimir(resultados, anteriores=None):
+    anteriores = {_chave(resultado): resultado['resumo'] for resultado in (anteriores or [])}
+    print(f"{'cenário':<16}{'workers':>8}{'duração s':>11}{'itens/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'RSS MB':>8}{'req.':>7}")
+    for resultado in resultados:
+        resumo = resultado['resumo']
+
+        def ms(campo):
+            valor = resumo[campo]
+            return f"{valor * 1000:9.1f}" if valor is not None else f"{'-':>9}"
+        print(f"{resultado['cenario']:<16}{resultado['workers']:>8}{resumo['duracao_s']:>11.3f}"
+              f"{resumo['vazao_itens_s'] or 0:>10.1f}{ms('latencia_p50_s')}{ms('latencia_p95_s')}"
+              f"{ms('latencia_p99_s')}{resumo['rss_pico_mb']:>8.1f}{resumo['requisicoes_servidor'] or 0:>7.0f}")
+        anterior = anteriores.get(_chave(resultado))
+        if anterior:
+            print(f"{'  vs. anterior':<24}{_variacao(resumo['duracao_s'], anterior['duracao_s']):>11}"
+                  f"{_variacao(resumo['vazao_itens_s'], anterior['vazao_itens_s']):>10}"
+                  f"{_variacao(resumo['latencia_p50_s'], anterior['latencia_p50_s']):>9}"
+                  f"{_variacao(resumo['latencia_p95_s'], anterior['latencia_p95_s']):>9}"
+                  f"{_variacao(resumo['latencia_p99_s'], anterior['latencia_p99_s']):>9}"
+                  f"{_variacao(resumo['rss_pico_mb'], anterior['rss_pico_mb']):>8}")
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cenarios', nargs='+', choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32],
+                        help="threads (lambda-threads) ou conexões (lambda-asyncio)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--deputados', type=int, default=200, help="tamanho da lista servida pelo stub")
+    parser.add_argument('--latencia', type=float, default=50, help="latência base do stub, em ms")
+    parser.add_argument('--jitter', type=float, default=20, help="variação da latência, em ms")
+    parser.add_argument('--cauda-prob', type=float, default=0.0)
+    parser.add_argument('--cauda', type=float, default=0, help="atraso extra da cauda, em ms")
+    parser.add_argument('--erro', type=float, default=0.0, help="probabilidade de HTTP 503")
+    parser.add_argument('--semente', type=int, default=1)
+    parser.add_argument('--saida', help="arquivo JSON (padrão: benchmarks/resultados/e2e_<data>.json)")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    parser.add_argument('--filho', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        processo_filho(json.loads(args.filho))
+        return
+
+    config_stub = {
+        'deputados': args.deputados, 'latencia': args.latencia, 'jitter': args.jitter,
+        'cauda-prob': args.cauda_prob, 'cauda': args.cauda, 'erro': args.erro, 'semente': args.semente
+    }
+    stub = Stub([f"--{nome}={valor}" for nome, valor in config_stub.items()])
+    print(f"Servidor stub em {stub.url} - {json.dumps(config_stub)}")
+    resultados = []
+    try:
+        for cenario in args.cenarios:
+            for workers in (args.workers if CENARIOS[cenario][1] else [1]):
+                medidas = [medir(stub, cenario, workers) for _ in range(args.repeticoes)]
+                resultados.append({
+                    'cenario': cenario, 'workers': workers,
+                    'resumo': resumir(medidas), 'repeticoes': medidas
+                })
+                print(f"  {cenario} ({workers}): {resultados[-1]['resumo']['duracao_s']:.3f} s", flush=True)
+    finally:
+        stub.parar()
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anteriores = json.load(f)['resultados']
+    print()
+    imprimir(resultados, anteriores)
+
+    saida = args.saida or os.path.join(
+        DIR_BENCHMARKS, 'resultados', f"e2e_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'data': datetime.now().isoformat(timespec='seconds'),
+                'commit': _commit(),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'cpus': os.cpu_count(),
+                'stub': config_stub,
+                'repeticoes': args.repeticoes
+            },
+            'resultados': resultados
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+
+if __name__ == '__main__':
+    main()
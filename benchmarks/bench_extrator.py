@@ -0,0 +1,144 @@
+"""
+Micro-benchmark: extração com `camara.extrator` x `find`/`findtext` por campo.
+
+Monta elementos sintéticos com o formato real de `ObterDeputados`,
+`ObterPartidos` e `ObterDetalhesDeputado`, confere que as duas abordagens
+produzem o mesmo registro e compara o tempo por registro: referência com uma
+busca por campo escrita à mão e o extrator montado a partir do esquema.
+
+Uso:
+    python benchmarks/bench_extrator.py [repeticoes]
+"""
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'lambda'))
+
+from camara.esquemas import EXTRATOR_LISTA_DEPUTADOS  # noqa: E402
+from obter_detalhes_deputado import EXTRATOR_DETALHES  # noqa: E402
+from obter_partidos import EXTRATOR_PARTIDO  # noqa: E402
+from camara.tabelas import TABELAS_FILHAS, contar_itens  # noqa: E402
+
+RODADAS = 7
+
+CAMPOS_DEPUTADO = [
+    'ideCadastro', 'condicao', 'nome', 'nomeParlamentar', 'urlFoto', 'sexo',
+    'uf', 'partido', 'gabinete', 'anexo', 'fone', 'email'
+]
+CAMPOS_PARTIDO = ['idPartido', 'siglaPartido', 'nomePartido', 'dataCriacao', 'dataExtincao']
+CAMPOS_BASICOS = [
+    'email', 'nomeProfissao', 'dataNascimento', 'dataFalecimento',
+    'ufRepresentacaoAtual', 'situacaoNaLegislaturaAtual', 'ideCadastro',
+    'nomeParlamentarAtual', 'nomeCivil', 'sexo'
+]
+
+
+def elemento_deputado():
+    filhos = ''.join(f"<{campo}>{campo} 123</{campo}>" for campo in CAMPOS_DEPUTADO)
+    return ET.fromstring(f"<deputado><numLegislatura>57</numLegislatura>{filhos}"
+                         f"<comissoes><titular/><suplente/></comissoes></deputado>")
+
+
+def elemento_partido():
+    filhos = ''.join(f"<{campo}> {campo} </{campo}>" for campo in CAMPOS_PARTIDO)
+    return ET.fromstring(f"<partido>{filhos}</partido>")
+
+
+def item_filho(tabela, tag):
+    campos = ''.join(f"<{campo}>{campo}</{campo}>" for campo in TABELAS_FILHAS[tabela][2])
+    return f"<{tag}>{campos}</{tag}>"
+
+
+def elemento_detalhes(comissoes=40, periodos=8, liderancas=6):
+    basicos = ''.join(f"<{campo}> {campo} </{campo}>" for campo in CAMPOS_BASICOS)
+    extras = ''.join(f"<campoExtra{i}>x</campoExtra{i}>" for i in range(10))
+    return ET.fromstring(
+        "<Deputado><numLegislatura>57</numLegislatura>"
+        f"{extras}{basicos}"
+        "<partidoAtual><idPartido>PT</idPartido><sigla>PT</sigla><nome>Partido</nome></partidoAtual>"
+        "<gabinete><numero>301</numero><anexo>4</anexo><telefone>3215-5301</telefone></gabinete>"
+        f"<comissoes>{item_filho('comissoes', 'comissao') * comissoes}</comissoes>"
+        f"<cargosComissoes>{'<cargoComissoes/>' * 5}</cargosComissoes>"
+        f"<periodosExercicio>{item_filho('periodos_exercicio', 'periodoExercicio') * periodos}</periodosExercicio>"
+        f"<filiacoesPartidarias>{'<filiacaoPartidaria/>' * 4}</filiacoesPartidarias>"
+        f"<historicoLider>{item_filho('liderancas', 'itemHistoricoLider') * liderancas}</historicoLider>"
+        "</Deputado>"
+    )
+
+
+# Implementações de referência: uma busca nos filhos por campo
+def referencia_deputado(elem):
+    return {campo: elem.findtext(campo) for campo in CAMPOS_DEPUTADO}
+
+
+def referencia_partido(elem):
+    partido = {}
+    for campo in CAMPOS_PARTIDO:
+        elemento = elem.find(campo)
+        partido[campo] = elemento.text.strip() if elemento is not None and elemento.text is not None else None
+    return partido
+
+
+def referencia_detalhes(elem):
+    detalhes = {}
+    for campo in CAMPOS_BASICOS:
+        elemento = elem.find(campo)
+        detalhes[campo] = elemento.text.strip() if elemento is not None and elemento.text else None
+    partido_elem = elem.find('partidoAtual')
+    detalhes['partidoAtual'] = {
+        'sigla': partido_elem.findtext('sigla'),
+        'nome': partido_elem.findtext('nome')
+    } if partido_elem is not None else {}
+    gabinete_elem = elem.find('gabinete')
+    detalhes['gabinete_detalhes'] = {
+        'numero': gabinete_elem.findtext('numero'),
+        'anexo': gabinete_elem.findtext('anexo'),
+        'telefone': gabinete_elem.findtext('telefone')
+    } if gabinete_elem is not None else {}
+    for nome, (tag, contagem, esquema) in TABELAS_FILHAS.items():
+        filho = elem.find(tag)
+        itens = []
+        for item_elem in (filho if filho is not None else []):
+            item = {}
+            for campo in esquema:
+                elemento = item_elem.find(campo)
+                item[campo] = elemento.text.strip() if elemento is not None and elemento.text is not None else None
+            itens.append(item)
+        detalhes[nome] = itens
+        detalhes[contagem] = len(itens)
+    return detalhes
+
+
+def medir(nome, elem, referencia, extrator, repeticoes, completar=lambda registro: registro):
+    assert referencia(elem) == completar(extrator(elem)), f"{nome}: registros diferentes"
+    funcoes = [
+        lambda: referencia(elem),
+        lambda: completar(extrator(elem)),
+    ]
+    # Rodadas intercaladas: ruído da máquina afeta as duas medições por igual
+    tempos = [float('inf')] * len(funcoes)
+    for _ in range(RODADAS):
+        for i, funcao in enumerate(funcoes):
+            tempos[i] = min(tempos[i], timeit.timeit(funcao, number=repeticoes))
+    t_ref, t_ext = tempos
+    print(f"{nome:<10} findtext: {t_ref / repeticoes * 1e6:7.2f} µs  "
+          f"extrator: {t_ext / repeticoes * 1e6:7.2f} µs  "
+          f"ganho: {t_ref / t_ext:4.2f}x")
+    return t_ref / t_ext
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"Tempo por registro (melhor de {RODADAS} rodadas)")
+    medir('deputado', elemento_deputado(), referencia_deputado, EXTRATOR_LISTA_DEPUTADOS, repeticoes)
+    medir('partido', elemento_partido(), referencia_partido, EXTRATOR_PARTIDO, repeticoes)
+    # Detalhes incluem as listas das tabelas filhas (comissões, períodos, lideranças)
+    medir('detalhes', elemento_detalhes(), referencia_detalhes, EXTRATOR_DETALHES, repeticoes // 10, contar_itens)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark do fan-out da coleta de detalhes: uma invocação x coordenador com N shards.
+
+Executa o fluxo completo em uma máquina: `lambda_handler` (uma invocação) e
+`coordenador_handler` com `"invocacao": "local"`, em que cada worker e o
+merge rodam em processos Python novos, como containers separados. A saída vai
+para um `CAMARA_LANDING_DIR` temporário e os deputados vêm de `--hosts` (ex.:
+um servidor stub local), para não depender da API real. Confere que o
+unificado do fan-out tem os mesmos deputados da execução única.
+
+Uso:
+    python benchmarks/bench_fanout.py --hosts URL [--shards 2 4 8] [--max-workers N]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'lambda'))
+
+
+def ids_unificado(stats):
+    """ideCadastro do arquivo unificado gravado (formato json)"""
+    caminho = stats['arquivos_salvos']['unificado'].split('://', 1)[1]
+    raiz = os.environ['CAMARA_LANDING_DIR']
+    with open(os.path.join(raiz, caminho), 'rb') as f:
+        return sorted(str(registro['ideCadastro']) for registro in json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hosts', required=True, help="CAMARA_HOSTS (ex.: http://127.0.0.1:8000)")
+    parser.add_argument('--shards', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--max-workers', type=int, default=8, help="teto de threads por invocação")
+    parser.add_argument('--limite', type=int, help="número máximo de deputados")
+    args = parser.parse_args()
+
+    os.environ['CAMARA_HOSTS'] = args.hosts
+    os.environ['CAMARA_LANDING_DIR'] = tempfile.mkdtemp(prefix='bench_fanout_')
+    logging.disable(logging.WARNING)
+
+    import obter_detalhes_deputado as detalhes
+
+    base = {'forcar': True, 'concorrencia': 'fixa', 'max_workers': args.max_workers}
+    if args.limite:
+        base['limite'] = args.limite
+
+    inicio = time.perf_counter()
+    resposta = detalhes.lambda_handler(dict(base), None)
+    duracao = time.perf_counter() - inicio
+    stats = json.loads(resposta['body'])['stats']
+    referencia = ids_unificado(stats)
+    print(f"{'execução única':<16} {duracao:7.2f} s  deputados: {len(referencia)}  "
+          f"status {resposta['statusCode']}")
+
+    for num_shards in args.shards:
+        # Timestamp distinto por execução: os arquivos não se sobrescrevem
+        time.sleep(1)
+        inicio = time.perf_counter()
+        resposta = detalhes.coordenador_handler(
+            {**base, 'num_shards': num_shards, 'invocacao': 'local'}, None
+        )
+        duracao = time.perf_counter() - inicio
+        stats = json.loads(resposta['body'])['stats']
+        ids = ids_unificado(stats['merge'])
+        assert ids == referencia, f"{num_shards} shards: deputados diferentes da execução única"
+        maior_shard = max(shard['duracao_s'] or 0 for shard in stats['shards'])
+        print(f"{num_shards:>2} shards{'':<7} {duracao:7.2f} s  workers: {stats['duracao_workers_s']:6.2f} s "
+              f"(maior shard {maior_shard:.2f} s)  merge: {stats['duracao_merge_s']:5.2f} s  "
+              f"status {resposta['statusCode']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Benchmark de parse XML: vazão e memória de cada implementação, sem rede.
+
+Gera documentos sintéticos no formato da API (listas de `ObterDeputados` e
+`ObterPartidosCD` de centenas a dezenas de milhares de registros, e
+`ObterDetalhesDeputado` com muitas legislaturas e tabelas filhas longas) e
+compara, no mesmo documento:
+
+* `arvore+findtext`: `ET.fromstring` do corpo inteiro, `root.findall` e um
+  `findtext` por campo (a implementação original dos scripts);
+* `arvore+extrator`: mesma árvore, registros montados por `camara.extrator`;
+* `streaming`: o caminho de produção, `camara.parsers.iterar_elementos`
+  alimentado em blocos de `TAMANHO_BLOCO` + extrator (nos detalhes, só o
+  primeiro `Deputado` é parseado e o restante do corpo é lido sem parse).
+
+Nos detalhes com várias legislaturas (`detalhes/60x40`) as árvores parseiam
+as 60 cópias de `<Deputado>` e o streaming só a primeira, que é a única que a
+coleta usa: a razão de mais de 10x mede o parse evitado, não um extrator
+mais rápido, e cresce com o número de legislaturas.
+
+Todas as implementações devem produzir os mesmos registros. A vazão é o
+melhor de `--rodadas` medições; a memória é o pico do `tracemalloc` em uma
+execução separada (o rastreamento deixa o parse mais lento).
+
+Como o tempo absoluto depende da máquina, a regressão é verificada pela
+vazão relativa a `arvore+findtext` medida na mesma execução: com
+`--linha-base`, o script termina com código 1 se alguma implementação
+ficar mais de `--tolerancia` abaixo da razão registrada no arquivo
+(`--gravar-linha-base` regrava o arquivo com a execução atual). Documentos
+cuja referência leva menos de `--min-ms` ficam fora da verificação: abaixo de
+alguns milissegundos o ruído da medição passa da tolerância.
+
+Uso:
+    python benchmarks/bench_parsers.py [--tamanhos 300 3000 30000] [--rodadas 7]
+        [--linha-base benchmarks/linha_base_parsers.json] [--tolerancia 0.2] [--min-ms 5] [--gravar-linha-base]
+        [--saida resultados.json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+DIR_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.join(DIR_BENCHMARKS, '..')
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'lambda'))
+
+from bench_extrator import elemento_detalhes, referencia_deputado, referencia_detalhes, referencia_partido  # noqa: E402
+from servidor_stub import FIXTURES, montar_lista  # noqa: E402
+from camara.esquemas import EXTRATOR_LISTA_DEPUTADOS  # noqa: E402
+from obter_detalhes_deputado import EXTRATOR_DETALHES  # noqa: E402
+from obter_partidos import EXTRATOR_PARTIDO  # noqa: E402
+from camara.cliente import TAMANHO_BLOCO  # noqa: E402
+from camara.parsers import iterar_elementos  # noqa: E402
+from camara.tabelas import contar_itens  # noqa: E402
+
+LINHA_BASE = os.path.join(DIR_BENCHMARKS, 'linha_base_parsers.json')
+REFERENCIA = 'arvore+findtext'
+
+# Detalhes: (legislaturas no documento, comissões por legislatura)
+DETALHES = [(1, 40), (1, 2000), (60, 40)]
+
+# Tempo mínimo da referência para um documento entrar na verificação
+MIN_MS_VERIFICACAO = 5.0
+
+
+def _fixture(nome):
+    with open(os.path.join(FIXTURES, nome), 'rb') as f:
+        return f.read()
+
+
+def documento_deputados(quantidade):
+    return montar_lista(_fixture('ObterDeputados.xml'), quantidade)
+
+
+def documento_partidos(quantidade):
+    xml = _fixture('ObterPartidosCD.xml')
+    gravados = xml[xml.index(b'<partido>'):xml.rindex(b'</partido>') + len(b'</partido>')].split(b'</partido>')
+    gravados = [partido.strip() + b'</partido>' for partido in gravados if partido.strip()]
+    partidos = [gravados[indice % len(gravados)] for indice in range(quantidade)]
+    return b'<?xml version="1.0" encoding="utf-8"?>\n<partidos>' + b''.join(partidos) + b'</partidos>'
+
+
+def documento_detalhes(legislaturas, comissoes):
+    deputado = ET.tostring(elemento_detalhes(comissoes=comissoes, periodos=comissoes // 5 or 1))
+    return b'<?xml version="1.0" encoding="utf-8"?>\n<Deputados>' + deputado * legislaturas + b'</Deputados>'
+
+
+def em_blocos(corpo):
+    return [corpo[inicio:inicio + TAMANHO_BLOCO] for inicio in range(0, len(corpo), TAMANHO_BLOCO)]
+
+
+def implementacoes_lista(tag, referencia, extrator):
+    def arvore_findtext(corpo, blocos):
+        return [referencia(elem) for elem in ET.fromstring(corpo).findall(tag)]
+
+    def arvore_extrator(corpo, blocos):
+        return [extrator(elem) for elem in ET.fromstring(corpo).findall(tag)]
+
+    def streaming(corpo, blocos):
+        return [extrator(elem) for elem in iterar_elementos(iter(blocos), tag)]
+
+    return {REFERENCIA: arvore_findtext, 'arvore+extrator': arvore_extrator, 'streaming': streaming}
+
+
+def implementacoes_detalhes():
+    def arvore_findtext(corpo, blocos):
+        return [referencia_detalhes(ET.fromstring(corpo).find('Deputado'))]
+
+    def arvore_extrator(corpo, blocos):
+        return [contar_itens(EXTRATOR_DETALHES(ET.fromstring(corpo).find('Deputado')))]
+
+    def streaming(corpo, blocos):
+        restantes = iter(blocos)
+        detalhes = contar_itens(EXTRATOR_DETALHES(next(iterar_elementos(restantes, 'Deputado'))))
+        # Como em produção: o restante do corpo é lido sem parse
+        for _ in restantes:
+            pass
+        return [detalhes]
+
+    return {REFERENCIA: arvore_findtext, 'arvore+extrator': arvore_extrator, 'streaming': streaming}
+
+
+def documentos(tamanhos):
+    """(nome, corpo, implementações) de cada documento sintético"""
+    lista_deputados = implementacoes_lista('deputado', referencia_deputado, EXTRATOR_LISTA_DEPUTADOS)
+    lista_partidos = implementacoes_lista('partido', referencia_partido, EXTRATOR_PARTIDO)
+    for quantidade in tamanhos:
+        yield f'deputados/{quantidade}', documento_deputados(quantidade), lista_deputados
+    for quantidade in tamanhos:
+        yield f'partidos/{quantidade}', documento_partidos(quantidade), lista_partidos
+    for legislaturas, comissoes in DETALHES:
+        yield f'detalhes/{legislaturas}x{comissoes}', documento_detalhes(legislaturas, comissoes), implementacoes_detalhes()
+
+
+def pico_memoria(funcao, corpo, blocos):
+    """Pico de memória alocada durante uma execução (sem contar o corpo já carregado)"""
+    tracemalloc.start()
+    try:
+        funcao(corpo, blocos)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def medir(corpo, implementacoes, rodadas):
+    blocos = em_blocos(corpo)
+    registros = None
+    for nome, funcao in implementacoes.items():
+        resultado = funcao(corpo, blocos)
+        assert registros is None or resultado == registros, f"{nome}: registros diferentes"
+        registros = resultado
+
+    temporizadores = {nome: timeit.Timer(lambda funcao=funcao: funcao(corpo, blocos))
+                      for nome, funcao in implementacoes.items()}
+    repeticoes = {nome: temporizador.autorange()[0] for nome, temporizador in temporizadores.items()}
+    # Rodadas intercaladas: ruído da máquina afeta todas as implementações por igual
+    tempos = dict.fromkeys(implementacoes, float('inf'))
+    for _ in range(rodadas):
+        for nome, temporizador in temporizadores.items():
+            tempos[nome] = min(tempos[nome], temporizador.timeit(repeticoes[nome]) / repeticoes[nome])
+
+    medidas = {}
+    for nome, funcao in implementacoes.items():
+        medidas[nome] = {
+            'tempo_ms': round(tempos[nome] * 1000, 3),
+            'registros_s': round(len(registros) / tempos[nome], 1),
+            'mb_s': round(len(corpo) / tempos[nome] / 1e6, 2),
+            'pico_memoria_kb': round(pico_memoria(funcao, corpo, blocos) / 1024, 1),
+            'razao': round(tempos[REFERENCIA] / tempos[nome], 3)
+        }
+    return {'bytes': len(corpo), 'registros': len(registros), 'implementacoes': medidas}
+
+
+def verificado(resultado, min_ms):
+    """O documento entra na verificação: referência lenta o bastante para medir a razão"""
+    return resultado['implementacoes'][REFERENCIA]['tempo_ms'] >= min_ms
+
+
+def verificar(resultados, linha_base, tolerancia, min_ms=MIN_MS_VERIFICACAO):
+    """Regressões em relação à linha de base: vazão relativa à referência abaixo da tolerância"""
+    regressoes = []
+    for documento, resultado in resultados.items():
+        if not verificado(resultado, min_ms):
+            continue
+        anteriores = linha_base.get(documento, {}).get('implementacoes', {})
+        for nome, medida in resultado['implementacoes'].items():
+            anterior = anteriores.get(nome)
+            if nome == REFERENCIA or not anterior:
+                continue
+            if medida['razao'] < anterior['razao'] * (1 - tolerancia):
+                regressoes.append(f"{documento} {nome}: {medida['razao']:.2f}x da referência "
+                                  f"(linha de base: {anterior['razao']:.2f}x)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[300, 3000, 30000],
+                        help="registros nas listas de deputados e de partidos")
+    parser.add_argument('--rodadas', type=int, default=7)
+    parser.add_argument('--linha-base', help=f"JSON de referência (ex.: {os.path.relpath(LINHA_BASE)})")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="queda máxima da vazão relativa (0.2 = 20%%)")
+    parser.add_argument('--min-ms', type=float, default=MIN_MS_VERIFICACAO,
+                        help="tempo mínimo da referência, em ms, para o documento ser verificado")
+    parser.add_argument('--gravar-linha-base', action='store_true',
+                        help="grava a execução atual em --linha-base (padrão: benchmarks/linha_base_parsers.json)")
+    parser.add_argument('--saida', help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    print(f"{'documento':<22}{'KB':>8}{'implementação':>18}{'ms':>10}{'registros/s':>13}"
+          f"{'MB/s':>8}{'pico KB':>10}{'x ref.':>9}")
+    resultados = {}
+    for nome, corpo, implementacoes in documentos(args.tamanhos):
+        resultado = resultados[nome] = medir(corpo, implementacoes, args.rodadas)
+        marca = '' if verificado(resultado, args.min_ms) else '*'
+        for implementacao, medida in resultado['implementacoes'].items():
+            print(f"{nome:<22}{resultado['bytes'] / 1024:>8.0f}{implementacao:>18}{medida['tempo_ms']:>10.3f}"
+                  f"{medida['registros_s']:>13.0f}{medida['mb_s']:>8.1f}{medida['pico_memoria_kb']:>10.0f}"
+                  f"{medida['razao']:>7.2f}x{marca}", flush=True)
+    print(f"\n* fora da verificação: referência abaixo de {args.min_ms:g} ms")
+    print("detalhes/NxM streaming: só o primeiro <Deputado> é parseado (o restante é lido sem parse);"
+          " com várias legislaturas a razão mede o parse evitado")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    caminho_base = args.linha_base or LINHA_BASE
+    if args.gravar_linha_base:
+        with open(caminho_base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\nLinha de base gravada em {caminho_base}")
+    elif args.linha_base:
+        with open(caminho_base, encoding='utf-8') as f:
+            regressoes = verificar(resultados, json.load(f), args.tolerancia, args.min_ms)
+        if regressoes:
+            print(f"\nRegressões de vazão acima de {args.tolerancia:.0%}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.tolerancia:.0%} em relação a {caminho_base}")
+
+
+if __name__ == '__main__':
+    main()
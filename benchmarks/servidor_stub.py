@@ -0,0 +1,310 @@
+"""
+Servidor stub do Web Service da Câmara para benchmarks offline.
+
+Serve `ObterDeputados`, `ObterDetalhesDeputado` e `ObterPartidosCD` a partir
+dos XMLs de `benchmarks/fixtures/` (ou de outro `--fixtures`), com HTTP/1.1
+keep-alive, gzip e ETag/304 como o servidor real, e injeta latência, jitter,
+cauda lenta, erros e quedas configuráveis:
+
+* a lista tem `--deputados` entradas: os `<deputado>` gravados são repetidos
+  com novos `ideCadastro` quando há menos que o pedido;
+* os detalhes de um deputado vêm de `fixtures/detalhes/<ideCadastro>.xml` se
+  o arquivo existir, senão de `ObterDetalhesDeputado.xml` com o
+  `ideCadastro` trocado pelo pedido;
+* cada resposta espera `--latencia` ms ± `--jitter` ms; com probabilidade
+  `--cauda-prob`, mais `--cauda` ms; com probabilidade `--erro`, a resposta é
+  503; durante `--queda INICIO FIM` (segundos desde a partida), toda
+  requisição espera `--latencia-queda` ms e recebe 503.
+
+`GET /_stub/estatisticas` devolve as requisições atendidas por caminho e por
+status, e as conexões abertas; `GET /_stub/zerar` zera os contadores.
+
+Com `--gravar`, nada é servido: as respostas reais da lista, dos partidos e
+dos detalhes dos `--gravar` primeiros deputados são baixadas da API e salvas
+em `--fixtures` (a única operação deste script que acessa a API real).
+
+Uso:
+    python benchmarks/servidor_stub.py [--porta 0] [--deputados 513] [--latencia 50] [--jitter 20]
+        [--cauda-prob 0.01 --cauda 2000] [--erro 0.01] [--queda 10 20] [--semente 1]
+    python benchmarks/servidor_stub.py --gravar 20
+"""
+import argparse
+import gzip
+import hashlib
+import http.server
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+CAMINHO_DEPUTADOS = "/SitCamaraWS/Deputados.asmx/ObterDeputados"
+CAMINHO_DETALHES = "/SitCamaraWS/Deputados.asmx/ObterDetalhesDeputado"
+CAMINHO_PARTIDOS = "/SitCamaraWS/Deputados.asmx/ObterPartidosCD"
+
+_DEPUTADO = re.compile(rb'<deputado>.*?</deputado>', re.S)
+_IDE_CADASTRO = re.compile(rb'<ideCadastro>[^<]*</ideCadastro>')
+
+
+def _ler(caminho):
+    with open(caminho, 'rb') as f:
+        return f.read()
+
+
+def montar_lista(xml, quantidade):
+    """Lista com `quantidade` deputados, repetindo os gravados com novos ideCadastro"""
+    gravados = _DEPUTADO.findall(xml)
+    if not gravados:
+        raise ValueError("Fixture ObterDeputados sem elementos <deputado>")
+    if quantidade is None:
+        quantidade = len(gravados)
+    deputados = []
+    for indice in range(quantidade):
+        deputado = gravados[indice % len(gravados)]
+        if indice >= len(gravados):
+            deputado = _IDE_CADASTRO.sub(b'<ideCadastro>%d</ideCadastro>' % (100000 + indice), deputado, count=1)
+        deputados.append(deputado)
+    # Cabeçalho até o primeiro <deputado> e fechamento depois do último
+    inicio = xml[:xml.index(b'<deputado>')]
+    fim = xml[xml.rindex(b'</deputado>') + len(b'</deputado>'):]
+    return inicio + b'\n  '.join(deputados) + fim
+
+
+class Configuracao:
+    """Parâmetros de latência e falhas do stub (tempos em segundos)"""
+
+    def __init__(self, latencia_ms=0, jitter_ms=0, cauda_prob=0.0, cauda_ms=0, erro=0.0,
+                 queda=None, latencia_queda_ms=0, semente=None):
+        self.latencia = latencia_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.cauda_prob = cauda_prob
+        self.cauda = cauda_ms / 1000
+        self.erro = erro
+        self.queda = queda
+        self.latencia_queda = latencia_queda_ms / 1000
+        self.aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+
+    def sortear(self, decorrido):
+        """(atraso em segundos, status forçado ou None) de uma requisição"""
+        if self.queda and self.queda[0] <= decorrido < self.queda[1]:
+            return self.latencia_queda, 503
+        with self._lock:
+            atraso = self.latencia + self.aleatorio.uniform(-self.jitter, self.jitter)
+            if self.aleatorio.random() < self.cauda_prob:
+                atraso += self.cauda
+            status = 503 if self.aleatorio.random() < self.erro else None
+        return max(0.0, atraso), status
+
+
+class Respostas:
+    """Corpos servidos pelo stub, com as versões gzip e ETags calculadas uma vez"""
+
+    def __init__(self, fixtures, deputados):
+        self.fixtures = fixtures
+        self.lista = montar_lista(_ler(os.path.join(fixtures, 'ObterDeputados.xml')), deputados)
+        self.partidos = _ler(os.path.join(fixtures, 'ObterPartidosCD.xml'))
+        self.detalhes_modelo = _ler(os.path.join(fixtures, 'ObterDetalhesDeputado.xml'))
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _corpo(self, caminho, ide_cadastro):
+        if caminho == CAMINHO_DEPUTADOS:
+            return self.lista
+        if caminho == CAMINHO_PARTIDOS:
+            return self.partidos
+        gravado = os.path.join(self.fixtures, 'detalhes', f"{ide_cadastro}.xml")
+        corpo = _ler(gravado) if os.path.exists(gravado) else self.detalhes_modelo
+        return _IDE_CADASTRO.sub(b'<ideCadastro>%s</ideCadastro>' % ide_cadastro.encode(), corpo)
+
+    def obter(self, caminho, ide_cadastro=''):
+        """(corpo, corpo gzip, etag) da resposta"""
+        chave = (caminho, ide_cadastro)
+        with self._lock:
+            resposta = self._cache.get(chave)
+        if resposta is None:
+            corpo = self._corpo(caminho, ide_cadastro)
+            resposta = (corpo, gzip.compress(corpo, 6), '"%s"' % hashlib.sha1(corpo).hexdigest())
+            with self._lock:
+                self._cache[chave] = resposta
+        return resposta
+
+
+class Estatisticas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.caminhos = {}
+            self.status = {}
+            self.conexoes = 0
+
+    def registrar(self, caminho, status):
+        with self._lock:
+            self.caminhos[caminho] = self.caminhos.get(caminho, 0) + 1
+            self.status[str(status)] = self.status.get(str(status), 0) + 1
+
+    def nova_conexao(self):
+        with self._lock:
+            self.conexoes += 1
+
+    def resumo(self):
+        with self._lock:
+            return {
+                'requisicoes': sum(self.caminhos.values()),
+                'caminhos': dict(self.caminhos),
+                'status': dict(self.status),
+                'conexoes': self.conexoes
+            }
+
+
+class ManipuladorStub(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em writes separados: com Nagle, o corpo espera o
+    # ACK atrasado do cliente (~40 ms) e a latência medida deixa de ser a do stub
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.estatisticas.nova_conexao()
+
+    def do_GET(self):
+        partes = urllib.parse.urlsplit(self.path)
+        if partes.path == '/_stub/estatisticas':
+            return self._enviar(200, json.dumps(self.server.estatisticas.resumo()).encode(), 'application/json')
+        if partes.path == '/_stub/zerar':
+            self.server.estatisticas.zerar()
+            return self._enviar(200, b'{}', 'application/json')
+        if partes.path not in (CAMINHO_DEPUTADOS, CAMINHO_DETALHES, CAMINHO_PARTIDOS):
+            return self._registrar_e_enviar(partes.path, 404, b'Not Found', 'text/plain')
+
+        atraso, status = self.server.configuracao.sortear(time.monotonic() - self.server.inicio)
+        if atraso:
+            time.sleep(atraso)
+        if status is not None:
+            return self._registrar_e_enviar(partes.path, status, b'Service Unavailable', 'text/plain')
+
+        params = urllib.parse.parse_qs(partes.query)
+        corpo, corpo_gzip, etag = self.server.respostas.obter(partes.path, params.get('ideCadastro', [''])[0])
+        if self.headers.get('If-None-Match') == etag:
+            return self._registrar_e_enviar(partes.path, 304, b'', None, {'ETag': etag})
+        headers = {'ETag': etag}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            corpo = corpo_gzip
+            headers['Content-Encoding'] = 'gzip'
+        self._registrar_e_enviar(partes.path, 200, corpo, 'text/xml; charset=utf-8', headers)
+
+    def _registrar_e_enviar(self, caminho, status, corpo, tipo, headers=None):
+        self.server.estatisticas.registrar(caminho, status)
+        self._enviar(status, corpo, tipo, headers)
+
+    def _enviar(self, status, corpo, tipo, headers=None):
+        try:
+            self.send_response(status)
+            if tipo:
+                self.send_header('Content-Type', tipo)
+            for nome, valor in (headers or {}).items():
+                self.send_header(nome, valor)
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+        except OSError:
+            # Cliente desistiu (ex.: hedge cancelado): nada a responder
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorStub(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexões pendentes grande: o padrão (5) faz conexões simultâneas
+    # esperarem a retransmissão do SYN e distorce o tempo de conexão
+    request_queue_size = 1024
+
+    def __init__(self, endereco, respostas, configuracao):
+        super().__init__(endereco, ManipuladorStub)
+        self.respostas = respostas
+        self.configuracao = configuracao
+        self.estatisticas = Estatisticas()
+        self.inicio = time.monotonic()
+
+    @property
+    def url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+
+def gravar_fixtures(destino, quantidade):
+    """Baixa respostas reais da API para `destino` (lista, partidos e detalhes)"""
+    sys.path.insert(0, RAIZ)
+    from camara.cliente import ClienteCamara
+
+    cliente = ClienteCamara()
+    os.makedirs(os.path.join(destino, 'detalhes'), exist_ok=True)
+    for caminho, arquivo in ((CAMINHO_DEPUTADOS, 'ObterDeputados.xml'), (CAMINHO_PARTIDOS, 'ObterPartidosCD.xml')):
+        resposta = cliente.get(caminho)
+        resposta.raise_for_status()
+        with open(os.path.join(destino, arquivo), 'wb') as f:
+            f.write(resposta.corpo)
+        print(f"Gravado {arquivo} ({len(resposta.corpo)} bytes)")
+        if caminho == CAMINHO_DEPUTADOS:
+            ids = [m.decode() for m in re.findall(rb'<ideCadastro>([^<]+)</ideCadastro>', resposta.corpo)]
+    for ide_cadastro in ids[:quantidade]:
+        resposta = cliente.get(CAMINHO_DETALHES, {'ideCadastro': ide_cadastro, 'numLegislatura': ''})
+        if resposta.status != 200:
+            print(f"Detalhes de {ide_cadastro}: HTTP {resposta.status} - ignorado")
+            continue
+        with open(os.path.join(destino, 'detalhes', f"{ide_cadastro}.xml"), 'wb') as f:
+            f.write(resposta.corpo)
+    print(f"Gravados detalhes de até {quantidade} deputados em {os.path.join(destino, 'detalhes')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=0, help="0 = porta livre (informada na saída)")
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--deputados', type=int, default=513, help="tamanho da lista servida")
+    parser.add_argument('--latencia', type=float, default=0, help="latência base, em ms")
+    parser.add_argument('--jitter', type=float, default=0, help="variação uniforme da latência, em ms")
+    parser.add_argument('--cauda-prob', type=float, default=0.0, help="probabilidade de uma resposta lenta")
+    parser.add_argument('--cauda', type=float, default=0, help="atraso extra das respostas lentas, em ms")
+    parser.add_argument('--erro', type=float, default=0.0, help="probabilidade de HTTP 503")
+    parser.add_argument('--queda', type=float, nargs=2, metavar=('INICIO', 'FIM'),
+                        help="janela, em segundos desde a partida, em que tudo responde 503")
+    parser.add_argument('--latencia-queda', type=float, default=1000, help="atraso dos 503 da queda, em ms")
+    parser.add_argument('--semente', type=int, help="semente do sorteio de latências e erros")
+    parser.add_argument('--gravar', type=int, metavar='N',
+                        help="grava em --fixtures as respostas reais (lista, partidos e N detalhes) e sai")
+    args = parser.parse_args()
+
+    if args.gravar is not None:
+        gravar_fixtures(args.fixtures, args.gravar)
+        return
+
+    configuracao = Configuracao(
+        args.latencia, args.jitter, args.cauda_prob, args.cauda, args.erro,
+        args.queda, args.latencia_queda, args.semente
+    )
+    servidor = ServidorStub((args.host, args.porta), Respostas(args.fixtures, args.deputados), configuracao)
+    # Primeira linha da saída: URL para CAMARA_HOSTS (lida por bench_e2e.py)
+    print(servidor.url, flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Utilitários compartilhados pelos scripts de `app/` e pelas funções Lambda
+que coletam dados do Web Service da Câmara dos Deputados.
+
+Nas Lambdas, o pacote é distribuído pela layer (ver `lambda/lambda_layer/readme.md`).
+"""
@@ -0,0 +1,250 @@
+"""
+Cliente HTTP/1.1 assíncrono com pool de conexões persistentes (keep-alive).
+
+Usado pelo motor `asyncio` de coleta de detalhes: centenas de requisições
+ficam em voo como tarefas leves e compartilham um pool pequeno de conexões
+TCP/TLS já abertas, evitando DNS, handshake TCP e TLS a cada deputado.
+"""
+import asyncio
+import hashlib
+import logging
+import ssl
+import time
+import urllib.parse
+
+from camara.cliente import HEADERS_PADRAO, STATUS_FALLBACK, decodificar_corpo
+
+logger = logging.getLogger(__name__)
+
+
+class ConexaoEncerrada(ConnectionError):
+    """O servidor fechou a conexão antes de enviar a resposta completa"""
+
+
+class RespostaAsync:
+    """Resposta HTTP já lida por completo e descomprimida"""
+
+    def __init__(self, status, headers, corpo):
+        self.status = status
+        self.headers = headers
+        self.corpo = corpo
+        # Segundos por fase ('fila', 'conexao', 'transferencia'), preenchidos pelo pool
+        self.tempos = {}
+        self._sha256 = None
+
+    @property
+    def sha256(self):
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.corpo).hexdigest()
+        return self._sha256
+
+    def iter_blocos(self):
+        # Mesma interface de camara.cliente.RespostaStream para os parsers
+        return iter((self.corpo,))
+
+
+class _Conexao:
+    """Uma conexão TCP/TLS reutilizável para um único host"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reutilizavel = True
+        self.usos = 0
+
+    async def requisitar(self, host, alvo, headers):
+        linhas = [f"GET {alvo} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+        linhas.extend(f"{nome}: {valor}" for nome, valor in headers.items())
+        self.writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode('latin-1'))
+        await self.writer.drain()
+        self.usos += 1
+
+        linha_status = await self.reader.readline()
+        if not linha_status:
+            raise ConexaoEncerrada("Conexão encerrada pelo servidor")
+        partes = linha_status.decode('latin-1').split(None, 2)
+        if len(partes) < 2:
+            raise ConexaoEncerrada(f"Linha de status inválida: {linha_status!r}")
+        versao, status = partes[0], int(partes[1])
+
+        headers_resposta = {}
+        while True:
+            linha = await self.reader.readline()
+            if linha in (b'\r\n', b'\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            headers_resposta[nome.strip().lower()] = valor.strip()
+
+        if headers_resposta.get('connection', '').lower() == 'close' or versao == 'HTTP/1.0':
+            self.reutilizavel = False
+
+        if status in (204, 304) or 100 <= status < 200:
+            corpo = b''
+        elif headers_resposta.get('transfer-encoding', '').lower() == 'chunked':
+            corpo = await self._ler_chunked()
+        elif 'content-length' in headers_resposta:
+            corpo = await self.reader.readexactly(int(headers_resposta['content-length']))
+        else:
+            # Sem tamanho declarado: o corpo termina no fechamento da conexão
+            corpo = await self.reader.read()
+            self.reutilizavel = False
+
+        corpo = decodificar_corpo(corpo, headers_resposta.get('content-encoding'))
+        return RespostaAsync(status, headers_resposta, corpo)
+
+    async def _ler_chunked(self):
+        partes = []
+        while True:
+            linha_tamanho = await self.reader.readline()
+            tamanho = int(linha_tamanho.split(b';', 1)[0].strip() or b'0', 16)
+            if tamanho == 0:
+                # Trailers opcionais até a linha em branco
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(partes)
+            partes.append(await self.reader.readexactly(tamanho))
+            await self.reader.readline()
+
+    def fechar(self):
+        self.reutilizavel = False
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class PoolConexoesAsync:
+    """
+    Pool de conexões keep-alive para um único host.
+
+    Args:
+        url_base (str): Esquema e host, ex.: 'https://www.camara.leg.br'
+        max_conexoes (int): Número máximo de conexões simultâneas ao host
+        timeout (float): Tempo máximo, em segundos, de cada requisição
+        headers (dict, optional): Headers enviados em todas as requisições
+        limitador (LimitadorTaxa, optional): Limite de taxa aplicado a cada requisição
+    """
+
+    def __init__(self, url_base, max_conexoes=8, timeout=30, headers=None, limitador=None):
+        partes = urllib.parse.urlsplit(url_base)
+        self.esquema = partes.scheme
+        self.host = partes.hostname
+        self.porta = partes.port or (443 if self.esquema == 'https' else 80)
+        self.max_conexoes = max_conexoes
+        self.timeout = timeout
+        self.headers = dict(HEADERS_PADRAO if headers is None else headers)
+        self.limitador = limitador
+
+        self._semaforo = asyncio.Semaphore(max_conexoes)
+        self._ociosas = []
+        self._ssl = ssl.create_default_context() if self.esquema == 'https' else None
+
+        self.conexoes_abertas = 0
+        self.requisicoes = 0
+
+    async def _abrir(self):
+        reader, writer = await asyncio.open_connection(
+            self.host, self.porta, ssl=self._ssl,
+            server_hostname=self.host if self._ssl else None
+        )
+        self.conexoes_abertas += 1
+        return _Conexao(reader, writer)
+
+    async def get(self, caminho, params=None, headers=None):
+        """
+        Executa um GET reaproveitando uma conexão ociosa do pool.
+
+        Uma conexão reaproveitada pode ter sido fechada pelo servidor enquanto
+        estava ociosa; nesse caso as demais ociosas são descartadas e a
+        requisição é repetida uma vez em uma conexão nova.
+
+        Returns:
+            RespostaAsync: Status, headers (em minúsculas), corpo da resposta
+            e `tempos` por fase
+        """
+        alvo = caminho
+        if params:
+            alvo = f"{caminho}?{urllib.parse.urlencode(params)}"
+        host = self.host if self.porta in (80, 443) else f"{self.host}:{self.porta}"
+        headers_req = {**self.headers, **(headers or {})}
+
+        inicio = time.perf_counter()
+        if self.limitador is not None:
+            await self.limitador.aguardar_async()
+        async with self._semaforo:
+            self.requisicoes += 1
+            tempos = {'fila': time.perf_counter() - inicio}
+            for tentativa in range(2):
+                # Na repetição, nunca outra ociosa: ela pode estar fechada também
+                reutilizada = tentativa == 0 and bool(self._ociosas)
+                conexao = self._ociosas.pop() if reutilizada else None
+                try:
+                    if conexao is None:
+                        inicio = time.perf_counter()
+                        conexao = await asyncio.wait_for(self._abrir(), self.timeout)
+                        tempos['conexao'] = tempos.get('conexao', 0.0) + time.perf_counter() - inicio
+                    inicio = time.perf_counter()
+                    resposta = await asyncio.wait_for(
+                        conexao.requisitar(host, alvo, headers_req), self.timeout
+                    )
+                    tempos['transferencia'] = tempos.get('transferencia', 0.0) + time.perf_counter() - inicio
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    if conexao is not None:
+                        conexao.fechar()
+                    if reutilizada:
+                        logger.debug(f"Conexão ociosa descartada ({e}); repetindo em conexão nova")
+                        await self.fechar()
+                        continue
+                    raise
+                except BaseException:
+                    if conexao is not None:
+                        conexao.fechar()
+                    raise
+
+                if conexao.reutilizavel:
+                    self._ociosas.append(conexao)
+                else:
+                    conexao.fechar()
+                resposta.tempos = tempos
+                return resposta
+
+    async def fechar(self):
+        while self._ociosas:
+            self._ociosas.pop().fechar()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+
+
+async def get_com_fallback(pools, caminho, params=None, headers=None):
+    """
+    Executa o GET em cada pool (um por host), em ordem, como `ClienteCamara.abrir`.
+
+    Passa para o próximo host em falhas de rede, timeouts, respostas 5xx e
+    bloqueios (403/429). Se o último host responder com erro, essa resposta é
+    devolvida; os `tempos` são somados entre os hosts tentados.
+
+    Raises:
+        OSError, asyncio.TimeoutError: O último host falhou sem resposta
+    """
+    tempos = {}
+    resposta = None
+    for indice, pool in enumerate(pools):
+        try:
+            resposta = await pool.get(caminho, params, headers=headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            if indice == len(pools) - 1:
+                raise
+            logger.info(f"Tentando host alternativo {pools[indice + 1].host} ({e})")
+            continue
+        for fase, segundos in resposta.tempos.items():
+            tempos[fase] = tempos.get(fase, 0.0) + segundos
+        resposta.tempos = tempos
+        if resposta.status < 500 and resposta.status not in STATUS_FALLBACK:
+            return resposta
+        if indice < len(pools) - 1:
+            logger.info(f"Tentando host alternativo {pools[indice + 1].host} (HTTP {resposta.status})")
+    return resposta
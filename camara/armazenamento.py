@@ -0,0 +1,265 @@
+"""
+Acesso ao armazenamento da landing zone (S3) com alternativa local.
+
+Com a variável de ambiente `CAMARA_LANDING_DIR` definida, os objetos são lidos
+e gravados em `<CAMARA_LANDING_DIR>/<bucket>/<key>` em vez do S3, o que
+permite executar as Lambdas localmente.
+
+`abrir_escrita` devolve um objeto de arquivo (somente escrita) para gravar
+objetos grandes em streaming: no S3, os bytes viram partes de um multipart
+upload assim que somam `TAMANHO_PARTE`, então a memória usada não depende do
+tamanho do objeto.
+
+O cliente boto3 (e o próprio `import boto3`, que custa centenas de ms no
+cold start) só é criado no primeiro acesso ao S3 e fica em cache no container
+(`cliente_s3`), compartilhado por todas as gravações e invocações warm.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Tamanho de cada parte do multipart upload (o S3 exige ao menos 5 MiB, exceto na última)
+TAMANHO_PARTE = 8 * 1024 * 1024
+
+_cliente_s3 = None
+_lock_cliente = threading.Lock()
+
+
+def cliente_s3():
+    """Cliente S3 do container, criado no primeiro uso (clientes boto3 são thread-safe)"""
+    global _cliente_s3
+    if _cliente_s3 is None:
+        with _lock_cliente:
+            if _cliente_s3 is None:
+                import boto3
+                _cliente_s3 = boto3.client('s3')
+    return _cliente_s3
+
+
+class _Escrita:
+    """Base dos objetos de escrita em streaming (interface de arquivo binário)"""
+
+    closed = False
+    bytes_escritos = 0
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.close()
+        else:
+            self.abortar()
+
+
+class EscritaS3(_Escrita):
+    """
+    Objeto S3 gravado por partes (multipart upload) à medida que os bytes chegam.
+
+    Objetos menores que uma parte são gravados com um único `put_object` no
+    `close()`. Em caso de erro, `abortar()` descarta as partes já enviadas.
+    """
+
+    def __init__(self, s3_client, bucket, key, content_type, content_encoding=None,
+                 tamanho_parte=TAMANHO_PARTE):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.extras = {'ContentType': content_type}
+        if content_encoding:
+            self.extras['ContentEncoding'] = content_encoding
+        self.tamanho_parte = tamanho_parte
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._partes = []
+
+    def write(self, dados):
+        self._buffer += dados
+        self.bytes_escritos += len(dados)
+        if len(self._buffer) >= self.tamanho_parte:
+            self._enviar_parte()
+        return len(dados)
+
+    def _enviar_parte(self):
+        if self._upload_id is None:
+            self._upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self.extras
+            )['UploadId']
+        numero = len(self._partes) + 1
+        resposta = self.s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=numero, Body=bytes(self._buffer)
+        )
+        self._partes.append({'PartNumber': numero, 'ETag': resposta['ETag']})
+        self._buffer.clear()
+
+    def close(self):
+        if self.closed:
+            return
+        if self._upload_id is None:
+            self.s3_client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), **self.extras
+            )
+        else:
+            if self._buffer:
+                self._enviar_parte()
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._partes}
+            )
+        self._buffer = bytearray()
+        self.closed = True
+
+    def abortar(self):
+        if self.closed:
+            return
+        if self._upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+                )
+            except Exception as e:
+                logger.warning(f"Falha ao abortar multipart upload de {self.key}: {e}")
+        self._buffer = bytearray()
+        self.closed = True
+
+
+class EscritaLocal(_Escrita):
+    """Arquivo local gravado em um temporário e renomeado no `close()`"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._temporario = f"{caminho}.parcial"
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._arquivo = open(self._temporario, 'wb')
+
+    def write(self, dados):
+        self._arquivo.write(dados)
+        self.bytes_escritos += len(dados)
+        return len(dados)
+
+    def close(self):
+        if self.closed:
+            return
+        self._arquivo.close()
+        os.replace(self._temporario, self.caminho)
+        self.closed = True
+
+    def abortar(self):
+        if self.closed:
+            return
+        self._arquivo.close()
+        os.remove(self._temporario)
+        self.closed = True
+
+
+class ArmazenamentoS3:
+    """Objetos em um bucket S3"""
+
+    def __init__(self, bucket, s3_client=None):
+        self.bucket = bucket
+        self._s3_client = s3_client
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            self._s3_client = cliente_s3()
+        return self._s3_client
+
+    def uri(self, key):
+        return f"s3://{self.bucket}/{key}"
+
+    def ler(self, key):
+        """Retorna o conteúdo do objeto, ou None se ele não existir"""
+        try:
+            resposta = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+        return resposta['Body'].read()
+
+    def gravar(self, key, corpo, content_type='application/json; charset=utf-8', content_encoding=None):
+        extras = {'ContentEncoding': content_encoding} if content_encoding else {}
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=corpo,
+            ContentType=content_type,
+            **extras
+        )
+
+    def abrir_escrita(self, key, content_type='application/json; charset=utf-8', content_encoding=None):
+        """Objeto de escrita em streaming (multipart upload) para o key"""
+        return EscritaS3(self.s3_client, self.bucket, key, content_type, content_encoding)
+
+    def listar(self, prefixo):
+        """Lista as keys com o prefixo, em ordem lexicográfica"""
+        keys = []
+        paginador = self.s3_client.get_paginator('list_objects_v2')
+        for pagina in paginador.paginate(Bucket=self.bucket, Prefix=prefixo):
+            keys.extend(obj['Key'] for obj in pagina.get('Contents', []))
+        return sorted(keys)
+
+    def remover(self, key):
+        self.s3_client.delete_object(Bucket=self.bucket, Key=key)
+
+
+class ArmazenamentoLocal:
+    """Objetos em um diretório local, com a mesma interface de ArmazenamentoS3"""
+
+    def __init__(self, raiz, bucket):
+        self.bucket = bucket
+        self.raiz = os.path.join(raiz, bucket)
+
+    def _caminho(self, key):
+        return os.path.join(self.raiz, *key.split('/'))
+
+    def uri(self, key):
+        return f"file://{self._caminho(key)}"
+
+    def ler(self, key):
+        try:
+            with open(self._caminho(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def gravar(self, key, corpo, content_type='application/json; charset=utf-8', content_encoding=None):
+        caminho = self._caminho(key)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'wb') as f:
+            f.write(corpo)
+
+    def abrir_escrita(self, key, content_type='application/json; charset=utf-8', content_encoding=None):
+        return EscritaLocal(self._caminho(key))
+
+    def listar(self, prefixo):
+        keys = []
+        for diretorio, _, arquivos in os.walk(self.raiz):
+            for arquivo in arquivos:
+                relativo = os.path.relpath(os.path.join(diretorio, arquivo), self.raiz)
+                key = relativo.replace(os.sep, '/')
+                if key.startswith(prefixo):
+                    keys.append(key)
+        return sorted(keys)
+
+    def remover(self, key):
+        try:
+            os.remove(self._caminho(key))
+        except FileNotFoundError:
+            pass
+
+
+def obter_armazenamento(bucket, s3_client=None):
+    """Armazenamento do bucket: local se `CAMARA_LANDING_DIR` estiver definido, senão S3"""
+    raiz = os.environ.get('CAMARA_LANDING_DIR')
+    if raiz:
+        return ArmazenamentoLocal(raiz, bucket)
+    return ArmazenamentoS3(bucket, s3_client)
@@ -0,0 +1,166 @@
+"""
+Cache persistente de validadores HTTP e impressões digitais de respostas.
+
+Para cada endpoint consultado guarda o `ETag`/`Last-Modified` enviados pelo
+servidor e o SHA-256 do corpo. Na execução seguinte a requisição vai como
+GET condicional (`If-None-Match`/`If-Modified-Since`); uma resposta 304, ou
+um corpo com o mesmo hash, é tratada como inalterada e o chamador pode pular
+o parse (304) e a serialização. O cache é um JSON gravado ao lado dos dados da
+landing zone (ver `camara.armazenamento`).
+
+O JSON guarda só validadores e hashes. Quando o chamador precisa do registro
+de uma resposta 304, ele o obtém da saída já gravada (ex.: o último snapshot
+unificado) e o entrega com `carregar_registros`; sem o registro, a requisição
+não deve ser condicional. Os parâmetros da saída (formato, limite...) ficam
+no cache: se mudarem, as entradas anteriores são descartadas e nada é
+considerado inalterado.
+"""
+import json
+import logging
+import threading
+import urllib.parse
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class _Inalterado:
+    def __repr__(self):
+        return 'INALTERADO'
+
+
+# Retornado pelos coletores quando a resposta é igual à da execução anterior
+INALTERADO = _Inalterado()
+
+# Entrada do cache com os parâmetros da última saída gravada
+CHAVE_SAIDA = '_saida'
+
+
+def chave_cache(caminho, params=None):
+    """Chave do endpoint no cache, independente do host que respondeu"""
+    if params:
+        return f"{caminho}?{urllib.parse.urlencode(sorted(params.items()))}"
+    return caminho
+
+
+class CacheValidadores:
+    """
+    Validadores e hashes das respostas, persistidos em um objeto JSON.
+
+    Args:
+        armazenamento: ArmazenamentoS3 ou ArmazenamentoLocal
+        key (str): Key do objeto JSON do cache
+    """
+
+    def __init__(self, armazenamento, key):
+        self.armazenamento = armazenamento
+        self.key = key
+        self._lock = threading.Lock()
+        self._alterado = False
+        self._registros = {}
+        self.inalterados = 0
+        self.alterados = 0
+
+        try:
+            conteudo = armazenamento.ler(key)
+            self._entradas = json.loads(conteudo) if conteudo else {}
+        except Exception as e:
+            logger.warning(f"Cache de validadores ignorado ({key}): {e}")
+            self._entradas = {}
+
+    def configurar_saida(self, parametros):
+        """
+        Associa o cache aos parâmetros da saída (ex.: {'formato': 'json', 'limite': None}).
+
+        Se a saída anterior foi gravada com outros parâmetros, as entradas são
+        descartadas: as requisições deixam de ser condicionais e a saída é
+        gravada de novo, em vez de a execução responder "inalterado".
+        """
+        parametros = json.loads(json.dumps(parametros))
+        with self._lock:
+            if self._entradas.get(CHAVE_SAIDA) == parametros:
+                return
+            if self._entradas:
+                logger.info(f"Parâmetros da saída mudaram ({parametros}) - cache de validadores descartado")
+            self._entradas = {CHAVE_SAIDA: parametros}
+            self._alterado = True
+
+    def carregar_registros(self, registros):
+        """
+        Registros já gravados na saída anterior, por chave, para respostas inalteradas.
+
+        Ficam só em memória; `registro(chave)` os devolve.
+        """
+        with self._lock:
+            self._registros = dict(registros)
+
+    def headers_condicionais(self, chave):
+        """Headers de GET condicional para a chave (vazio se não houver validadores)"""
+        with self._lock:
+            entrada = self._entradas.get(chave) or {}
+        headers = {}
+        if entrada.get('etag'):
+            headers['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            headers['If-Modified-Since'] = entrada['last_modified']
+        return headers
+
+    def verificar(self, chave, resposta):
+        """
+        Indica se a resposta é igual à registrada na execução anterior.
+
+        Inalterada quando o servidor respondeu 304 ou quando o SHA-256 do corpo
+        coincide com o armazenado. Em respostas lidas em streaming o hash só
+        existe depois do corpo consumido: chame após o parse.
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+        if entrada is None:
+            inalterado = False
+        elif resposta.status == 304:
+            inalterado = True
+        else:
+            inalterado = resposta.status == 200 and \
+                resposta.sha256 == entrada.get('sha256')
+
+        with self._lock:
+            if inalterado:
+                self.inalterados += 1
+            else:
+                self.alterados += 1
+        return inalterado
+
+    def atualizar(self, chave, resposta):
+        """Registra os validadores e o hash de uma resposta 200 já processada"""
+        entrada = {
+            'etag': resposta.headers.get('etag'),
+            'last_modified': resposta.headers.get('last-modified'),
+            'sha256': resposta.sha256,
+            'atualizado_em': datetime.now().isoformat(timespec='seconds')
+        }
+        with self._lock:
+            self._entradas[chave] = entrada
+            self._alterado = True
+
+    def registro(self, chave):
+        """Registro da saída anterior para a chave (ver `carregar_registros`), se houver"""
+        with self._lock:
+            return self._registros.get(chave)
+
+    def salvar(self):
+        """Persiste o cache se houve alterações. Retorna True em caso de sucesso."""
+        with self._lock:
+            if not self._alterado:
+                return True
+            corpo = json.dumps(self._entradas, ensure_ascii=False).encode('utf-8')
+        try:
+            self.armazenamento.gravar(self.key, corpo)
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache de validadores {self.key}: {e}")
+            return False
+        with self._lock:
+            self._alterado = False
+        return True
+
+    def resumo(self):
+        return {'inalterados': self.inalterados, 'alterados': self.alterados}
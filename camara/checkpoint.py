@@ -0,0 +1,154 @@
+"""
+Checkpoints da coleta de detalhes, para retomar uma execução interrompida.
+
+Se a Lambda estoura o tempo ou cai no meio da coleta, os detalhes já obtidos
+se perdem e a próxima execução recomeça do zero. `CheckpointColeta` acumula
+os resultados bem-sucedidos e os grava periodicamente (a cada `intervalo_s`
+ou `max_pendentes` resultados) em partes NDJSON
+`<prefixo>/parte-NNNNN.ndjson.gz`, cada uma só com os resultados novos desde
+a gravação anterior: o custo de um checkpoint não cresce com o total já
+coletado. Ao retomar, as partes são lidas e `separar_concluidos` tira da
+coleta os deputados que já têm resultado.
+
+Só sucessos entram no checkpoint; deputados com erro são buscados de novo.
+"""
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+
+from camara.incremental import CAMPO_HASH, CAMPO_OBTIDO_EM
+from camara.saida import gravar, ler_registros
+
+logger = logging.getLogger(__name__)
+
+CHAVE = 'ideCadastro'
+PADRAO_PARTE = re.compile(r'parte-(\d+)\.ndjson\.gz$')
+
+
+class CheckpointColeta:
+    """
+    Resultados concluídos de uma coleta, gravados em partes no armazenamento.
+
+    Args:
+        armazenamento: ArmazenamentoS3 ou ArmazenamentoLocal
+        prefixo (str): Prefixo das partes (ex.: 'camara/detalhesDeputados/_checkpoint')
+        intervalo_s (float): Tempo máximo entre gravações com resultados pendentes
+        max_pendentes (int): Resultados pendentes que disparam uma gravação
+    """
+
+    def __init__(self, armazenamento, prefixo, intervalo_s=30, max_pendentes=100, relogio=time.monotonic):
+        self.armazenamento = armazenamento
+        self.prefixo = prefixo.rstrip('/')
+        self.intervalo_s = intervalo_s
+        self.max_pendentes = max_pendentes
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._pendentes = []
+        self._ultima_gravacao = relogio()
+        self._proxima_parte = 0
+        self.gravados = 0
+        self.retomados = 0
+
+    def _keys(self):
+        return [key for key in self.armazenamento.listar(f"{self.prefixo}/") if PADRAO_PARTE.search(key)]
+
+    def carregar(self):
+        """
+        Lê as partes gravadas.
+
+        Returns:
+            dict: ideCadastro -> resultado (a parte mais recente prevalece)
+        """
+        concluidos = {}
+        with self._lock:
+            for key in self._keys():
+                self._proxima_parte = max(self._proxima_parte, int(PADRAO_PARTE.search(key).group(1)) + 1)
+                conteudo = self.armazenamento.ler(key)
+                if conteudo is None:
+                    continue
+                for resultado in ler_registros(conteudo, key):
+                    concluidos[resultado.get(CHAVE)] = resultado
+        logger.info(f"Checkpoint {self.prefixo}: {len(concluidos)} resultados em {self._proxima_parte} partes")
+        return concluidos
+
+    def registrar(self, resultado):
+        """Acumula um resultado bem-sucedido e grava uma parte se for a hora"""
+        if not resultado or not resultado.get('detalhes_success'):
+            return
+        registro = dict(resultado)
+        registro.setdefault(CAMPO_OBTIDO_EM, datetime.now().isoformat(timespec='seconds'))
+        with self._lock:
+            self._pendentes.append(registro)
+            if len(self._pendentes) >= self.max_pendentes \
+                    or self._relogio() - self._ultima_gravacao >= self.intervalo_s:
+                self._gravar_pendentes()
+
+    def descarregar(self):
+        """Grava os resultados pendentes (fim da coleta ou antes de um ponto de risco)"""
+        with self._lock:
+            self._gravar_pendentes()
+
+    def _gravar_pendentes(self):
+        # Chamado com self._lock adquirido
+        self._ultima_gravacao = self._relogio()
+        if not self._pendentes:
+            return
+        key = f"{self.prefixo}/parte-{self._proxima_parte:05d}.ndjson.gz"
+        try:
+            gravar(self.armazenamento, key, self._pendentes, 'ndjson')
+        except Exception as e:
+            # Os pendentes seguem para a próxima tentativa de gravação
+            logger.warning(f"Falha ao gravar checkpoint {key}: {e}")
+            return
+        self._proxima_parte += 1
+        self.gravados += len(self._pendentes)
+        self._pendentes = []
+
+    def limpar(self):
+        """
+        Remove as partes gravadas (execução concluída ou recomeço do zero).
+
+        Returns:
+            bool: False se alguma parte não pôde ser removida (ex.: sem
+            `s3:DeleteObject`); o erro é logado e não interrompe a coleta
+        """
+        with self._lock:
+            self._pendentes = []
+            try:
+                for key in self._keys():
+                    self.armazenamento.remover(key)
+            except Exception as e:
+                logger.warning(f"Falha ao remover o checkpoint {self.prefixo}: {e}")
+                return False
+            self._proxima_parte = 0
+            return True
+
+    def resumo(self):
+        return {
+            'prefixo': self.prefixo,
+            'retomados': self.retomados,
+            'gravados': self.gravados,
+            'partes': self._proxima_parte
+        }
+
+
+def separar_concluidos(a_buscar, concluidos):
+    """
+    Separa os deputados que já têm resultado no checkpoint.
+
+    Um resultado só é aproveitado se o registro da lista não mudou desde
+    então (mesmo `hash_registro`).
+
+    Returns:
+        tuple: (restantes, retomados)
+    """
+    restantes, retomados = [], []
+    for deputado in a_buscar:
+        resultado = concluidos.get(deputado[CHAVE])
+        if resultado is not None and resultado.get(CAMPO_HASH) == deputado.get(CAMPO_HASH):
+            retomados.append(resultado)
+        else:
+            restantes.append(deputado)
+    return restantes, retomados
@@ -0,0 +1,383 @@
+"""
+Cliente HTTP compartilhado para o Web Service da Câmara dos Deputados.
+
+Todos os coletores (`app/` e `lambda/`) usam este módulo em vez de montar
+headers e chamar `requests.get`/`urllib.request.urlopen` por conta própria:
+
+- pool de conexões persistentes (keep-alive) por host, seguro entre threads;
+- limite de conexões simultâneas por host;
+- `Accept-Encoding: gzip` com descompressão transparente;
+- leitura do corpo em streaming (`abrir`), para parse incremental;
+- limite de taxa compartilhado (`camara.limitador`) no cliente padrão;
+- fallback automático de `www.camara.leg.br` para `www.camara.gov.br`.
+
+Os hosts podem ser sobrescritos pela variável de ambiente `CAMARA_HOSTS`
+(lista separada por vírgulas, ex.: `http://127.0.0.1:8000`).
+"""
+import gzip
+import hashlib
+import http.client
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.parse
+import zlib
+
+from camara.limitador import limitador_padrao
+
+logger = logging.getLogger(__name__)
+
+HOST_PRINCIPAL = "https://www.camara.leg.br"
+HOST_ESPELHO = "https://www.camara.gov.br"
+
+CAMINHO_DEPUTADOS = "/SitCamaraWS/Deputados.asmx/ObterDeputados"
+CAMINHO_DETALHES = "/SitCamaraWS/Deputados.asmx/ObterDetalhesDeputado"
+CAMINHO_PARTIDOS = "/SitCamaraWS/Deputados.asmx/ObterPartidosCD"
+
+# Tamanho dos blocos lidos do socket no modo streaming
+TAMANHO_BLOCO = 64 * 1024
+
+# Status que indicam bloqueio do host principal e justificam tentar o espelho
+STATUS_FALLBACK = (403, 429)
+
+HEADERS_PADRAO = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+class ErroCamara(Exception):
+    """Erro base do cliente da Câmara"""
+
+
+class ErroConexao(ErroCamara):
+    """Falha de rede (DNS, conexão, timeout) em todos os hosts tentados"""
+
+
+class ErroHTTP(ErroCamara):
+    """Resposta com status HTTP de erro"""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} para {url}")
+        self.status = status
+        self.url = url
+
+
+def hosts_configurados():
+    """Retorna a lista de hosts na ordem de tentativa"""
+    hosts = os.environ.get('CAMARA_HOSTS')
+    if hosts:
+        return [host.strip().rstrip('/') for host in hosts.split(',') if host.strip()]
+    return [HOST_PRINCIPAL, HOST_ESPELHO]
+
+
+def decodificar_corpo(corpo, content_encoding):
+    """Descomprime o corpo conforme o header Content-Encoding"""
+    encoding = (content_encoding or '').strip().lower()
+    if encoding == 'gzip':
+        return gzip.decompress(corpo)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(corpo)
+        except zlib.error:
+            return zlib.decompress(corpo, -zlib.MAX_WBITS)
+    return corpo
+
+
+def _novo_descompressor(content_encoding):
+    encoding = (content_encoding or '').strip().lower()
+    if encoding == 'gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompressobj(zlib.MAX_WBITS)
+    return None
+
+
+class Resposta:
+    """Resposta HTTP já lida e descomprimida"""
+
+    def __init__(self, status, headers, corpo, url):
+        self.status = status
+        self.headers = headers
+        self.corpo = corpo
+        self.url = url
+        self._sha256 = None
+
+    @property
+    def sha256(self):
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.corpo).hexdigest()
+        return self._sha256
+
+    def iter_blocos(self):
+        # Mesma interface de RespostaStream para os parsers incrementais
+        return iter((self.corpo,))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ErroHTTP(self.status, self.url)
+
+
+class RespostaStream:
+    """
+    Resposta HTTP cujo corpo é lido sob demanda, em blocos já descomprimidos.
+
+    A conexão volta ao pool quando o corpo é lido até o fim; se a resposta for
+    fechada antes disso, a conexão é descartada. Use como context manager.
+
+    `tempos` acumula, em segundos, a espera por vaga (`fila`), a abertura de
+    conexão (`conexao`, só se foi aberta uma nova) e a `transferencia` (da
+    requisição aos headers, mais a leitura do corpo à medida que é consumido).
+    """
+
+    def __init__(self, pool, conexao, resposta_http, url, tempos=None):
+        self.status = resposta_http.status
+        self.headers = {nome.lower(): valor for nome, valor in resposta_http.getheaders()}
+        self.url = url
+        self._pool = pool
+        self._conexao = conexao
+        self._resposta = resposta_http
+        self._descompressor = _novo_descompressor(self.headers.get('content-encoding'))
+        self._hash = hashlib.sha256()
+        self.tempos = {} if tempos is None else tempos
+        self.tempos.setdefault('transferencia', 0.0)
+        self._consumida = False
+        self._liberada = False
+
+    @property
+    def sha256(self):
+        """SHA-256 do corpo descomprimido (válido depois de lido até o fim)"""
+        return self._hash.hexdigest()
+
+    def iter_blocos(self, tamanho=TAMANHO_BLOCO):
+        """Gera o corpo em blocos descomprimidos, à medida que chegam do socket"""
+        while True:
+            inicio = time.perf_counter()
+            bloco = self._resposta.read(tamanho)
+            if not bloco:
+                self.tempos['transferencia'] += time.perf_counter() - inicio
+                break
+            if self._descompressor is not None:
+                bloco = self._descompressor.decompress(bloco)
+            self.tempos['transferencia'] += time.perf_counter() - inicio
+            if bloco:
+                self._hash.update(bloco)
+                yield bloco
+        if self._descompressor is not None:
+            resto = self._descompressor.flush()
+            if resto:
+                self._hash.update(resto)
+                yield resto
+        self._consumida = True
+        self.fechar()
+
+    def ler(self):
+        """Lê o corpo inteiro"""
+        return b''.join(self.iter_blocos())
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ErroHTTP(self.status, self.url)
+
+    def fechar(self):
+        if self._liberada:
+            return
+        self._liberada = True
+        if self._consumida and not self._resposta.will_close:
+            self._pool.ociosas.put(self._conexao)
+        else:
+            self._conexao.close()
+        self._pool.vagas.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class _PoolHost:
+    """Conexões ociosas e limite de conexões simultâneas para um host"""
+
+    def __init__(self, url_base, max_conexoes, timeout):
+        partes = urllib.parse.urlsplit(url_base)
+        self.url_base = url_base
+        self.https = partes.scheme == 'https'
+        self.host = partes.hostname
+        self.porta = partes.port
+        self.timeout = timeout
+        self.ociosas = queue.LifoQueue()
+        self.vagas = threading.BoundedSemaphore(max_conexoes)
+
+    def nova_conexao(self):
+        classe = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return classe(self.host, self.porta, timeout=self.timeout)
+
+    def obter_conexao(self):
+        try:
+            return self.ociosas.get_nowait(), True
+        except queue.Empty:
+            return self.nova_conexao(), False
+
+    def descartar_ociosas(self):
+        """Fecha as conexões ociosas (ex.: depois de uma encontrada fechada pelo servidor)"""
+        while True:
+            try:
+                self.ociosas.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def fechar(self):
+        self.descartar_ociosas()
+
+
+class ClienteCamara:
+    """
+    Cliente HTTP com pool de conexões keep-alive e fallback entre hosts.
+
+    Args:
+        hosts (list[str], optional): URLs base na ordem de tentativa.
+            Padrão: `hosts_configurados()`
+        max_conexoes_por_host (int): Conexões simultâneas permitidas por host
+        timeout (float): Timeout de conexão/leitura, em segundos
+        headers (dict, optional): Headers enviados em todas as requisições
+        limitador (LimitadorTaxa, optional): Limite de taxa aplicado a cada
+            requisição, inclusive às tentativas em hosts alternativos
+    """
+
+    def __init__(self, hosts=None, max_conexoes_por_host=32, timeout=30, headers=None, limitador=None):
+        self.hosts = list(hosts or hosts_configurados())
+        self.limitador = limitador
+        self.max_conexoes_por_host = max_conexoes_por_host
+        self.timeout = timeout
+        self.headers = dict(HEADERS_PADRAO if headers is None else headers)
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, url_base):
+        with self._lock:
+            pool = self._pools.get(url_base)
+            if pool is None:
+                pool = _PoolHost(url_base, self.max_conexoes_por_host, self.timeout)
+                self._pools[url_base] = pool
+            return pool
+
+    def _abrir_host(self, url_base, alvo, headers, tempos):
+        inicio = time.perf_counter()
+        if self.limitador is not None:
+            self.limitador.aguardar()
+        pool = self._pool(url_base)
+        if not pool.vagas.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Nenhuma conexão livre para {url_base} em {self.timeout}s")
+        tempos['fila'] = tempos.get('fila', 0.0) + time.perf_counter() - inicio
+        for tentativa in range(2):
+            if tentativa == 0:
+                conexao, reutilizada = pool.obter_conexao()
+            else:
+                conexao, reutilizada = pool.nova_conexao(), False
+            try:
+                if conexao.sock is None:
+                    inicio = time.perf_counter()
+                    conexao.connect()
+                    tempos['conexao'] = tempos.get('conexao', 0.0) + time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                conexao.request('GET', alvo, headers=headers)
+                resposta = conexao.getresponse()
+                tempos['transferencia'] = tempos.get('transferencia', 0.0) + time.perf_counter() - inicio
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conexao.close()
+                # Conexão ociosa fechada pelo servidor: as outras ociosas
+                # provavelmente também foram (ex.: depois de um intervalo sem
+                # uso), então são descartadas e a requisição é repetida uma
+                # vez em uma conexão nova
+                if reutilizada and tentativa == 0:
+                    pool.descartar_ociosas()
+                    continue
+                pool.vagas.release()
+                raise
+            except BaseException:
+                conexao.close()
+                pool.vagas.release()
+                raise
+            return RespostaStream(pool, conexao, resposta, f"{url_base}{alvo}", tempos)
+
+    def abrir(self, caminho, params=None, hosts=None, headers=None):
+        """
+        Executa um GET tentando cada host em ordem, sem ler o corpo.
+
+        Passa para o próximo host em falhas de rede, em respostas 5xx e em
+        bloqueios (403/429). Demais respostas 4xx são devolvidas ao chamador
+        (use `raise_for_status`). Se o último host responder com 5xx ou
+        bloqueio, essa resposta é devolvida (ainda legível); as dos hosts
+        anteriores são fechadas.
+
+        Returns:
+            RespostaStream: status, headers (em minúsculas), o corpo para
+            leitura incremental com `iter_blocos()` e os `tempos` por fase
+            (somados entre os hosts tentados)
+
+        Raises:
+            ErroConexao: Nenhum host respondeu, ou o último falhou na rede
+        """
+        alvo = caminho
+        if params:
+            alvo = f"{caminho}?{urllib.parse.urlencode(params)}"
+        headers_req = {**self.headers, **(headers or {})}
+        hosts = list(hosts or self.hosts)
+        tempos = {}
+
+        erros = []
+        for indice, url_base in enumerate(hosts):
+            if indice > 0:
+                logger.info(f"Tentando host alternativo {url_base} ({erros[-1]})")
+            try:
+                resposta = self._abrir_host(url_base, alvo, headers_req, tempos)
+            except (OSError, http.client.HTTPException) as e:
+                erros.append(f"{url_base}: {e}")
+                continue
+            if resposta.status < 500 and resposta.status not in STATUS_FALLBACK:
+                return resposta
+            if indice == len(hosts) - 1:
+                return resposta
+            erros.append(f"{url_base}: HTTP {resposta.status}")
+            resposta.fechar()
+
+        raise ErroConexao(f"Falha ao acessar {caminho}: {'; '.join(erros) or 'nenhum host configurado'}")
+
+    def get(self, caminho, params=None, hosts=None, headers=None):
+        """
+        Como `abrir`, mas lê o corpo inteiro.
+
+        Returns:
+            Resposta: status, headers (em minúsculas) e corpo descomprimido
+        """
+        with self.abrir(caminho, params, hosts, headers) as resposta:
+            try:
+                corpo = resposta.ler()
+            except (OSError, http.client.HTTPException, zlib.error) as e:
+                raise ErroConexao(f"Falha ao ler {resposta.url}: {e}") from e
+        return Resposta(resposta.status, resposta.headers, corpo, resposta.url)
+
+    def fechar(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.fechar()
+            self._pools.clear()
+
+
+_cliente_padrao = None
+_cliente_lock = threading.Lock()
+
+
+def cliente_padrao():
+    """Cliente compartilhado pelo processo (reaproveitado entre invocações da Lambda)"""
+    global _cliente_padrao
+    if _cliente_padrao is None:
+        with _cliente_lock:
+            if _cliente_padrao is None:
+                _cliente_padrao = ClienteCamara(limitador=limitador_padrao())
+    return _cliente_padrao
@@ -0,0 +1,176 @@
+"""
+Controle adaptativo de concorrência (AIMD) para as coletas na API da Câmara.
+
+Em vez de um `max_workers` fixo, o controlador aumenta o número de
+requisições em voo enquanto a latência e a taxa de erro estão saudáveis
+(aumento aditivo) e corta o limite pela metade em erros HTTP, timeouts ou
+picos de latência (redução multiplicativa), como o controle de congestionamento
+do TCP. Funciona tanto com threads quanto com tarefas asyncio.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AMOSTRAS_AQUECIMENTO = 10
+
+
+class ControladorAIMD:
+    """
+    Limite dinâmico de requisições simultâneas.
+
+    Args:
+        minimo (int): Limite mínimo de requisições em voo
+        maximo (int): Limite máximo (teto) de requisições em voo
+        inicial (int): Limite no início da coleta
+        incremento (float): Quanto o limite cresce a cada "rodada" saudável
+            (uma rodada = `limite` respostas bem-sucedidas)
+        fator_reducao (float): Multiplicador aplicado ao limite em sobrecarga
+        fator_latencia (float): Latência acima de `fator_latencia` vezes a
+            latência de referência conta como pico
+        folga_latencia_s (float): Diferença absoluta mínima para um pico, evitando
+            que o ruído de latências muito baixas seja tratado como sobrecarga
+        intervalo_reducao_s (float): Intervalo mínimo entre duas reduções, para
+            que uma rajada de erros do mesmo evento corte o limite uma vez só
+    """
+
+    def __init__(self, minimo=2, maximo=32, inicial=8, incremento=1.0,
+                 fator_reducao=0.5, fator_latencia=2.0, folga_latencia_s=0.05,
+                 intervalo_reducao_s=1.0):
+        self.minimo = max(1, minimo)
+        self.maximo = max(self.minimo, maximo)
+        self.inicial = min(max(inicial, self.minimo), self.maximo)
+        self.incremento = incremento
+        self.fator_reducao = fator_reducao
+        self.fator_latencia = fator_latencia
+        self.folga_latencia_s = folga_latencia_s
+        self.intervalo_reducao_s = intervalo_reducao_s
+
+        self.limite = float(self.inicial)
+        self.em_voo = 0
+        self.latencia_referencia = None
+        self._amostras_saudaveis = 0
+
+        self._lock = threading.Lock()
+        self._condicao = threading.Condition(self._lock)
+        self._condicao_async = None
+        self._ultima_reducao = 0.0
+
+        self.aumentos = 0
+        self.reducoes = {}
+        self.limite_maximo_atingido = self.limite
+        self.limite_minimo_atingido = self.limite
+        self._soma_limites = 0.0
+        self._amostras = 0
+
+    @classmethod
+    def fixo(cls, workers):
+        """Controlador com limite constante (equivalente ao antigo max_workers)"""
+        return cls(minimo=workers, maximo=workers, inicial=workers)
+
+    @property
+    def adaptativo(self):
+        return self.minimo != self.maximo
+
+    def _tem_vaga(self):
+        return self.em_voo < int(self.limite)
+
+    def adquirir(self):
+        """Bloqueia a thread até haver vaga dentro do limite atual"""
+        with self._condicao:
+            while not self._tem_vaga():
+                self._condicao.wait()
+            self.em_voo += 1
+
+    def liberar(self, latencia, motivo_falha=None):
+        """
+        Libera a vaga e ajusta o limite com o resultado da requisição.
+
+        Args:
+            latencia (float): Duração da requisição, em segundos
+            motivo_falha (str, optional): Tipo de falha que indica sobrecarga
+                ('http_error', 'timeout', 'url_error'...). None em caso de sucesso.
+        """
+        with self._condicao:
+            self.em_voo -= 1
+            self._registrar(latencia, motivo_falha)
+            self._condicao.notify_all()
+
+    async def adquirir_async(self):
+        """Equivalente a `adquirir` para tarefas do event loop"""
+        if self._condicao_async is None:
+            import asyncio  # Só o motor asyncio precisa; fica fora do cold start dos demais
+
+            self._condicao_async = asyncio.Condition()
+        async with self._condicao_async:
+            await self._condicao_async.wait_for(self._tem_vaga)
+            self.em_voo += 1
+
+    async def liberar_async(self, latencia, motivo_falha=None):
+        """Equivalente a `liberar` para tarefas do event loop"""
+        async with self._condicao_async:
+            self.em_voo -= 1
+            with self._lock:
+                self._registrar(latencia, motivo_falha)
+            self._condicao_async.notify_all()
+
+    async def devolver_async(self):
+        """Devolve a vaga sem registrar amostra (a requisição não chegou a ser enviada)"""
+        async with self._condicao_async:
+            self.em_voo -= 1
+            self._condicao_async.notify_all()
+
+    def _registrar(self, latencia, motivo_falha):
+        # Chamado com self._lock adquirido
+        self._soma_limites += self.limite
+        self._amostras += 1
+        if not self.adaptativo:
+            return
+
+        # Picos só contam depois de uma referência estável
+        if motivo_falha is None and self._amostras_saudaveis >= AMOSTRAS_AQUECIMENTO \
+                and latencia > self.fator_latencia * self.latencia_referencia \
+                and latencia - self.latencia_referencia > self.folga_latencia_s:
+            motivo_falha = 'latencia'
+
+        if motivo_falha is None:
+            # Referência suavizada apenas com amostras saudáveis
+            self._amostras_saudaveis += 1
+            if self.latencia_referencia is None:
+                self.latencia_referencia = latencia
+            else:
+                self.latencia_referencia = 0.9 * self.latencia_referencia + 0.1 * latencia
+            anterior = int(self.limite)
+            self.limite = min(self.maximo, self.limite + self.incremento / self.limite)
+            if int(self.limite) > anterior:
+                self.aumentos += 1
+                self.limite_maximo_atingido = max(self.limite_maximo_atingido, self.limite)
+            return
+
+        agora = time.monotonic()
+        if agora - self._ultima_reducao < self.intervalo_reducao_s:
+            return
+        self._ultima_reducao = agora
+        anterior = self.limite
+        self.limite = max(float(self.minimo), self.limite * self.fator_reducao)
+        self.reducoes[motivo_falha] = self.reducoes.get(motivo_falha, 0) + 1
+        self.limite_minimo_atingido = min(self.limite_minimo_atingido, self.limite)
+        logger.info(f"Concorrência reduzida de {int(anterior)} para {int(self.limite)} ({motivo_falha})")
+
+    def resumo(self):
+        """Estatísticas do controlador para o payload de `stats`"""
+        with self._lock:
+            return {
+                'modo': 'adaptativa' if self.adaptativo else 'fixa',
+                'minimo': self.minimo,
+                'maximo': self.maximo,
+                'inicial': self.inicial,
+                'final': int(self.limite),
+                'maximo_atingido': int(self.limite_maximo_atingido),
+                'minimo_atingido': int(self.limite_minimo_atingido),
+                'medio': round(self._soma_limites / self._amostras, 1) if self._amostras else float(self.inicial),
+                'aumentos': self.aumentos,
+                'reducoes': dict(self.reducoes),
+                'latencia_referencia_s': round(self.latencia_referencia, 3) if self.latencia_referencia else None
+            }
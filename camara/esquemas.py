@@ -0,0 +1,61 @@
+"""
+Esquemas de extração dos documentos da Câmara, compartilhados por `app/` e `lambda/`.
+
+Os scripts locais e as Lambdas montam os mesmos registros a partir de
+`ObterDeputados` (na coleta de detalhes), `ObterDetalhesDeputado` e
+`ObterPartidosCD`; os esquemas ficam aqui para que as duas cópias não
+divirjam. A lista de deputados gravada por `obter_deputados.py` inclui o campo
+`sexo`; no script de `app/` o `ideCadastro` sai numérico e os textos limpos.
+"""
+from camara.extrator import Extrator, Grupo, Texto, inteiro_ou_texto
+from camara.tabelas import CAMPOS_TABELAS_FILHAS
+
+# <deputado> de ObterDeputados, como entra na coleta de detalhes
+CAMPOS_DEPUTADO = (
+    'ideCadastro', 'nome', 'nomeParlamentar', 'partido', 'uf', 'urlFoto',
+    'condicao', 'gabinete', 'anexo', 'fone', 'email'
+)
+
+# <deputado> de ObterDeputados, como é gravado pelas coletas da lista
+CAMPOS_LISTA_DEPUTADOS = (
+    'ideCadastro', 'condicao', 'nome', 'nomeParlamentar', 'urlFoto', 'sexo',
+    'uf', 'partido', 'gabinete', 'anexo', 'fone', 'email'
+)
+
+# Campos simples de <Deputado> em ObterDetalhesDeputado
+CAMPOS_DETALHES = (
+    'email', 'nomeProfissao', 'dataNascimento', 'dataFalecimento',
+    'ufRepresentacaoAtual', 'situacaoNaLegislaturaAtual', 'ideCadastro',
+    'nomeParlamentarAtual', 'nomeCivil', 'sexo'
+)
+
+CAMPOS_PARTIDO = ('idPartido', 'siglaPartido', 'nomePartido', 'dataCriacao', 'dataExtincao')
+
+
+def esquema_detalhes(chave_gabinete='gabinete_detalhes'):
+    """
+    Esquema de <Deputado> em ObterDetalhesDeputado.
+
+    Args:
+        chave_gabinete (str): Nome do grupo <gabinete> no registro. Nas
+            Lambdas é 'gabinete_detalhes', para não sobrescrever o campo
+            `gabinete` da lista no registro unificado; o script de `app/`
+            usa 'gabinete', como sempre gravou
+    """
+    return {
+        **{campo: Texto(limpar=True) for campo in CAMPOS_DETALHES},
+        'partidoAtual': Grupo({'sigla': Texto(), 'nome': Texto()}),
+        chave_gabinete: Grupo({'numero': Texto(), 'anexo': Texto(), 'telefone': Texto()}, tag='gabinete'),
+        # Comissões, períodos de exercício e lideranças viram tabelas filhas
+        **CAMPOS_TABELAS_FILHAS
+    }
+
+
+EXTRATOR_DEPUTADO = Extrator({campo: Texto() for campo in CAMPOS_DEPUTADO})
+EXTRATOR_LISTA_DEPUTADOS = Extrator({campo: Texto() for campo in CAMPOS_LISTA_DEPUTADOS})
+EXTRATOR_LISTA_DEPUTADOS_APP = Extrator({
+    **{campo: Texto(limpar=True) for campo in CAMPOS_LISTA_DEPUTADOS},
+    'ideCadastro': Texto(limpar=True, converter=inteiro_ou_texto)
+})
+EXTRATOR_DETALHES = Extrator(esquema_detalhes())
+EXTRATOR_PARTIDO = Extrator({campo: Texto(limpar=True) for campo in CAMPOS_PARTIDO})
@@ -0,0 +1,142 @@
+"""
+Extração de registros a partir de XML com um esquema declarativo.
+
+O `Extrator` transforma o esquema em uma lista pré-montada de
+(tag, campo, conversão), aplicada com `findtext`/`find` na ordem do esquema.
+Campos de texto simples vão direto para `findtext`; os demais convertem o
+filho encontrado ou recebem o valor padrão quando ele não existe.
+
+Exemplo:
+
+    EXTRATOR_PARTIDO = Extrator({
+        'idPartido': Texto(limpar=True),
+        'siglaPartido': Texto(limpar=True),
+    })
+    partido = EXTRATOR_PARTIDO(partido_elem)
+
+Como em `find`, só a primeira ocorrência de cada tag é considerada.
+"""
+
+
+def inteiro_ou_texto(texto):
+    """Converte para int quando possível; senão mantém o texto"""
+    try:
+        return int(texto)
+    except ValueError:
+        return texto
+
+
+def _texto_findtext(elem):
+    return elem.text or ''
+
+
+def _texto_limpo(elem):
+    texto = elem.text
+    return texto.strip() if texto is not None else None
+
+
+class Texto:
+    """
+    Texto de um elemento filho.
+
+    Args:
+        tag (str, optional): Tag do filho (padrão: o nome do campo no esquema)
+        limpar (bool): Aplica `strip()` e devolve None para elemento sem texto.
+            Sem `limpar`, segue `findtext`: '' para elemento sem texto.
+        converter (callable, optional): Aplicado ao texto não nulo
+    """
+    padrao = None
+
+    def __init__(self, tag=None, limpar=False, converter=None):
+        self.tag = tag
+        self.limpar = limpar
+        self.converter = converter
+
+    def compilar(self):
+        texto = _texto_limpo if self.limpar else _texto_findtext
+        converter = self.converter
+        if converter is None:
+            return texto
+
+        def valor(elem):
+            bruto = texto(elem)
+            return converter(bruto) if bruto is not None else None
+        return valor
+
+
+class Grupo:
+    """Sub-registro extraído dos filhos de um elemento ({} se ele não existir)"""
+    padrao = None
+
+    def __init__(self, esquema, tag=None):
+        self.tag = tag
+        self.extrator = Extrator(esquema)
+
+    def compilar(self):
+        return self.extrator
+
+
+class Lista:
+    """Lista com um sub-registro por filho de um elemento ([] se ele não existir)"""
+    padrao = None
+
+    def __init__(self, esquema, tag=None):
+        self.tag = tag
+        self.extrator = Extrator(esquema)
+
+    def compilar(self):
+        extrator = self.extrator
+        return lambda elem: [extrator(item) for item in elem]
+
+
+class Contagem:
+    """Número de filhos de um elemento (0 se ele não existir)"""
+    padrao = 0
+
+    def __init__(self, tag=None):
+        self.tag = tag
+
+    def compilar(self):
+        return len
+
+
+class Extrator:
+    """
+    Extrator de registros montado a partir de um esquema.
+
+    Args:
+        esquema (dict): Nome do campo de saída -> Texto, Grupo, Lista ou
+            Contagem. A ordem do esquema é a ordem das chaves no registro.
+    """
+
+    def __init__(self, esquema):
+        self.esquema = dict(esquema)
+        self.campos = list(esquema)
+        self._leituras = []
+        tags = set()
+        for campo, spec in esquema.items():
+            tag = spec.tag or campo
+            if tag in tags:
+                raise ValueError(f"Tag '{tag}' mapeada para mais de um campo")
+            tags.add(tag)
+            valor = spec.compilar()
+            # Texto sem limpeza nem conversão é exatamente o `findtext`
+            self._leituras.append((tag, campo, None if valor is _texto_findtext else valor, spec.padrao))
+        self._grupos = [campo for campo, spec in esquema.items() if isinstance(spec, Grupo)]
+        self._listas = [campo for campo, spec in esquema.items() if isinstance(spec, Lista)]
+
+    def __call__(self, elem):
+        registro = {}
+        for tag, campo, valor, padrao in self._leituras:
+            if valor is None:
+                registro[campo] = elem.findtext(tag)
+                continue
+            filho = elem.find(tag)
+            registro[campo] = valor(filho) if filho is not None else padrao
+        for campo in self._grupos:
+            if registro[campo] is None:
+                registro[campo] = {}
+        for campo in self._listas:
+            if registro[campo] is None:
+                registro[campo] = []
+        return registro
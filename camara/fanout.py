@@ -0,0 +1,175 @@
+"""
+Fan-out da coleta de detalhes em várias invocações (coordenador, workers e merge).
+
+Uma única invocação precisa buscar a lista e os detalhes de todos os
+deputados dentro do tempo e das threads de uma Lambda. No fan-out, o
+coordenador divide os deputados em shards e invoca um worker por shard; cada
+worker grava seus resultados (ainda com as listas das tabelas filhas) em um
+arquivo NDJSON do shard, e o merge junta os shards nos arquivos de sempre.
+
+Os arquivos intermediários ficam em `<base_key>/_fanout/<execucao>/` e são
+removidos pelo merge depois que a saída é gravada.
+
+A invocação das funções é feita por um invocador:
+
+* `InvocadorLambda`: `Invoke` síncrono (RequestResponse), um por thread;
+* `InvocadorLocal`: os mesmos handlers em processos Python novos (spawn),
+  como containers separados, para executar e medir o fluxo em uma máquina.
+
+Os dois devolvem a resposta do handler (`{'statusCode': ..., 'body': ...}`);
+falhas da invocação viram uma resposta com `statusCode` 500.
+"""
+import importlib
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PREFIXO_FANOUT = '_fanout'
+
+# Shards do coordenador e, com o InvocadorLambda, invocações simultâneas
+NUM_SHARDS_PADRAO = 4
+
+# Timeout máximo de uma função Lambda
+TIMEOUT_LAMBDA_S = 900
+
+
+def dividir_em_shards(itens, num_shards):
+    """Divide em até `num_shards` partes contíguas cujos tamanhos diferem em no máximo 1"""
+    if not itens:
+        return []
+    num_shards = max(1, min(num_shards, len(itens)))
+    base, resto = divmod(len(itens), num_shards)
+    shards, inicio = [], 0
+    for indice in range(num_shards):
+        fim = inicio + base + (1 if indice < resto else 0)
+        shards.append(itens[inicio:fim])
+        inicio = fim
+    return shards
+
+
+def key_execucao(base_key, execucao):
+    """Prefixo dos arquivos intermediários de uma execução"""
+    return f"{base_key}/{PREFIXO_FANOUT}/{execucao}"
+
+
+def key_shard(base_key, execucao, indice):
+    """Resultados de um shard (NDJSON comprimido, preserva as listas aninhadas)"""
+    return f"{key_execucao(base_key, execucao)}/shard-{indice:05d}.ndjson.gz"
+
+
+def key_reaproveitados(base_key, execucao):
+    """Registros reaproveitados do snapshot anterior pelo coordenador (modo incremental)"""
+    return f"{key_execucao(base_key, execucao)}/reaproveitados.ndjson.gz"
+
+
+def resposta_erro(erro):
+    """Resposta no formato dos handlers para uma invocação que falhou"""
+    return {'statusCode': 500, 'body': json.dumps({'error': str(erro)})}
+
+
+def corpo(resposta):
+    """Body já decodificado de uma resposta de handler"""
+    conteudo = (resposta or {}).get('body')
+    return json.loads(conteudo) if isinstance(conteudo, str) else (conteudo or {})
+
+
+def tempo_restante(context):
+    """Segundos até o timeout da invocação atual (None fora da Lambda, sem `context`)"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    return context.get_remaining_time_in_millis() / 1000
+
+
+def _executar_handler(caminho, payload):
+    modulo, funcao = caminho.rsplit('.', 1)
+    return getattr(importlib.import_module(modulo), funcao)(payload, None)
+
+
+class InvocadorLocal:
+    """
+    Executa os handlers em processos locais, no lugar do `Invoke` da Lambda.
+
+    Args:
+        handlers (dict): Nome da função -> 'modulo.handler' (importável pelos
+            processos filhos, que herdam o `sys.path` e o ambiente)
+        processos (int, optional): Processos simultâneos (padrão: um por payload)
+    """
+
+    def __init__(self, handlers, processos=None):
+        self.handlers = dict(handlers)
+        self.processos = processos
+
+    def invocar(self, funcao, payload):
+        return self.invocar_varios(funcao, [payload])[0]
+
+    def invocar_varios(self, funcao, payloads):
+        if not payloads:
+            return []
+        caminho = self.handlers[funcao]
+        contexto = multiprocessing.get_context('spawn')
+        processos = min(self.processos or len(payloads), len(payloads))
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            futures = [executor.submit(_executar_handler, caminho, payload) for payload in payloads]
+            respostas = []
+            for future in futures:
+                try:
+                    respostas.append(future.result())
+                except Exception as e:
+                    logger.error(f"Falha na invocação local de {funcao}: {e}")
+                    respostas.append(resposta_erro(e))
+            return respostas
+
+
+class InvocadorLambda:
+    """
+    Invoca funções Lambda de forma síncrona, várias em paralelo.
+
+    Args:
+        max_paralelo (int): Invocações simultâneas (threads)
+        timeout (int): Tempo máximo de leitura da resposta, em segundos; deve
+            cobrir a duração do worker (até 900 s na Lambda)
+    """
+
+    def __init__(self, max_paralelo=64, timeout=TIMEOUT_LAMBDA_S):
+        self.max_paralelo = max_paralelo
+        self.timeout = timeout
+        self._cliente = None
+
+    @property
+    def cliente(self):
+        if self._cliente is None:
+            import boto3
+            from botocore.config import Config
+            self._cliente = boto3.client('lambda', config=Config(
+                read_timeout=self.timeout,
+                max_pool_connections=self.max_paralelo,
+                # Uma nova tentativa após timeout repetiria o trabalho do worker
+                retries={'total_max_attempts': 1}
+            ))
+        return self._cliente
+
+    def invocar(self, funcao, payload):
+        try:
+            resposta = self.cliente.invoke(
+                FunctionName=funcao,
+                InvocationType='RequestResponse',
+                Payload=json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            )
+            conteudo = json.loads(resposta['Payload'].read() or b'null')
+        except Exception as e:
+            logger.error(f"Falha ao invocar {funcao}: {e}")
+            return resposta_erro(e)
+        if resposta.get('FunctionError'):
+            mensagem = conteudo.get('errorMessage') if isinstance(conteudo, dict) else conteudo
+            logger.error(f"Erro na função {funcao}: {mensagem}")
+            return resposta_erro(mensagem)
+        return conteudo
+
+    def invocar_varios(self, funcao, payloads):
+        if not payloads:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_paralelo, len(payloads))) as executor:
+            return list(executor.map(lambda payload: self.invocar(funcao, payload), payloads))
@@ -0,0 +1,170 @@
+"""
+Requisições com hedge no host espelho, para cortar a cauda de latência.
+
+Algumas poucas chamadas lentas ao host principal dominam o tempo total da
+coleta, e o espelho (`www.camara.gov.br`) só era tentado depois de uma falha
+completa, que pode levar o timeout inteiro. Com hedge, quando uma requisição
+ao principal passa de um percentil da latência recente (`percentil`, sobre
+uma janela móvel), uma cópia é disparada no espelho: a primeira resposta
+aceitável vence e a outra é cancelada (a conexão dela é fechada).
+
+O `orcamento` limita a carga extra: o número de cópias disparadas não passa
+dessa fração das requisições ao principal. Enquanto a janela não tem
+`min_amostras` latências, não há hedge.
+
+Só o motor asyncio usa hedge: uma requisição em uma thread bloqueada no
+socket não tem como ser cancelada quando a outra vence.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+
+class PoliticaHedge:
+    """
+    Limiar de hedge (percentil da latência recente), orçamento e contadores.
+
+    Args:
+        percentil (float): Percentil da latência do principal que dispara a cópia
+        orcamento (float): Fração máxima de cópias em relação às requisições
+        janela (int): Latências recentes consideradas no percentil
+        min_amostras (int): Latências na janela antes do primeiro hedge
+        minimo_s (float): Limiar mínimo, para não duplicar requisições rápidas
+    """
+
+    def __init__(self, percentil=95, orcamento=0.1, janela=200, min_amostras=20, minimo_s=0.05):
+        self.percentil = percentil
+        self.orcamento = orcamento
+        self.min_amostras = min_amostras
+        self.minimo_s = minimo_s
+        self.latencias = deque(maxlen=janela)
+        self._lock = threading.Lock()
+        self._limiar = None
+        self._desatualizado = True
+        self.requisicoes = 0
+        self.hedges = 0
+        self.negados_orcamento = 0
+        self.vitorias_espelho = 0
+        self.vitorias_principal = 0
+
+    def limiar(self):
+        """Segundos de espera pelo principal antes da cópia (None sem amostras suficientes)"""
+        with self._lock:
+            if len(self.latencias) < self.min_amostras:
+                return None
+            if self._desatualizado:
+                ordenadas = sorted(self.latencias)
+                posicao = max(0, math.ceil(self.percentil / 100 * len(ordenadas)) - 1)
+                self._limiar = max(self.minimo_s, ordenadas[posicao])
+                self._desatualizado = False
+            return self._limiar
+
+    def registrar_requisicao(self):
+        with self._lock:
+            self.requisicoes += 1
+
+    def registrar_latencia(self, latencia):
+        """Latência de uma requisição ao principal (ou o tempo até ela ser cancelada)"""
+        with self._lock:
+            self.latencias.append(latencia)
+            self._desatualizado = True
+
+    def reservar(self):
+        """Reserva uma cópia dentro do orçamento; False se o orçamento se esgotou"""
+        with self._lock:
+            if self.hedges + 1 > self.orcamento * self.requisicoes:
+                self.negados_orcamento += 1
+                return False
+            self.hedges += 1
+            return True
+
+    def registrar_vitoria(self, espelho):
+        with self._lock:
+            if espelho:
+                self.vitorias_espelho += 1
+            else:
+                self.vitorias_principal += 1
+
+    def resumo(self):
+        limiar = self.limiar()
+        return {
+            'percentil': self.percentil,
+            'orcamento': self.orcamento,
+            'requisicoes': self.requisicoes,
+            'hedges': self.hedges,
+            'taxa_hedge': f"{(self.hedges / self.requisicoes * 100):.1f}%" if self.requisicoes else "0%",
+            'vitorias_espelho': self.vitorias_espelho,
+            'vitorias_principal': self.vitorias_principal,
+            'negados_orcamento': self.negados_orcamento,
+            'limiar_s': round(limiar, 3) if limiar is not None else None
+        }
+
+
+async def _cancelar(tarefas):
+    import asyncio
+
+    for tarefa in tarefas:
+        tarefa.cancel()
+    # Aguarda o cancelamento para que as conexões sejam fechadas agora
+    await asyncio.gather(*tarefas, return_exceptions=True)
+
+
+async def com_hedge(principal, espelho, politica, aceitar):
+    """
+    Executa `principal()` e, se passar do limiar, também `espelho()`.
+
+    As corrotinas devem devolver o erro como resultado; uma exceção é
+    propagada (e a outra tarefa, cancelada).
+
+    Args:
+        principal, espelho: Funções sem argumentos que devolvem a corrotina
+            de cada host
+        politica (PoliticaHedge): Limiar, orçamento e contadores
+        aceitar: Indica se um resultado encerra a disputa; se o primeiro a
+            chegar não é aceitável, o outro é aguardado
+
+    Returns:
+        tuple: (resultado, veio_do_espelho); sem resultado aceitável, fica o do principal
+    """
+    # asyncio só é importado no motor assíncrono (cold start do engine 'threads')
+    import asyncio
+
+    politica.registrar_requisicao()
+    inicio = time.monotonic()
+    tarefa_principal = asyncio.ensure_future(principal())
+    tarefas = [tarefa_principal]
+    try:
+        limiar = politica.limiar()
+        if limiar is not None:
+            await asyncio.wait(tarefas, timeout=limiar)
+        if tarefa_principal.done() or limiar is None or not politica.reservar():
+            resultado = await tarefa_principal
+            politica.registrar_latencia(time.monotonic() - inicio)
+            return resultado, False
+
+        tarefa_espelho = asyncio.ensure_future(espelho())
+        tarefas.append(tarefa_espelho)
+        resultados = {}
+        vencedora = None
+        pendentes = set(tarefas)
+        while pendentes and vencedora is None:
+            concluidas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            if tarefa_principal in concluidas:
+                politica.registrar_latencia(time.monotonic() - inicio)
+            # Principal primeiro: num empate, a cópia não leva a vitória
+            for tarefa in tarefas:
+                if tarefa in concluidas:
+                    resultados[tarefa] = tarefa.result()
+                    if aceitar(resultados[tarefa]):
+                        vencedora = tarefa
+                        break
+        if not tarefa_principal.done():
+            # Principal será cancelado: o tempo até aqui é um piso da latência dele
+            politica.registrar_latencia(time.monotonic() - inicio)
+        if vencedora is None:
+            vencedora = tarefa_principal
+        politica.registrar_vitoria(vencedora is tarefa_espelho)
+        return resultados[vencedora], vencedora is tarefa_espelho
+    finally:
+        await _cancelar([tarefa for tarefa in tarefas if not tarefa.done()])
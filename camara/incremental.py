@@ -0,0 +1,106 @@
+"""
+Atualização incremental dos detalhes dos deputados.
+
+Compara a lista atual de `ObterDeputados` com o último snapshot
+`deputados_unificado_*` gravado e decide quais deputados precisam de uma
+nova chamada a `ObterDetalhesDeputado`: os novos, os que mudaram na lista
+(hash do registro diferente) e os cujos detalhes são mais antigos que a
+idade máxima. Os demais são reaproveitados do snapshot anterior.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from camara.saida import EXTENSOES, ler_registros
+
+logger = logging.getLogger(__name__)
+
+# Campos adicionados a cada registro do arquivo unificado
+CAMPO_HASH = 'hash_registro'
+CAMPO_OBTIDO_EM = 'detalhes_obtidos_em'
+
+
+def hash_registro(registro):
+    """SHA-256 estável (chaves ordenadas) de um registro da lista de deputados"""
+    conteudo = json.dumps(registro, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def carregar_snapshot_anterior(armazenamento, prefixo):
+    """
+    Carrega o snapshot mais recente cujo key começa com `prefixo`.
+
+    Os keys terminam em `_AAAAMMDD_HHMMSS` seguido da extensão do formato
+    (`.parquet` sob partições `dt=AAAA-MM-DD`), então a ordem lexicográfica é
+    a ordem cronológica.
+
+    Returns:
+        tuple: (key, registros) ou (None, []) se não houver snapshot legível
+    """
+    try:
+        keys = [key for key in armazenamento.listar(prefixo) if key.endswith(tuple(EXTENSOES.values()))]
+        if not keys:
+            return None, []
+        key = keys[-1]
+        return key, ler_registros(armazenamento.ler(key), key)
+    except Exception as e:
+        logger.warning(f"Snapshot anterior indisponível ({prefixo}): {e}")
+        return None, []
+
+
+def planejar_atualizacao(deputados, anteriores, max_idade_horas, agora=None):
+    """
+    Separa os deputados entre os que precisam de detalhes novos e os reaproveitáveis.
+
+    Args:
+        deputados (list[dict]): Lista atual de ObterDeputados
+        anteriores (list[dict]): Registros do snapshot unificado anterior
+        max_idade_horas (float): Idade máxima dos detalhes reaproveitados
+
+    Returns:
+        tuple: (a_buscar, reaproveitados, hashes, contagens) onde `hashes`
+        mapeia ideCadastro -> hash do registro atual da lista
+    """
+    agora = agora or datetime.now()
+    limite_idade = agora - timedelta(hours=max_idade_horas)
+    anteriores_por_id = {
+        registro.get('ideCadastro'): registro
+        for registro in anteriores
+        if registro.get('detalhes_success')
+    }
+
+    a_buscar = []
+    reaproveitados = []
+    hashes = {}
+    contagens = {'novos': 0, 'alterados': 0, 'expirados': 0, 'reaproveitados': 0}
+
+    for deputado in deputados:
+        ide_cadastro = deputado['ideCadastro']
+        hashes[ide_cadastro] = hash_registro(deputado)
+        anterior = anteriores_por_id.get(ide_cadastro)
+
+        if anterior is None:
+            motivo = 'novos'
+        elif anterior.get(CAMPO_HASH) != hashes[ide_cadastro]:
+            motivo = 'alterados'
+        else:
+            obtido_em = anterior.get(CAMPO_OBTIDO_EM)
+            if not isinstance(obtido_em, datetime):
+                # JSON guarda o texto ISO; Parquet já devolve datetime
+                try:
+                    obtido_em = datetime.fromisoformat(obtido_em)
+                except (TypeError, ValueError):
+                    obtido_em = None
+            motivo = 'expirados' if obtido_em is None or obtido_em < limite_idade else None
+
+        if motivo:
+            a_buscar.append(deputado)
+        else:
+            reaproveitados.append(anterior)
+            motivo = 'reaproveitados'
+        contagens[motivo] += 1
+
+    ids_atuais = set(hashes)
+    contagens['removidos'] = sum(1 for ide in anteriores_por_id if ide not in ids_atuais)
+    return a_buscar, reaproveitados, hashes, contagens
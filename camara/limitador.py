@@ -0,0 +1,116 @@
+"""
+Limite de taxa (token bucket) compartilhado pelas requisições à API da Câmara.
+
+Uma pausa fixa depois de cada requisição limita a vazão mesmo quando o
+servidor responde rápido, e some quando há várias requisições em paralelo.
+O `LimitadorTaxa` libera até `taxa` requisições por segundo, com rajadas de
+até `rajada` requisições depois de um período ocioso; só espera quem chega
+acima desse ritmo.
+
+Cada requisição reserva uma ficha sob um lock e espera fora dele o tempo até
+a ficha estar disponível (`aguardar` em threads, `aguardar_async` em tarefas
+asyncio), então o mesmo limitador serve aos dois motores ao mesmo tempo e as
+esperas seguem a ordem de chegada.
+
+O limitador do processo (`limitador_padrao`) é usado pelo cliente HTTP
+compartilhado e pelo pool asyncio; a taxa vem de `CAMARA_TAXA_MAX`
+(requisições por segundo; ausente ou 0 = sem limite) e a rajada de
+`CAMARA_RAJADA` (padrão: a própria taxa). O script sequencial de `app/`,
+que pausava 0,5 s por deputado, usa `TAXA_PADRAO_APP` quando a variável não
+está definida; as Lambdas só são limitadas se a taxa for configurada.
+"""
+import os
+import threading
+import time
+
+# Ritmo da antiga pausa de 0,5 s entre deputados de `app/obter_detalhes_deputado.py`
+TAXA_PADRAO_APP = 2.0
+
+
+def configuracao_ambiente():
+    """Taxa e rajada configuradas pelas variáveis de ambiente: (taxa ou None, rajada ou None)"""
+    taxa = float(os.environ.get('CAMARA_TAXA_MAX') or 0) or None
+    rajada = float(os.environ.get('CAMARA_RAJADA') or 0) or None
+    return taxa, rajada
+
+
+class LimitadorTaxa:
+    """
+    Token bucket seguro entre threads e tarefas asyncio.
+
+    Args:
+        taxa (float, optional): Requisições por segundo (None ou 0 = sem limite)
+        rajada (float, optional): Fichas acumuladas no máximo (padrão: `taxa`, mínimo 1)
+    """
+
+    def __init__(self, taxa=None, rajada=None, relogio=time.monotonic):
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self.configurar(taxa, rajada)
+
+    def configurar(self, taxa=None, rajada=None):
+        """Troca taxa e rajada (o balde começa cheio) e zera os contadores"""
+        with self._lock:
+            self.taxa = float(taxa) if taxa and taxa > 0 else None
+            self.rajada = max(1.0, float(rajada or self.taxa or 1))
+            self._fichas = self.rajada
+            self._atualizado_em = self._relogio()
+            self.requisicoes = 0
+            self.esperas = 0
+            self.tempo_espera_s = 0.0
+
+    def _reservar(self):
+        """Retira uma ficha (o saldo pode ficar negativo) e devolve a espera até ela existir"""
+        if self.taxa is None:
+            return 0.0
+        with self._lock:
+            agora = self._relogio()
+            self._fichas = min(self.rajada, self._fichas + (agora - self._atualizado_em) * self.taxa)
+            self._atualizado_em = agora
+            self._fichas -= 1
+            self.requisicoes += 1
+            if self._fichas >= 0:
+                return 0.0
+            espera = -self._fichas / self.taxa
+            self.esperas += 1
+            self.tempo_espera_s += espera
+            return espera
+
+    def aguardar(self):
+        """Bloqueia a thread até a requisição caber na taxa"""
+        espera = self._reservar()
+        if espera:
+            time.sleep(espera)
+
+    async def aguardar_async(self):
+        """Equivalente a `aguardar` para tarefas do event loop"""
+        espera = self._reservar()
+        if espera:
+            import asyncio  # Só o motor asyncio precisa; fica fora do cold start dos demais
+
+            await asyncio.sleep(espera)
+
+    def resumo(self):
+        """Estatísticas do limitador para o payload de `stats`"""
+        with self._lock:
+            return {
+                'taxa_max': self.taxa,
+                'rajada': self.rajada if self.taxa is not None else None,
+                'requisicoes': self.requisicoes,
+                'esperas': self.esperas,
+                'tempo_espera_s': round(self.tempo_espera_s, 3)
+            }
+
+
+_limitador_padrao = None
+_limitador_lock = threading.Lock()
+
+
+def limitador_padrao():
+    """Limitador compartilhado pelo processo, configurado por `configuracao_ambiente()`"""
+    global _limitador_padrao
+    if _limitador_padrao is None:
+        with _limitador_lock:
+            if _limitador_padrao is None:
+                _limitador_padrao = LimitadorTaxa(*configuracao_ambiente())
+    return _limitador_padrao
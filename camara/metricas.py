@@ -0,0 +1,150 @@
+"""
+Métricas da coleta paralela sem disputa entre os workers.
+
+Cada thread (ou o event loop, no motor asyncio) registra em um
+`MetricasWorker` só dela, obtido de um `threading.local`: contadores e
+histogramas de latência são atualizados sem lock. O único ponto
+sincronizado é o cadastro do worker, uma vez por thread. No fim da coleta,
+`Metricas.resumo()` combina os histogramas de todos os workers.
+
+Fases registradas por requisição:
+
+* `fila`: do envio ao pool até a requisição sair (thread livre, vaga do
+  controlador de concorrência, limite de taxa e conexão do pool);
+* `conexao`: abertura de conexão TCP/TLS (só quando não há conexão ociosa);
+* `transferencia`: da escrita da requisição ao último byte do corpo, sem o
+  tempo de parse intercalado no streaming;
+* `parse`: extração do registro a partir do XML;
+* `total`: do envio ao pool até o resultado.
+
+O `total` também é separado por tipo de resultado ('sucesso' ou o
+`error_type`). Os histogramas têm faixas logarítmicas de ~5%, então os
+percentis têm esse erro relativo e a memória não cresce com o número de
+requisições.
+"""
+import math
+import threading
+
+FASES = ('fila', 'conexao', 'transferencia', 'parse', 'total')
+PERCENTIS = (50, 95, 99)
+
+# Faixas do histograma: limite superior da faixa i = MINIMO_S * BASE ** i
+MINIMO_S = 1e-5
+BASE = 1.05
+_LOG_BASE = math.log(BASE)
+
+
+def _faixa(segundos):
+    if segundos <= MINIMO_S:
+        return 0
+    return int(math.ceil(math.log(segundos / MINIMO_S) / _LOG_BASE))
+
+
+class Histograma:
+    """Histograma de latências em faixas logarítmicas"""
+
+    def __init__(self):
+        self.faixas = {}
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        indice = _faixa(segundos)
+        self.faixas[indice] = self.faixas.get(indice, 0) + 1
+        self.total += 1
+        self.soma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def combinar(self, outro):
+        for indice, quantidade in outro.faixas.items():
+            self.faixas[indice] = self.faixas.get(indice, 0) + quantidade
+        self.total += outro.total
+        self.soma += outro.soma
+        self.maximo = max(self.maximo, outro.maximo)
+
+    def percentil(self, percentil):
+        """Limite superior da faixa que contém o percentil (None sem amostras)"""
+        if not self.total:
+            return None
+        posicao = max(1, math.ceil(percentil / 100 * self.total))
+        acumulado = 0
+        for indice in sorted(self.faixas):
+            acumulado += self.faixas[indice]
+            if acumulado >= posicao:
+                return min(MINIMO_S * BASE ** indice, self.maximo)
+        return self.maximo
+
+    def resumo(self):
+        resumo = {'n': self.total}
+        for percentil in PERCENTIS:
+            valor = self.percentil(percentil)
+            resumo[f'p{percentil}_s'] = round(valor, 4) if valor is not None else None
+        resumo['media_s'] = round(self.soma / self.total, 4) if self.total else None
+        resumo['max_s'] = round(self.maximo, 4) if self.total else None
+        return resumo
+
+
+class MetricasWorker:
+    """Contadores e histogramas de um único worker (sem lock: só a thread dona escreve)"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.fases = {}
+        self.por_tipo = {}
+        self.contadores = {}
+
+    def registrar(self, fase, segundos):
+        histograma = self.fases.get(fase)
+        if histograma is None:
+            histograma = self.fases[fase] = Histograma()
+        histograma.registrar(segundos)
+
+    def registrar_resultado(self, tipo, total_s):
+        """Tempo total de uma requisição, separado por tipo de resultado"""
+        self.registrar('total', total_s)
+        histograma = self.por_tipo.get(tipo)
+        if histograma is None:
+            histograma = self.por_tipo[tipo] = Histograma()
+        histograma.registrar(total_s)
+
+    def incrementar(self, contador, quantidade=1):
+        self.contadores[contador] = self.contadores.get(contador, 0) + quantidade
+
+
+class Metricas:
+    """Métricas de uma coleta: um `MetricasWorker` por thread, combinados no resumo"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def do_worker(self):
+        """Métricas da thread atual (cadastradas no primeiro uso)"""
+        worker = getattr(self._local, 'worker', None)
+        if worker is None:
+            worker = MetricasWorker(threading.current_thread().name)
+            with self._lock:
+                self._workers.append(worker)
+            self._local.worker = worker
+        return worker
+
+    def resumo(self):
+        """Percentis por fase e por tipo de resultado, e contadores somados"""
+        with self._lock:
+            workers = list(self._workers)
+        fases, por_tipo, contadores = {}, {}, {}
+        for worker in workers:
+            for destino, origem in ((fases, worker.fases), (por_tipo, worker.por_tipo)):
+                for nome, histograma in list(origem.items()):
+                    destino.setdefault(nome, Histograma()).combinar(histograma)
+            for nome, quantidade in list(worker.contadores.items()):
+                contadores[nome] = contadores.get(nome, 0) + quantidade
+        return {
+            'workers': len(workers),
+            'fases': {fase: fases[fase].resumo() for fase in FASES if fase in fases},
+            'por_tipo': {tipo: histograma.resumo() for tipo, histograma in sorted(por_tipo.items())},
+            'contadores': contadores
+        }
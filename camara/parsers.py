@@ -0,0 +1,53 @@
+"""
+Parse incremental (streaming) das respostas XML da Câmara.
+
+Os blocos do corpo alimentam um `XMLPullParser` à medida que chegam do
+socket; cada elemento de interesse é entregue assim que fecha e depois
+esvaziado, de modo que o documento inteiro nunca fica em memória (nem como
+bytes, nem como árvore): do registro sobra só o nó vazio no pai.
+
+O parser só emite eventos 'end'. Com 'start' também, dava para remover o nó
+do pai, mas o número de eventos percorridos em Python dobra e o parse fica
+~35% mais lento (`benchmarks/bench_parsers.py`); os nós vazios custam ~100
+bytes por registro, pouco perto do próprio registro extraído.
+"""
+import xml.etree.ElementTree as ET
+
+
+class DocumentoVazio(ValueError):
+    """A resposta não tem conteúdo XML"""
+
+
+def _elementos_completos(parser, tag):
+    for _, elem in parser.read_events():
+        if elem.tag == tag:
+            yield elem
+            # Libera o conteúdo do elemento já processado
+            elem.clear()
+
+
+def iterar_elementos(blocos, tag):
+    """
+    Gera cada elemento `tag` do documento, à medida que é concluído.
+
+    O elemento só é válido durante a iteração: ele é limpo logo em seguida.
+
+    Args:
+        blocos (iterable[bytes]): Corpo da resposta em blocos
+        tag (str): Nome do elemento a ser gerado (ex.: 'deputado')
+
+    Raises:
+        DocumentoVazio: Nenhum conteúdo além de espaços em branco
+        xml.etree.ElementTree.ParseError: XML malformado ou truncado
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    vazio = True
+    for bloco in blocos:
+        if vazio and bloco.strip():
+            vazio = False
+        parser.feed(bloco)
+        yield from _elementos_completos(parser, tag)
+    if vazio:
+        raise DocumentoVazio('Resposta vazia')
+    parser.close()
+    yield from _elementos_completos(parser, tag)
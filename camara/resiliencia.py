@@ -0,0 +1,283 @@
+"""
+Retentativas com backoff exponencial e jitter, e circuit breaker, para a API da Câmara.
+
+Uma falha transitória (timeout, conexão recusada, 5xx, 429) não deve virar
+erro definitivo na saída: o resultado volta para a fila e o deputado é
+reenviado depois de um atraso exponencial com jitter completo (sorteado entre
+0 e `base_s * 2**tentativa`, limitado a `maximo_s`), o que espalha as
+retentativas no tempo em vez de sincronizá-las.
+
+Quando a API está de fato fora do ar, insistir só desperdiça workers até o
+timeout. O `CircuitBreaker` acompanha a taxa de falhas retentáveis em uma
+janela dos resultados mais recentes; acima do limiar ele abre e o envio de
+novas requisições é pausado por `pausa_s`. Depois da pausa, uma requisição de
+sonda (meio-aberto) decide se o circuito fecha ou volta a abrir. Se o
+circuito ficar aberto mais que `max_aberto_s` no total, os deputados ainda
+pendentes são encerrados como `circuit_open` (e podem ser buscados numa
+retomada).
+"""
+import heapq
+import itertools
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Tipos de erro transitórios; 'http_error' só para os status abaixo
+TIPOS_RETENTAVEIS = ('url_error', 'http_error', 'empty_response', 'future_exception')
+STATUS_RETENTAVEIS = (408, 429, 500, 502, 503, 504)
+_STATUS = re.compile(r'HTTP (\d{3})')
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+MEIO_ABERTO = 'meio_aberto'
+
+
+def retentavel(resultado):
+    """Indica se o resultado de erro é transitório e vale uma nova tentativa"""
+    if not resultado or resultado.get('detalhes_success'):
+        return False
+    tipo = resultado.get('error_type')
+    if tipo not in TIPOS_RETENTAVEIS:
+        return False
+    if tipo == 'http_error':
+        status = _STATUS.search(resultado.get('detalhes_error', ''))
+        return bool(status) and int(status.group(1)) in STATUS_RETENTAVEIS
+    return True
+
+
+class PoliticaRetentativa:
+    """
+    Backoff exponencial com jitter completo.
+
+    Args:
+        max_retentativas (int): Novas tentativas por deputado (0 desliga)
+        base_s (float): Atraso base da primeira retentativa
+        maximo_s (float): Teto do atraso
+    """
+
+    def __init__(self, max_retentativas=3, base_s=0.5, maximo_s=8.0, aleatorio=random.random):
+        self.max_retentativas = max(0, max_retentativas)
+        self.base_s = base_s
+        self.maximo_s = maximo_s
+        self._aleatorio = aleatorio
+
+    def atraso(self, tentativa):
+        """Atraso antes da retentativa `tentativa` (1 = primeira retentativa)"""
+        teto = min(self.maximo_s, self.base_s * (2 ** (tentativa - 1)))
+        return teto * self._aleatorio()
+
+
+class CircuitBreaker:
+    """
+    Circuito fechado/aberto/meio-aberto sobre a taxa de falhas recente.
+
+    Args:
+        janela (int): Resultados recentes considerados
+        min_amostras (int): Resultados na janela antes de o circuito poder abrir
+        limiar_falhas (float): Fração de falhas na janela que abre o circuito
+        pausa_s (float): Tempo aberto antes de uma sonda
+        max_aberto_s (float): Tempo total aberto a partir do qual a coleta desiste
+    """
+
+    def __init__(self, janela=20, min_amostras=10, limiar_falhas=0.5, pausa_s=5.0,
+                 max_aberto_s=60.0, relogio=time.monotonic):
+        self.janela = deque(maxlen=janela)
+        self.min_amostras = min_amostras
+        self.limiar_falhas = limiar_falhas
+        self.pausa_s = pausa_s
+        self.max_aberto_s = max_aberto_s
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self.estado = FECHADO
+        self._aberto_em = None
+        self._meio_aberto_em = None
+        self._sonda_em_voo = False
+        self.aberturas = 0
+        self.tempo_aberto_s = 0.0
+
+    def permitir(self):
+        """Indica se uma nova requisição pode ser enviada agora (reserva a sonda no meio-aberto)"""
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO and self._relogio() - self._aberto_em >= self.pausa_s:
+                self._contabilizar_aberto()
+                self.estado = MEIO_ABERTO
+                self._meio_aberto_em = self._relogio()
+                logger.info("Circuit breaker meio-aberto: enviando requisição de sonda")
+            if self.estado == MEIO_ABERTO and not self._sonda_em_voo:
+                self._sonda_em_voo = True
+                return True
+            return False
+
+    def espera(self):
+        """Segundos até o circuito poder liberar uma sonda (None se não estiver aberto)"""
+        with self._lock:
+            if self.estado != ABERTO:
+                return None
+            return max(0.0, self.pausa_s - (self._relogio() - self._aberto_em))
+
+    def esgotado(self):
+        """O circuito não está fechado e já ficou aberto mais que `max_aberto_s` no total"""
+        with self._lock:
+            if self.estado == FECHADO:
+                return False
+            aberto = self.tempo_aberto_s
+            if self.estado == ABERTO:
+                aberto += self._relogio() - self._aberto_em
+            return aberto >= self.max_aberto_s
+
+    def registrar(self, falha, enviado_em=None):
+        """
+        Registra o resultado de uma requisição (falha = erro retentável).
+
+        Com `enviado_em` (relógio do breaker), respostas de requisições
+        enviadas antes do meio-aberto não são tomadas pela resposta da sonda.
+        """
+        with self._lock:
+            if self.estado == MEIO_ABERTO:
+                if enviado_em is not None and enviado_em < self._meio_aberto_em:
+                    return
+                self._sonda_em_voo = False
+                if falha:
+                    self._abrir()
+                else:
+                    self.estado = FECHADO
+                    self.janela.clear()
+                    logger.info("Circuit breaker fechado: a API voltou a responder")
+                return
+            if self.estado == ABERTO:
+                # Resposta de uma requisição enviada antes da abertura
+                return
+            self.janela.append(falha)
+            if len(self.janela) >= self.min_amostras \
+                    and sum(self.janela) / len(self.janela) >= self.limiar_falhas:
+                self._abrir()
+
+    def _abrir(self):
+        # Chamado com self._lock adquirido
+        self.estado = ABERTO
+        self._aberto_em = self._relogio()
+        self.aberturas += 1
+        logger.warning(f"Circuit breaker aberto: envio pausado por {self.pausa_s}s")
+
+    def _contabilizar_aberto(self):
+        self.tempo_aberto_s += self._relogio() - self._aberto_em
+
+    def resumo(self):
+        return {
+            'estado': self.estado,
+            'aberturas': self.aberturas,
+            'tempo_aberto_s': round(self.tempo_aberto_s, 3)
+        }
+
+
+class FilaRetentativas:
+    """Deputados aguardando uma nova tentativa, em ordem de horário liberado"""
+
+    def __init__(self, relogio=time.monotonic):
+        self._heap = []
+        self._sequencia = itertools.count()
+        self._relogio = relogio
+
+    def __len__(self):
+        return len(self._heap)
+
+    def agendar(self, item, tentativa, atraso):
+        heapq.heappush(self._heap, (self._relogio() + atraso, next(self._sequencia), item, tentativa))
+
+    def prontos(self):
+        """Retira os itens cujo atraso já passou: lista de (item, tentativa)"""
+        agora = self._relogio()
+        prontos = []
+        while self._heap and self._heap[0][0] <= agora:
+            _, _, item, tentativa = heapq.heappop(self._heap)
+            prontos.append((item, tentativa))
+        return prontos
+
+    def espera(self):
+        """Segundos até o próximo item ficar pronto (None se a fila estiver vazia)"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._relogio())
+
+    def esvaziar(self):
+        itens = [(item, tentativa) for _, _, item, tentativa in self._heap]
+        self._heap = []
+        return itens
+
+
+class Resiliencia:
+    """
+    Política de retentativas, circuit breaker e contadores de uma coleta.
+
+    Args:
+        politica (PoliticaRetentativa, optional): Padrão: 3 retentativas
+        breaker (CircuitBreaker, optional): None desliga o circuit breaker
+    """
+
+    def __init__(self, politica=None, breaker=None):
+        self.politica = politica or PoliticaRetentativa()
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self.retentativas = {}
+        self.recuperados = 0
+        self.desistencias = 0
+
+    def registrar(self, resultado, tentativa, enviado_em=None):
+        """
+        Registra o resultado da tentativa `tentativa` (0 = primeira).
+
+        Args:
+            enviado_em (float, optional): `time.monotonic()` do envio da requisição
+
+        Returns:
+            float or None: atraso até a próxima tentativa, ou None se o
+            resultado é definitivo (inclusive depois que o circuito se esgotou)
+        """
+        falha = retentavel(resultado)
+        if self.breaker is not None:
+            self.breaker.registrar(falha, enviado_em)
+        with self._lock:
+            if not falha:
+                if tentativa > 0 and resultado.get('detalhes_success'):
+                    self.recuperados += 1
+                return None
+            if tentativa >= self.politica.max_retentativas or self.esgotado():
+                return None
+            tipo = resultado.get('error_type', 'unknown')
+            self.retentativas[tipo] = self.retentativas.get(tipo, 0) + 1
+        return self.politica.atraso(tentativa + 1)
+
+    def permitir(self):
+        return self.breaker is None or self.breaker.permitir()
+
+    def espera(self):
+        return None if self.breaker is None else self.breaker.espera()
+
+    def esgotado(self):
+        return self.breaker is not None and self.breaker.esgotado()
+
+    def resultado_circuito_aberto(self, deputado):
+        """Registro de erro para um deputado não enviado porque o circuito não fechou"""
+        with self._lock:
+            self.desistencias += 1
+        return {
+            **deputado,
+            'detalhes_error': 'Circuit breaker aberto: API indisponível',
+            'error_type': 'circuit_open'
+        }
+
+    def resumo(self):
+        return {
+            'max_retentativas': self.politica.max_retentativas,
+            'retentativas': dict(self.retentativas),
+            'recuperados': self.recuperados,
+            'desistencias': self.desistencias,
+            'circuit_breaker': self.breaker.resumo() if self.breaker is not None else None
+        }
@@ -0,0 +1,543 @@
+"""
+Formatos de saída dos arquivos da landing zone.
+
+`json` (padrão) mantém os arrays JSON de sempre. `ndjson` grava um registro
+por linha, sem indentação, comprimido com gzip à medida que é serializado
+(`Content-Encoding: gzip`), sem montar o texto inteiro em memória. `parquet`
+grava arquivos colunares, tipados e comprimidos, com um esquema explícito por
+tabela e particionamento no estilo Hive (`dt=AAAA-MM-DD`) sob os prefixos
+existentes:
+
+    camara/deputados/deputados_20250101_120000.json                      (json)
+    camara/deputados/deputados_20250101_120000.ndjson.gz                 (ndjson)
+    camara/deputados/deputados/dt=2025-01-01/deputados_20250101_120000.parquet
+
+Os esquemas são declarados com tipos simples ('string', 'int64', 'double',
+'bool', 'date', 'timestamp') e ('list', tipo) / ('struct', [(campo, tipo)]).
+Cada valor é normalizado para o tipo da coluna antes da conversão: campos
+fora do esquema são descartados e valores que não convertem viram nulos, em
+vez de derrubar a gravação do arquivo inteiro.
+
+`pyarrow` é uma dependência opcional, importada apenas quando o formato
+`parquet` é usado.
+"""
+import base64
+import gzip
+import io
+import itertools
+import json
+import logging
+import zlib
+from datetime import date, datetime
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ('json', 'ndjson', 'parquet')
+COMPRESSAO_PARQUET = 'snappy'
+
+CONTENT_TYPES = {
+    'json': 'application/json; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+CONTENT_ENCODINGS = {
+    'ndjson': 'gzip',
+}
+
+EXTENSOES = {
+    'json': '.json',
+    'ndjson': '.ndjson.gz',
+    'parquet': '.parquet',
+}
+
+# Registros codificados por vez antes de passar pelo compressor gzip
+LOTE_NDJSON = 500
+
+
+class FormatoInvalido(ValueError):
+    """Formato de saída desconhecido"""
+
+
+def validar_formato(formato):
+    if formato not in FORMATOS:
+        raise FormatoInvalido(f"Formato '{formato}' inválido; use um de {FORMATOS}")
+    return formato
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "O formato 'parquet' requer o pacote pyarrow na layer da Lambda"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+# ---------------------------------------------------------------------------
+# Esquemas
+# ---------------------------------------------------------------------------
+
+def _colunas(tipo, *campos):
+    return [(campo, tipo) for campo in campos]
+
+
+_DEPUTADO_LISTA = _colunas(
+    'string', 'ideCadastro', 'condicao', 'nome', 'nomeParlamentar', 'urlFoto',
+    'sexo', 'uf', 'partido', 'gabinete', 'anexo', 'fone', 'email'
+)
+
+_DETALHES = [
+    *_colunas('string', 'nomeProfissao'),
+    *_colunas('date', 'dataNascimento', 'dataFalecimento'),
+    *_colunas('string', 'ufRepresentacaoAtual', 'situacaoNaLegislaturaAtual',
+              'nomeParlamentarAtual', 'nomeCivil'),
+    ('partidoAtual', ('struct', _colunas('string', 'sigla', 'nome'))),
+    ('gabinete_detalhes', ('struct', _colunas('string', 'numero', 'anexo', 'telefone'))),
+    *_colunas('int32', 'num_comissoes', 'num_periodos_exercicio', 'num_liderancas'),
+]
+
+ESQUEMAS = {
+    'deputados': _DEPUTADO_LISTA,
+    'deputados_unificado': [
+        *_DEPUTADO_LISTA,
+        *_DETALHES,
+        ('hash_registro', 'string'),
+        ('detalhes_success', 'bool'),
+        ('processed_by_thread', 'string'),
+        ('detalhes_obtidos_em', 'timestamp'),
+        ('detalhes_error', 'string'),
+        ('error_type', 'string'),
+    ],
+    'deputados_resumo': [
+        *_colunas('string', 'ideCadastro', 'nome', 'nomeParlamentar', 'nomeParlamentarAtual', 'partido'),
+        ('partidoAtual', ('struct', _colunas('string', 'sigla', 'nome'))),
+        *_colunas('string', 'uf', 'ufRepresentacaoAtual', 'condicao',
+                  'situacaoNaLegislaturaAtual', 'email', 'sexo'),
+        ('dataNascimento', 'date'),
+        *_colunas('int32', 'num_comissoes', 'num_periodos_exercicio', 'num_liderancas'),
+    ],
+    'deputados_comissoes': [
+        *_colunas('string', 'ideCadastro', 'idOrgaoLegislativoCD', 'siglaComissao',
+                  'nomeComissao', 'condicaoMembro'),
+        *_colunas('date', 'dataEntrada', 'dataSaida'),
+    ],
+    'deputados_periodos_exercicio': [
+        *_colunas('string', 'ideCadastro', 'siglaUFRepresentacao', 'situacaoExercicio'),
+        *_colunas('date', 'dataInicio', 'dataFim'),
+        *_colunas('string', 'idCausaFimExercicio', 'descricaoCausaFimExercicio',
+                  'idCadastroParlamentarAnterior'),
+    ],
+    'deputados_liderancas': [
+        *_colunas('string', 'ideCadastro', 'idHistoricoLider', 'idCargoLideranca',
+                  'descricaoCargoLideranca'),
+        ('numOrdemCargo', 'int32'),
+        *_colunas('date', 'dataDesignacao', 'dataTermino'),
+        *_colunas('string', 'codigoUnidadeLideranca', 'siglaUnidadeLideranca',
+                  'idBlocoPartido', 'nomeBloco'),
+    ],
+    'partidos_completo': [
+        *_colunas('string', 'idPartido', 'siglaPartido', 'nomePartido'),
+        *_colunas('date', 'dataCriacao', 'dataExtincao'),
+    ],
+}
+
+# Os arquivos de sucessos e de erros têm as colunas do unificado
+ESQUEMAS['deputados_sucessos'] = ESQUEMAS['deputados_unificado']
+ESQUEMAS['deputados_erros'] = ESQUEMAS['deputados_unificado']
+
+# Coleções do sample_mflix
+_AVALIACAO = ('struct', [('rating', 'double'), ('numReviews', 'int64'), ('meter', 'int64')])
+_FILME = [
+    ('_id', 'string'),
+    *_colunas('string', 'title', 'plot', 'fullplot', 'poster', 'rated', 'type', 'lastupdated'),
+    *_colunas(('list', 'string'), 'genres', 'cast', 'languages', 'directors', 'writers', 'countries'),
+    *_colunas('int64', 'runtime', 'year', 'metacritic', 'num_mflix_comments'),
+    ('released', 'timestamp'),
+    ('awards', ('struct', [('wins', 'int64'), ('nominations', 'int64'), ('text', 'string')])),
+    ('imdb', ('struct', [('rating', 'double'), ('votes', 'int64'), ('id', 'int64')])),
+    ('tomatoes', ('struct', [
+        ('viewer', _AVALIACAO),
+        ('critic', _AVALIACAO),
+        ('fresh', 'int64'),
+        ('rotten', 'int64'),
+        ('lastUpdated', 'timestamp'),
+        ('dvd', 'timestamp'),
+        *_colunas('string', 'production', 'website', 'boxOffice', 'consensus'),
+    ])),
+]
+
+ESQUEMAS_MFLIX = {
+    'comments': [
+        *_colunas('string', '_id', 'name', 'email', 'movie_id', 'text'),
+        ('date', 'timestamp'),
+    ],
+    'movies': _FILME,
+    'embedded_movies': [*_FILME, ('plot_embedding', ('list', 'double'))],
+    'sessions': _colunas('string', '_id', 'user_id', 'jwt'),
+    'theaters': [
+        ('_id', 'string'),
+        ('theaterId', 'int64'),
+        ('location', ('struct', [
+            ('address', ('struct', _colunas('string', 'street1', 'street2', 'city', 'state', 'zipcode'))),
+            ('geo', ('struct', [('type', 'string'), ('coordinates', ('list', 'double'))])),
+        ])),
+    ],
+    'users': _colunas('string', '_id', 'name', 'email', 'password'),
+}
+
+
+# ---------------------------------------------------------------------------
+# Normalização dos valores
+# ---------------------------------------------------------------------------
+
+def _para_string(valor):
+    return valor if isinstance(valor, str) else str(valor)
+
+
+def _para_inteiro(valor):
+    if isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, int):
+        return valor
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return int(numero) if numero.is_integer() else None
+
+
+def _para_real(valor):
+    if hasattr(valor, 'to_decimal'):  # bson.Decimal128
+        valor = valor.to_decimal()
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if numero == numero else None  # NaN vira nulo
+
+
+def _para_bool(valor):
+    if isinstance(valor, str):
+        return {'true': True, 'false': False}.get(valor.strip().lower())
+    return bool(valor)
+
+
+def _para_data(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if not isinstance(valor, str):
+        return None
+    # A API da Câmara usa dd/mm/aaaa; ISO para valores já normalizados
+    for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(valor[:10], formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _para_timestamp(valor):
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, str):
+        try:
+            return datetime.fromisoformat(valor)
+        except ValueError:
+            return None
+    return None
+
+
+_CONVERSORES = {
+    'string': _para_string,
+    'int32': _para_inteiro,
+    'int64': _para_inteiro,
+    'double': _para_real,
+    'bool': _para_bool,
+    'date': _para_data,
+    'timestamp': _para_timestamp,
+}
+
+
+def _normalizador(tipo):
+    """Compila uma função valor -> valor normalizado para o tipo"""
+    if tipo == 'string':
+        return lambda valor: None if valor is None else _para_string(valor)
+    if isinstance(tipo, str):
+        # Texto vazio (ex.: `findtext` de elemento vazio) é nulo nas colunas não textuais
+        conversor = _CONVERSORES[tipo]
+        return lambda valor: None if valor is None or valor == '' else conversor(valor)
+
+    especie, detalhe = tipo
+    if especie == 'list':
+        item = _normalizador(detalhe)
+        return lambda valor: [item(v) for v in valor] if isinstance(valor, (list, tuple)) else None
+
+    if especie == 'struct':
+        campos = [(campo, _normalizador(subtipo)) for campo, subtipo in detalhe]
+        return lambda valor: (
+            {campo: normalizar(valor.get(campo)) for campo, normalizar in campos}
+            if isinstance(valor, dict) else None
+        )
+
+    raise ValueError(f"Tipo de coluna desconhecido: {tipo!r}")
+
+
+def _tipo_arrow(pa, tipo):
+    if isinstance(tipo, str):
+        return {
+            'string': pa.string(),
+            'int32': pa.int32(),
+            'int64': pa.int64(),
+            'double': pa.float64(),
+            'bool': pa.bool_(),
+            'date': pa.date32(),
+            'timestamp': pa.timestamp('ms'),
+        }[tipo]
+    especie, detalhe = tipo
+    if especie == 'list':
+        return pa.list_(_tipo_arrow(pa, detalhe))
+    return pa.struct([(campo, _tipo_arrow(pa, subtipo)) for campo, subtipo in detalhe])
+
+
+# ---------------------------------------------------------------------------
+# Serialização
+# ---------------------------------------------------------------------------
+
+def padrao_json(valor):
+    """
+    `default` do JSON: datas em ISO 8601, binários em base64, demais tipos (ex.: ObjectId) como texto.
+
+    São as mesmas conversões do codec JSON do `mongo_mflix`, então documentos
+    lidos com tipos nativos (exportação incremental e change stream) saem
+    iguais aos da exportação completa.
+    """
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (bytes, bytearray)):
+        # bson.Binary é subclasse de bytes
+        return base64.b64encode(valor).decode('ascii')
+    if hasattr(valor, 'as_datetime'):
+        # bson.Timestamp
+        return valor.as_datetime().isoformat()
+    return str(valor)
+
+
+def serializar_json(dados):
+    return json.dumps(dados, ensure_ascii=False, indent=2, default=padrao_json).encode('utf-8')
+
+
+def em_lotes(registros, tamanho):
+    """Agrupa um iterável (ex.: cursor) em listas de até `tamanho` itens"""
+    iterador = iter(registros)
+    while True:
+        lote = list(itertools.islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def serializar_ndjson(registros, nivel=6):
+    """
+    Um registro JSON compacto por linha, comprimido com gzip incrementalmente.
+
+    Os registros são codificados em lotes de `LOTE_NDJSON` e cada lote passa
+    pelo compressor logo em seguida: só o resultado comprimido se acumula em
+    memória, nunca o texto completo nem sua versão em bytes.
+
+    Args:
+        registros (iterable[dict]): Registros a gravar (pode ser um gerador)
+        nivel (int): Nível de compressão do gzip (1-9)
+
+    Returns:
+        bytes: Conteúdo gzip
+    """
+    saida = io.BytesIO()
+    escritor = EscritorNdjson(saida, nivel=nivel)
+    for lote in em_lotes(registros, LOTE_NDJSON):
+        escritor.escrever(lote)
+    escritor.fechar()
+    return saida.getvalue()
+
+
+def _esquema_arrow(pa, esquema):
+    schema = pa.schema([(campo, _tipo_arrow(pa, tipo)) for campo, tipo in esquema])
+    normalizadores = [(campo, _normalizador(tipo)) for campo, tipo in esquema]
+    return schema, normalizadores
+
+
+def _tabela_arrow(pa, schema, normalizadores, registros):
+    colunas = {
+        campo: [normalizar(registro.get(campo)) for registro in registros]
+        for campo, normalizar in normalizadores
+    }
+    return pa.Table.from_pydict(colunas, schema=schema)
+
+
+def serializar_parquet(registros, esquema):
+    """
+    Converte os registros em um arquivo Parquet com o esquema explícito.
+
+    Args:
+        registros (list[dict]): Linhas a gravar
+        esquema (list): Colunas [(nome, tipo)] (ver ESQUEMAS)
+
+    Returns:
+        bytes: Conteúdo do arquivo Parquet
+    """
+    pa, pq = _pyarrow()
+    schema, normalizadores = _esquema_arrow(pa, esquema)
+    tabela = _tabela_arrow(pa, schema, normalizadores, registros)
+
+    buffer = io.BytesIO()
+    pq.write_table(tabela, buffer, compression=COMPRESSAO_PARQUET)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Escrita em streaming
+# ---------------------------------------------------------------------------
+#
+# Os escritores recebem os registros lote a lote e gravam cada lote já
+# serializado em `destino` (qualquer objeto com `write(bytes)`, ex.:
+# `ArmazenamentoS3.abrir_escrita`). A memória usada é a de um lote.
+
+class EscritorJson:
+    """Array JSON indentado, idêntico ao de `serializar_json`, escrito por lotes"""
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.registros = 0
+
+    def escrever(self, lote):
+        partes = []
+        for registro in lote:
+            texto = json.dumps(registro, ensure_ascii=False, indent=2, default=padrao_json)
+            prefixo = '[\n  ' if self.registros == 0 else ',\n  '
+            partes.append(prefixo + texto.replace('\n', '\n  '))
+            self.registros += 1
+        if partes:
+            self.destino.write(''.join(partes).encode('utf-8'))
+
+    def fechar(self):
+        self.destino.write(b'\n]' if self.registros else b'[]')
+
+
+class EscritorNdjson:
+    """Um registro compacto por linha, comprimido com gzip à medida que chega"""
+
+    def __init__(self, destino, nivel=6):
+        self.destino = destino
+        self.registros = 0
+        self._codificar = json.JSONEncoder(
+            ensure_ascii=False, separators=(',', ':'), default=padrao_json
+        ).encode
+        self._compressor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def escrever(self, lote):
+        if not lote:
+            return
+        linhas = [self._codificar(registro) for registro in lote]
+        linhas.append('')
+        self.destino.write(self._compressor.compress('\n'.join(linhas).encode('utf-8')))
+        self.registros += len(lote)
+
+    def fechar(self):
+        self.destino.write(self._compressor.flush())
+
+
+class EscritorParquet:
+    """Arquivo Parquet com um row group por lote"""
+
+    def __init__(self, destino, esquema):
+        pa, pq = _pyarrow()
+        self._pa = pa
+        self.schema, self._normalizadores = _esquema_arrow(pa, esquema)
+        self._escritor = pq.ParquetWriter(destino, self.schema, compression=COMPRESSAO_PARQUET)
+        self.registros = 0
+
+    def escrever(self, lote):
+        if not lote:
+            return
+        self._escritor.write_table(_tabela_arrow(self._pa, self.schema, self._normalizadores, lote))
+        self.registros += len(lote)
+
+    def fechar(self):
+        self._escritor.close()
+
+
+def abrir_escritor(destino, formato, esquema=None):
+    """Escritor em streaming do formato sobre `destino`"""
+    formato = validar_formato(formato)
+    if formato == 'parquet':
+        return EscritorParquet(destino, esquema)
+    if formato == 'ndjson':
+        return EscritorNdjson(destino)
+    return EscritorJson(destino)
+
+
+def serializar(dados, formato, esquema=None):
+    """
+    Returns:
+        tuple: (corpo em bytes, content type, content encoding ou None)
+    """
+    formato = validar_formato(formato)
+    if formato == 'parquet':
+        return serializar_parquet(dados, esquema), CONTENT_TYPES['parquet'], None
+    if formato == 'ndjson':
+        return serializar_ndjson(dados), CONTENT_TYPES['ndjson'], CONTENT_ENCODINGS['ndjson']
+    return serializar_json(dados), CONTENT_TYPES['json'], None
+
+
+def ler_registros(conteudo, key):
+    """Lê os registros de um arquivo gravado em qualquer dos formatos (pela extensão do key)"""
+    if key.endswith(EXTENSOES['parquet']):
+        pa, pq = _pyarrow()
+        return pq.read_table(pa.BufferReader(conteudo)).to_pylist()
+    if key.endswith(EXTENSOES['ndjson']):
+        return [json.loads(linha) for linha in gzip.decompress(conteudo).splitlines() if linha]
+    return json.loads(conteudo)
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+def particao(timestamp):
+    """Partição Hive do dia de um timestamp `AAAAMMDD_HHMMSS`"""
+    return f"dt={timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
+
+
+def key_arquivo(prefixo, nome, timestamp, formato):
+    """
+    Key de um arquivo `{nome}_{timestamp}` sob o prefixo.
+
+    Em `parquet` cada nome vira uma tabela com partições por dia:
+    `{prefixo}/{nome}/dt=AAAA-MM-DD/{nome}_{timestamp}.parquet`.
+    """
+    if validar_formato(formato) == 'parquet':
+        return f"{prefixo}/{nome}/{particao(timestamp)}/{nome}_{timestamp}.parquet"
+    return f"{prefixo}/{nome}_{timestamp}{EXTENSOES[formato]}"
+
+
+def prefixo_snapshots(prefixo, nome, formato):
+    """
+    Prefixo que lista, em ordem cronológica, os arquivos `nome` do formato.
+
+    `json` e `ndjson` compartilham o prefixo: o snapshot mais recente é
+    encontrado mesmo que a execução anterior tenha usado o outro formato.
+    """
+    if validar_formato(formato) == 'parquet':
+        return f"{prefixo}/{nome}/dt="
+    return f"{prefixo}/{nome}_"
+
+
+def gravar(armazenamento, key, dados, formato, esquema=None):
+    """Serializa e grava os dados no formato; retorna o número de bytes gravados"""
+    corpo, content_type, content_encoding = serializar(dados, formato, esquema)
+    armazenamento.gravar(key, corpo, content_type=content_type, content_encoding=content_encoding)
+    return len(corpo)
@@ -0,0 +1,112 @@
+"""
+Tabelas filhas normalizadas dos detalhes dos deputados.
+
+`ObterDetalhesDeputado` traz, dentro de cada <Deputado>, as comissões, os
+períodos de exercício e o histórico de lideranças. Os extratores de detalhes
+incluem esses itens como listas (`CAMPOS_TABELAS_FILHAS`) e, antes da
+gravação, `separar_tabelas` as retira dos registros e devolve uma tabela por
+tipo, com uma linha por item e a chave `ideCadastro`. Os registros principais
+mantêm apenas as contagens (`num_comissoes`...).
+"""
+import logging
+
+from camara.extrator import Lista, Texto
+from camara.saida import ler_registros
+
+logger = logging.getLogger(__name__)
+
+CHAVE = 'ideCadastro'
+
+
+def _textos(*campos):
+    return {campo: Texto(limpar=True) for campo in campos}
+
+
+# tabela -> (tag do elemento em <Deputado>, campo de contagem, esquema de cada item)
+TABELAS_FILHAS = {
+    'comissoes': ('comissoes', 'num_comissoes', _textos(
+        'idOrgaoLegislativoCD', 'siglaComissao', 'nomeComissao',
+        'condicaoMembro', 'dataEntrada', 'dataSaida'
+    )),
+    'periodos_exercicio': ('periodosExercicio', 'num_periodos_exercicio', _textos(
+        'siglaUFRepresentacao', 'situacaoExercicio', 'dataInicio', 'dataFim',
+        'idCausaFimExercicio', 'descricaoCausaFimExercicio', 'idCadastroParlamentarAnterior'
+    )),
+    'liderancas': ('historicoLider', 'num_liderancas', _textos(
+        'idHistoricoLider', 'idCargoLideranca', 'descricaoCargoLideranca', 'numOrdemCargo',
+        'dataDesignacao', 'dataTermino', 'codigoUnidadeLideranca', 'siglaUnidadeLideranca',
+        'idBlocoPartido', 'nomeBloco'
+    )),
+}
+
+# Campos a incluir no esquema do extrator de <Deputado>
+CAMPOS_TABELAS_FILHAS = {
+    nome: Lista(esquema, tag=tag) for nome, (tag, _, esquema) in TABELAS_FILHAS.items()
+}
+
+
+def contar_itens(detalhes):
+    """Preenche as contagens (`num_comissoes`...) a partir das listas extraídas"""
+    for nome, (_, contagem, _) in TABELAS_FILHAS.items():
+        detalhes[contagem] = len(detalhes.get(nome) or [])
+    return detalhes
+
+
+def separar_tabelas(registros):
+    """
+    Retira as listas filhas de cada registro e as devolve normalizadas.
+
+    Returns:
+        dict: tabela -> lista de linhas `{'ideCadastro': ..., **item}`
+    """
+    tabelas = {nome: [] for nome in TABELAS_FILHAS}
+    for registro in registros:
+        for nome, linhas in tabelas.items():
+            itens = registro.pop(nome, None)
+            if itens:
+                linhas.extend({CHAVE: registro.get(CHAVE), **item} for item in itens)
+    return tabelas
+
+
+def anexar_tabelas(registros, tabelas):
+    """Devolve aos registros (ex.: reaproveitados de um snapshot) as listas das tabelas"""
+    for nome, linhas in tabelas.items():
+        por_chave = {}
+        for linha in linhas:
+            item = dict(linha)
+            por_chave.setdefault(item.pop(CHAVE), []).append(item)
+        for registro in registros:
+            registro[nome] = por_chave.get(registro.get(CHAVE), [])
+    return registros
+
+
+def key_tabela(key_unificado, nome):
+    """
+    Key da tabela filha gravada junto com o arquivo unificado.
+
+    Vale para os dois formatos de saída: em `parquet` o nome também é o
+    diretório da tabela (`deputados_unificado/dt=.../deputados_unificado_...`).
+    """
+    return key_unificado.replace('deputados_unificado', f'deputados_{nome}')
+
+
+def carregar_tabelas(armazenamento, key_unificado):
+    """
+    Carrega as tabelas filhas gravadas junto com um snapshot unificado.
+
+    Returns:
+        dict or None: tabela -> linhas, ou None se alguma não existir
+            (snapshot anterior às tabelas filhas)
+    """
+    tabelas = {}
+    for nome in TABELAS_FILHAS:
+        key = key_tabela(key_unificado, nome)
+        try:
+            conteudo = armazenamento.ler(key)
+        except Exception as e:
+            logger.warning(f"Tabela filha indisponível ({key}): {e}")
+            return None
+        if conteudo is None:
+            return None
+        tabelas[nome] = ler_registros(conteudo, key)
+    return tabelas
@@ -1,16 +1,41 @@
 import json
-import boto3
-import pymongo
 from datetime import datetime
 import logging
-from botocore.exceptions import ClientError
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from camara.armazenamento import cliente_s3, obter_armazenamento
+from camara.saida import (
+    CONTENT_ENCODINGS, CONTENT_TYPES, EXTENSOES, ESQUEMAS_MFLIX,
+    abrir_escritor, em_lotes, padrao_json, particao, validar_formato
+)
 
 # Configuração do logger
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def get_secret(secret_name, region_name="us-east-1"):
-    """Recupera o secret do AWS Secrets Manager"""
+# Estado reaproveitado entre invocações do mesmo container (warm start)
+SECRET_TTL_S = 300
+_cache_secrets = {}       # secret_name -> (secret, expira_em)
+_cache_cliente = {}       # 'client', 'uri', 'max_pool_size', 'compressors'
+_indice_vencedor = None   # Índice em CONFIGURACOES_CONEXAO da última configuração que conectou
+
+def get_secret(secret_name, region_name="us-east-1", ttl=SECRET_TTL_S):
+    """
+    Recupera o secret do AWS Secrets Manager.
+    
+    O valor fica em cache no container por `ttl` segundos: invocações warm
+    não repetem a chamada ao Secrets Manager.
+    """
+    em_cache = _cache_secrets.get(secret_name)
+    if em_cache and em_cache[1] > time.monotonic():
+        logger.info("Secret reaproveitado do cache do container")
+        return em_cache[0]
+    
+    # boto3 e pymongo são importados no primeiro uso, fora da fase de init
+    import boto3
+    from botocore.exceptions import ClientError
     
     # Create a Secrets Manager client
     session = boto3.session.Session()
@@ -22,111 +47,619 @@ def get_secret(secret_name, region_name="us-east-1"):
     try:
         get_secret_value_response = client.get_secret_value(SecretId=secret_name)
         secret = json.loads(get_secret_value_response['SecretString'])
+        _cache_secrets[secret_name] = (secret, time.monotonic() + ttl)
         return secret
     except ClientError as e:
         logger.error(f"Erro ao recuperar secret: {e}")
         raise e
 
-def connect_to_mongodb(mongo_uri):
-    """Conecta ao MongoDB usando a URI fornecida"""
-    try:
-        # Tentativa 1 - Configuração básica
-        logger.info("Tentativa 1 - Configuração básica")
-        client = pymongo.MongoClient(
-            mongo_uri,
-            serverSelectionTimeoutMS=30000,
-            connectTimeoutMS=20000,
-            socketTimeoutMS=20000,
-            maxPoolSize=1,
-            retryWrites=True
-        )
-        
-        # Teste a conexão
-        client.admin.command('ping')
-        logger.info("Conexão básica com MongoDB estabelecida")
-        return client
-        
-    except Exception as e1:
-        logger.error(f"Tentativa 1 falhou: {e1}")
-        
+def invalidar_secret(secret_name):
+    """Descarta o secret em cache (ex.: credenciais rotacionadas)"""
+    _cache_secrets.pop(secret_name, None)
+
+# Configurações tentadas em ordem; a que conectar é tentada primeiro nas próximas vezes
+CONFIGURACOES_CONEXAO = [
+    ("Configuração básica", lambda max_pool_size: {
+        'serverSelectionTimeoutMS': 30000,
+        'connectTimeoutMS': 20000,
+        'socketTimeoutMS': 20000,
+        'maxPoolSize': max_pool_size,
+        'retryWrites': True
+    }),
+    ("Com TLS básico", lambda max_pool_size: {
+        'tls': True,
+        'serverSelectionTimeoutMS': 45000,
+        'connectTimeoutMS': 30000,
+        'socketTimeoutMS': 30000,
+        'maxPoolSize': max_pool_size
+    }),
+    ("Configuração mínima", lambda max_pool_size: {}),
+]
+
+def connect_to_mongodb(mongo_uri, max_pool_size=1, compressors=None):
+    """
+    Conecta ao MongoDB usando a URI fornecida.
+    
+    As configurações de CONFIGURACOES_CONEXAO são tentadas em ordem, a
+    partir da que funcionou da última vez neste container.
+    
+    Args:
+        max_pool_size (int): Conexões do pool; uma por worker de exportação
+        compressors (str, optional): Compressão do protocolo, ex.: 'zstd,snappy,zlib'
+            (negociada com o servidor; zstd/snappy exigem os pacotes na layer)
+    """
+    import pymongo
+    
+    global _indice_vencedor
+    extras = {'compressors': compressors} if compressors else {}
+    ordem = list(range(len(CONFIGURACOES_CONEXAO)))
+    if _indice_vencedor is not None:
+        ordem.remove(_indice_vencedor)
+        ordem.insert(0, _indice_vencedor)
+    
+    ultimo_erro = None
+    for tentativa, indice in enumerate(ordem, start=1):
+        nome, configuracao = CONFIGURACOES_CONEXAO[indice]
+        client = None
         try:
-            # Tentativa 2 - Com TLS básico
-            logger.info("Tentativa 2 - Com TLS básico")
-            client = pymongo.MongoClient(
-                mongo_uri,
-                tls=True,
-                serverSelectionTimeoutMS=45000,
-                connectTimeoutMS=30000,
-                socketTimeoutMS=30000,
-                maxPoolSize=1
-            )
+            logger.info(f"Tentativa {tentativa} - {nome}")
+            client = pymongo.MongoClient(mongo_uri, **configuracao(max_pool_size), **extras)
             
+            # Teste a conexão
             client.admin.command('ping')
-            logger.info("Conexão TLS com MongoDB estabelecida")
+            logger.info(f"Conexão com MongoDB estabelecida ({nome})")
+            _indice_vencedor = indice
             return client
             
-        except Exception as e2:
-            logger.error(f"Tentativa 2 falhou: {e2}")
-            
+        except Exception as e:
+            logger.error(f"Tentativa {tentativa} falhou: {e}")
+            ultimo_erro = e
+            if client is not None:
+                client.close()
+    
+    logger.error(f"Todas as tentativas falharam. Último erro: {ultimo_erro}")
+    raise ultimo_erro
+
+def obter_cliente_mongo(mongo_uri, max_pool_size=1, compressors=None):
+    """
+    MongoClient do container, reaproveitado entre invocações warm.
+    
+    O cliente em cache é reutilizado se a URI e a compressão forem as mesmas,
+    o pool comportar `max_pool_size` e um `ping` confirmar que está vivo;
+    caso contrário é fechado e substituído por uma nova conexão.
+    """
+    client = _cache_cliente.get('client')
+    if client is not None:
+        mesmo_destino = (
+            _cache_cliente['uri'] == mongo_uri
+            and _cache_cliente['compressors'] == compressors
+            and _cache_cliente['max_pool_size'] >= max_pool_size
+        )
+        if mesmo_destino:
             try:
-                # Tentativa 3 - Configuração mínima
-                logger.info("Tentativa 3 - Configuração mínima")
-                client = pymongo.MongoClient(mongo_uri)
-                
                 client.admin.command('ping')
-                logger.info("Conexão mínima com MongoDB estabelecida")
+                logger.info("MongoClient reaproveitado do container")
                 return client
-                
-            except Exception as e3:
-                logger.error(f"Todas as tentativas falharam. Último erro: {e3}")
-                raise e3
+            except Exception as e:
+                logger.warning(f"MongoClient em cache falhou no health check: {e}")
+        fechar_cliente_mongo()
+    
+    client = connect_to_mongodb(mongo_uri, max_pool_size, compressors)
+    _cache_cliente.update({
+        'client': client, 'uri': mongo_uri,
+        'max_pool_size': max_pool_size, 'compressors': compressors
+    })
+    return client
 
-def export_collection_to_s3(collection, collection_name, s3_client, bucket_name, prefix):
-    """Exporta uma coleção do MongoDB para o S3"""
+def fechar_cliente_mongo():
+    client = _cache_cliente.pop('client', None)
+    _cache_cliente.clear()
+    if client is not None:
+        try:
+            client.close()
+            logger.info("Conexão MongoDB fechada")
+        except Exception:
+            pass
+
+# Faixas de _id: mínimo de documentos por faixa e amostras do $sample por faixa
+MIN_DOCUMENTOS_POR_FAIXA = 5000
+AMOSTRAS_POR_FAIXA = 100
+
+def tipos_bson():
+    """Nome do tipo BSON (operador $type) dos _id que podem ser divididos em faixas"""
+    from bson import ObjectId
+    
+    return {ObjectId: 'objectId', str: 'string', int: 'number', float: 'number', datetime: 'date'}
+
+def _binario_base64(valor):
+    return base64.b64encode(valor).decode('ascii')
+
+# CodecOptions criados no primeiro uso: o bson (parte do pymongo) fica fora
+# da inicialização do container, como o próprio pymongo
+_codecs = {}
+
+def codecs_bson():
+    """
+    Codecs de leitura: 'json' e 'nativo'.
+    
+    'json': ObjectId, datas, Decimal128, binários e timestamps (inclusive
+    aninhados) já saem convertidos de `bson.decode_all`, sem um `default`
+    chamado pelo encoder nem uma varredura em Python. 'nativo': tipos BSON
+    (datetime, ObjectId...), normalizados pelo esquema do Parquet ou, no
+    JSON, por `camara.saida.padrao_json` com as mesmas conversões.
+    """
+    if not _codecs:
+        from bson import Binary, Decimal128, ObjectId, Timestamp
+        from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
+        
+        class Decodificador(TypeDecoder):
+            """Converte um tipo BSON para um valor JSON já na decodificação (extensão C do bson)"""
+            
+            def __init__(self, bson_type, converter):
+                self._bson_type = bson_type
+                self._converter = converter
+            
+            @property
+            def bson_type(self):
+                return self._bson_type
+            
+            def transform_bson(self, valor):
+                return self._converter(valor)
+        
+        # Um único update: outra thread de exportação nunca vê só um dos codecs
+        _codecs.update({
+            'json': CodecOptions(type_registry=TypeRegistry([
+                Decodificador(ObjectId, str),
+                Decodificador(datetime, lambda valor: valor.isoformat()),
+                Decodificador(Decimal128, str),
+                Decodificador(Binary, _binario_base64),
+                Decodificador(bytes, _binario_base64),
+                Decodificador(Timestamp, lambda valor: valor.as_datetime().isoformat()),
+            ])),
+            'nativo': CodecOptions()
+        })
+    return _codecs
+
+def ler_documentos(collection, filtro=None, projecao=None, batch_size=1000, codec=None):
+    """
+    Documentos da coleção lidos em lotes de BSON bruto (`find_raw_batches`).
+    
+    Cada lote recebido do servidor é decodificado de uma vez por
+    `bson.decode_all` (em C), em vez de documento a documento pelo cursor.
+    Sem `codec`, os documentos saem prontos para JSON.
+    """
+    import bson
+    
+    codec = codec or codecs_bson()['json']
+    for lote in collection.find_raw_batches(filtro or {}, projecao, batch_size=batch_size):
+        yield from bson.decode_all(lote, codec)
+
+def codec_do_formato(formato):
+    return codecs_bson()['nativo' if formato == 'parquet' else 'json']
+
+def key_exportacao(prefix, collection_name, timestamp, formato, parte=None, faixa=None, delta=False):
+    """
+    Key do arquivo exportado.
+    
+    `faixa` identifica a faixa de _id (varredura paralela), `parte` numera
+    os arquivos quando há tamanho alvo e `delta` marca exportações
+    incrementais (só documentos novos/alterados desde o último watermark).
+    """
+    sufixo = "_delta" if delta else ""
+    sufixo += f"_range-{faixa:05d}" if faixa is not None else ""
+    sufixo += f"_part-{parte:05d}" if parte is not None else ""
+    nome = f"{timestamp}_{collection_name}{sufixo}{EXTENSOES[formato]}"
+    if formato == 'parquet':
+        return f"{prefix}{collection_name}/{particao(timestamp)}/{nome}"
+    return f"{prefix}{collection_name}/{nome}"
+
+def calcular_faixas(collection, num_faixas):
+    """
+    Divide a coleção em até `num_faixas` faixas de _id a partir de uma amostra ($sample).
+    
+    Os pontos de corte são os quantis dos _id amostrados. A primeira faixa
+    também recebe os documentos cujo _id tem outro tipo BSON (comparações
+    com $lt/$gte só alcançam valores do mesmo tipo), então as faixas cobrem a
+    coleção inteira sem sobreposição.
+    
+    Returns:
+        list[dict]: Filtros de cada faixa ([{}] se a coleção não puder ser dividida)
+    """
+    if num_faixas <= 1:
+        return [{}]
+    
+    amostra = [
+        doc['_id'] for doc in collection.aggregate([
+            {'$sample': {'size': num_faixas * AMOSTRAS_POR_FAIXA}},
+            {'$project': {'_id': 1}}
+        ])
+    ]
+    tipos = {type(valor) for valor in amostra}
+    nomes_tipos = tipos_bson()
+    if len(tipos) != 1 or next(iter(tipos)) not in nomes_tipos:
+        logger.warning(f"_id de tipos {tipos} na amostra de {collection.name}; sem divisão em faixas")
+        return [{}]
+    tipo_bson = nomes_tipos[next(iter(tipos))]
+    
+    amostra = sorted(set(amostra))
+    cortes = []
+    for i in range(1, num_faixas):
+        corte = amostra[i * len(amostra) // num_faixas]
+        if not cortes or corte > cortes[-1]:
+            cortes.append(corte)
+    if not cortes:
+        return [{}]
+    
+    faixas = [{'$or': [{'_id': {'$lt': cortes[0]}}, {'_id': {'$not': {'$type': tipo_bson}}}]}]
+    for inicio, fim in zip(cortes, cortes[1:]):
+        faixas.append({'_id': {'$gte': inicio, '$lt': fim}})
+    faixas.append({'_id': {'$gte': cortes[-1]}})
+    return faixas
+
+def exportar_cursor(cursor, armazenamento, gerar_key, formato, esquema, batch_size, tamanho_arquivo=None):
+    """
+    Grava os documentos de um cursor em streaming (um ou mais arquivos).
+    
+    Os documentos são lidos em lotes de `batch_size`, serializados lote a lote
+    (camara.saida) e enviados como partes de um multipart upload
+    (camara.armazenamento.EscritaS3): a memória usada é a de um lote mais uma
+    parte, qualquer que seja o volume.
+    
+    Args:
+        gerar_key (callable): parte (int ou None) -> key do arquivo
+        tamanho_arquivo (int, optional): Tamanho alvo, em bytes, de cada
+            arquivo. Ao ser atingido, o arquivo é fechado e o próximo lote vai
+            para um novo (`..._part-00001`). Sem ele, um único arquivo.
+    
+    Returns:
+        list[dict]: key, documentos e bytes de cada arquivo gravado
+    """
+    arquivos = []
+    saida = escritor = None
+    try:
+        for lote in em_lotes(cursor, batch_size):
+            if escritor is None:
+                key = gerar_key(len(arquivos) if tamanho_arquivo else None)
+                saida = armazenamento.abrir_escrita(
+                    key, CONTENT_TYPES[formato], CONTENT_ENCODINGS.get(formato)
+                )
+                escritor = abrir_escritor(saida, formato, esquema)
+            
+            escritor.escrever(lote)
+            
+            if tamanho_arquivo and saida.bytes_escritos >= tamanho_arquivo:
+                escritor.fechar()
+                saida.close()
+                arquivos.append({'key': key, 'documentos': escritor.registros, 'bytes': saida.bytes_escritos})
+                escritor = None
+        
+        if escritor is not None:
+            escritor.fechar()
+            saida.close()
+            arquivos.append({'key': key, 'documentos': escritor.registros, 'bytes': saida.bytes_escritos})
+        return arquivos
+    
+    except Exception:
+        # Descarta as partes já enviadas do arquivo em andamento
+        if saida is not None:
+            saida.abortar()
+        raise
+
+def export_collection_to_s3(collection, collection_name, s3_client, bucket_name, prefix,
+                            formato='json', batch_size=1000, tamanho_arquivo=None, num_faixas=1,
+                            projecao=None):
+    """
+    Exporta uma coleção do MongoDB para o S3 em streaming.
+    
+    Formatos: 'json' (array indentado), 'ndjson' (gzip, um documento por
+    linha) ou 'parquet' (esquema ESQUEMAS_MFLIX, em `{prefix}{coleção}/dt=AAAA-MM-DD/`).
+    
+    Com `num_faixas` > 1 (e ao menos MIN_DOCUMENTOS_POR_FAIXA documentos por
+    faixa), a coleção é dividida em faixas de _id (`calcular_faixas`),
+    varridas por cursores em paralelo; cada faixa grava seus próprios
+    arquivos (`..._range-00000...`) e um manifesto
+    (`{timestamp}_{coleção}_manifest.json`) lista as partes do export.
+    
+    Args:
+        projecao (dict, optional): Projeção do `find` (campos incluídos/excluídos)
+    
+    Returns:
+        dict: Documentos, keys e bytes gravados (None para coleção vazia)
+    """
     try:
-        # Contar documentos primeiro
-        doc_count = collection.count_documents({})
-        logger.info(f"Coleção {collection_name} possui {doc_count} documentos")
+        # Estimativa pelos metadados da coleção, sem varrer os documentos
+        doc_count = collection.estimated_document_count()
+        logger.info(f"Coleção {collection_name} possui ~{doc_count} documentos")
         
         if doc_count == 0:
             logger.warning(f"Coleção {collection_name} está vazia")
-            return
-        
-        # Obter documentos
-        all_documents = []
-        cursor = collection.find()
-        
-        for doc in cursor:
-            # Converter ObjectId para string para serialização JSON
-            if '_id' in doc:
-                doc['_id'] = str(doc['_id'])
-            # Converter outros tipos não serializáveis
-            for key, value in doc.items():
-                if hasattr(value, 'isoformat'):  # datetime objects
-                    doc[key] = value.isoformat()
-            all_documents.append(doc)
-        
-        # Criar nome do arquivo com timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name = f"{prefix}{collection_name}/{timestamp}_{collection_name}.json"
+            return None
         
-        # Converter para JSON
-        json_data = json.dumps(all_documents, indent=2, default=str, ensure_ascii=False)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        armazenamento = obter_armazenamento(bucket_name, s3_client)
+        esquema = ESQUEMAS_MFLIX.get(collection_name)
         
-        # Upload para S3
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=file_name,
-            Body=json_data.encode('utf-8'),
-            ContentType='application/json'
-        )
+        num_faixas = min(num_faixas, doc_count // MIN_DOCUMENTOS_POR_FAIXA)
+        if num_faixas <= 1:
+            arquivos = exportar_cursor(
+                ler_documentos(collection, None, projecao, batch_size, codec_do_formato(formato)),
+                armazenamento,
+                lambda parte: key_exportacao(prefix, collection_name, timestamp, formato, parte),
+                formato, esquema, batch_size, tamanho_arquivo
+            )
+            manifesto = None
+        else:
+            arquivos, manifesto = exportar_faixas(
+                collection, collection_name, armazenamento, prefix, timestamp,
+                formato, esquema, batch_size, tamanho_arquivo, num_faixas, projecao
+            )
         
-        logger.info(f"Coleção {collection_name} exportada: {len(all_documents)} documentos -> {file_name}")
+        resultado = {
+            'documentos': sum(arquivo['documentos'] for arquivo in arquivos),
+            'arquivos': [arquivo['key'] for arquivo in arquivos],
+            'bytes': sum(arquivo['bytes'] for arquivo in arquivos)
+        }
+        if manifesto:
+            resultado['manifesto'] = manifesto
+        logger.info(f"Coleção {collection_name} exportada: {resultado['documentos']} documentos ({resultado['bytes']} bytes) -> {resultado['arquivos']}")
+        return resultado
         
     except Exception as e:
         logger.error(f"Erro ao exportar coleção {collection_name}: {e}")
         raise e
 
+def exportar_faixas(collection, collection_name, armazenamento, prefix, timestamp,
+                    formato, esquema, batch_size, tamanho_arquivo, num_faixas, projecao=None):
+    """
+    Varre as faixas de _id em paralelo, um cursor por faixa, e grava o manifesto.
+    
+    Returns:
+        tuple: (arquivos gravados, key do manifesto)
+    """
+    faixas = calcular_faixas(collection, num_faixas)
+    logger.info(f"Coleção {collection_name} dividida em {len(faixas)} faixas de _id")
+    
+    def exportar_faixa(indice):
+        return exportar_cursor(
+            ler_documentos(collection, faixas[indice], projecao, batch_size, codec_do_formato(formato)),
+            armazenamento,
+            lambda parte: key_exportacao(prefix, collection_name, timestamp, formato, parte, indice),
+            formato, esquema, batch_size, tamanho_arquivo
+        )
+    
+    with ThreadPoolExecutor(max_workers=len(faixas), thread_name_prefix=f'Faixa-{collection_name}') as executor:
+        por_faixa = list(executor.map(exportar_faixa, range(len(faixas))))
+    
+    arquivos = [arquivo for arquivos_faixa in por_faixa for arquivo in arquivos_faixa]
+    manifesto = {
+        'collection': collection_name,
+        'timestamp': timestamp,
+        'formato': formato,
+        'documentos': sum(arquivo['documentos'] for arquivo in arquivos),
+        'faixas': [
+            {'filtro': json.loads(json.dumps(filtro, default=padrao_json)), 'arquivos': arquivos_faixa}
+            for filtro, arquivos_faixa in zip(faixas, por_faixa)
+        ]
+    }
+    key_manifesto = f"{prefix}{collection_name}/{timestamp}_{collection_name}_manifest.json"
+    armazenamento.gravar(key_manifesto, json.dumps(manifesto, ensure_ascii=False, indent=2).encode('utf-8'))
+    return arquivos, key_manifesto
+
+# Máximo de eventos do change stream lidos por execução
+MAX_EVENTOS_CHANGE_STREAM = 100000
+
+# Colunas acrescentadas aos documentos exportados a partir do change stream
+COLUNAS_CHANGE_STREAM = [('_operation', 'string'), ('_cluster_time', 'timestamp')]
+
+def key_watermark(prefix, collection_name):
+    return f"{prefix}_watermarks/{collection_name}.json"
+
+def carregar_watermark(armazenamento, key):
+    """Watermark salvo (Extended JSON: ObjectId e datas preservados), ou None"""
+    from bson import json_util
+    
+    conteudo = armazenamento.ler(key)
+    return json_util.loads(conteudo) if conteudo else None
+
+def salvar_watermark(armazenamento, key, watermark):
+    from bson import json_util
+    
+    armazenamento.gravar(key, json_util.dumps(watermark, indent=2).encode('utf-8'))
+
+def rastrear_maximo(documentos, campo, estado):
+    """Repassa os documentos guardando em estado['valor'] o maior valor de `campo`"""
+    for doc in documentos:
+        valor = doc.get(campo)
+        if valor is not None:
+            try:
+                if estado['valor'] is None or valor > estado['valor']:
+                    estado['valor'] = valor
+            except TypeError:
+                pass  # tipos BSON não comparáveis: mantém o watermark atual
+        yield doc
+
+def export_collection_incremental(collection, collection_name, s3_client, bucket_name, prefix,
+                                  formato='json', batch_size=1000, tamanho_arquivo=None,
+                                  campo_atualizacao=None, projecao=None):
+    """
+    Exporta apenas os documentos novos desde o último watermark da coleção.
+    
+    O watermark (`{prefix}_watermarks/{coleção}.json`) guarda o maior valor
+    de `campo_atualizacao` já exportado; sem o campo, o próprio `_id` (o
+    ObjectId começa pelo timestamp de criação, então `_id > watermark`
+    seleciona os documentos inseridos depois). Com um campo de atualização,
+    o filtro é `>=` para não perder documentos gravados no mesmo instante
+    do watermark; o consumidor deduplica pelo `_id`.
+    
+    Sem watermark (primeira execução ou campo alterado), a coleção é
+    exportada por inteiro como base. O watermark só avança depois que os
+    arquivos foram gravados.
+    
+    Returns:
+        dict: Documentos, keys, bytes e o watermark
+    """
+    campo = campo_atualizacao or '_id'
+    armazenamento = obter_armazenamento(bucket_name, s3_client)
+    key_wm = key_watermark(prefix, collection_name)
+    watermark = carregar_watermark(armazenamento, key_wm)
+    
+    delta = bool(watermark and watermark.get('campo') == campo and watermark.get('valor') is not None)
+    if delta:
+        operador = '$gt' if campo == '_id' else '$gte'
+        filtro = {campo: {operador: watermark['valor']}}
+    else:
+        logger.info(f"Coleção {collection_name} sem watermark para '{campo}' - exportação completa (base)")
+        filtro = {}
+    
+    # O campo do watermark precisa sair na projeção
+    if projecao:
+        if any(projecao.values()):
+            projecao = {**projecao, campo: 1}
+        else:
+            projecao = {chave: valor for chave, valor in projecao.items() if chave != campo}
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    estado = {'valor': watermark['valor'] if delta else None}
+    # Tipos nativos: o watermark guarda o ObjectId/datetime, não o texto (com
+    # o codec JSON, o próximo filtro compararia texto com ObjectId). No JSON,
+    # `padrao_json` converte esses tipos como o codec JSON da exportação completa
+    documentos = ler_documentos(collection, filtro, projecao, batch_size, codecs_bson()['nativo'])
+    arquivos = exportar_cursor(
+        rastrear_maximo(documentos, campo, estado),
+        armazenamento,
+        lambda parte: key_exportacao(prefix, collection_name, timestamp, formato, parte, delta=delta),
+        formato, ESQUEMAS_MFLIX.get(collection_name), batch_size, tamanho_arquivo
+    )
+    
+    documentos = sum(arquivo['documentos'] for arquivo in arquivos)
+    salvar_watermark(armazenamento, key_wm, {
+        'campo': campo,
+        'valor': estado['valor'],
+        'atualizado_em': datetime.now(),
+        'documentos': documentos
+    })
+    logger.info(f"Coleção {collection_name}: {documentos} documentos {'novos' if delta else 'na base'}; watermark {campo}={estado['valor']}")
+    return {
+        'documentos': documentos,
+        'arquivos': [arquivo['key'] for arquivo in arquivos],
+        'bytes': sum(arquivo['bytes'] for arquivo in arquivos),
+        'delta': delta,
+        'watermark': str(estado['valor'])
+    }
+
+def evento_para_documento(evento):
+    """Documento de um evento do change stream, com a operação e o horário"""
+    documento = evento.get('fullDocument') or {'_id': evento['documentKey']['_id']}
+    cluster_time = evento.get('clusterTime')
+    return {
+        **documento,
+        '_operation': evento['operationType'],
+        '_cluster_time': cluster_time.as_datetime() if cluster_time else None
+    }
+
+def export_collection_change_stream(collection, collection_name, s3_client, bucket_name, prefix,
+                                    formato='json', batch_size=1000, tamanho_arquivo=None,
+                                    max_eventos=MAX_EVENTOS_CHANGE_STREAM):
+    """
+    Exporta as mudanças da coleção desde a última execução via change stream.
+    
+    Requer replica set (ou cluster Atlas). O resume token fica no watermark
+    da coleção; na primeira execução o stream começa no momento da abertura.
+    Cada execução lê os eventos disponíveis (sem esperar por novos) e grava
+    um arquivo delta com o documento completo de cada insert/update/replace,
+    ou só o `_id` para delete, mais `_operation` e `_cluster_time`.
+    
+    Returns:
+        dict: Eventos, keys, bytes e se havia resume token
+    """
+    armazenamento = obter_armazenamento(bucket_name, s3_client)
+    key_wm = key_watermark(prefix, collection_name)
+    watermark = carregar_watermark(armazenamento, key_wm)
+    token = watermark.get('resume_token') if watermark and watermark.get('campo') == 'change_stream' else None
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    esquema = ESQUEMAS_MFLIX.get(collection_name)
+    esquema = esquema + COLUNAS_CHANGE_STREAM if esquema else None
+    
+    with collection.watch(full_document='updateLookup', resume_after=token,
+                          batch_size=batch_size, max_await_time_ms=1000) as stream:
+        def eventos():
+            for _ in range(max_eventos):
+                evento = stream.try_next()
+                if evento is None:
+                    return
+                yield evento_para_documento(evento)
+        
+        arquivos = exportar_cursor(
+            eventos(),
+            armazenamento,
+            lambda parte: key_exportacao(prefix, collection_name, timestamp, formato, parte, delta=True),
+            formato, esquema, batch_size, tamanho_arquivo
+        )
+        novo_token = stream.resume_token
+    
+    documentos = sum(arquivo['documentos'] for arquivo in arquivos)
+    salvar_watermark(armazenamento, key_wm, {
+        'campo': 'change_stream',
+        'resume_token': novo_token,
+        'atualizado_em': datetime.now(),
+        'documentos': documentos
+    })
+    logger.info(f"Coleção {collection_name}: {documentos} eventos do change stream exportados")
+    return {
+        'documentos': documentos,
+        'arquivos': [arquivo['key'] for arquivo in arquivos],
+        'bytes': sum(arquivo['bytes'] for arquivo in arquivos),
+        'delta': True,
+        'resume_token_anterior': token is not None
+    }
+
+# Modo de exportação -> função
+EXPORTADORES = {
+    'completo': export_collection_to_s3,
+    'incremental': export_collection_incremental,
+    'change_stream': export_collection_change_stream,
+}
+
+def processar_colecao(db, collection_name, available_collections, s3_client, bucket_name, prefix,
+                      modo='completo', **opcoes):
+    """
+    Exporta uma coleção (executado em um worker do pool).
+    
+    Args:
+        modo (str): 'completo', 'incremental' ou 'change_stream' (EXPORTADORES)
+        **opcoes: Repassadas à função de exportação do modo
+    
+    Returns:
+        tuple: (status, estatísticas com a duração em segundos)
+    """
+    inicio = time.perf_counter()
+    stats = {}
+    try:
+        logger.info(f"Processando coleção: {collection_name}")
+        
+        # Verificar se a coleção existe
+        if collection_name not in available_collections:
+            logger.warning(f"Coleção {collection_name} não encontrada")
+            status = "NOT_FOUND"
+        else:
+            stats = EXPORTADORES[modo](
+                db[collection_name],
+                collection_name,
+                s3_client,
+                bucket_name,
+                prefix,
+                **opcoes
+            ) or {}
+            status = "SUCCESS"
+        
+    except Exception as e:
+        logger.error(f"Erro ao processar coleção {collection_name}: {e}")
+        status = f"ERROR: {str(e)[:100]}..."
+    
+    stats['duration_s'] = round(time.perf_counter() - inicio, 3)
+    return status, stats
+
 def lambda_handler(event, context):
     """Função principal da Lambda"""
     
@@ -149,58 +682,92 @@ def lambda_handler(event, context):
     remaining_time = context.get_remaining_time_in_millis() if context else 900000
     logger.info(f"Tempo restante no contexto: {remaining_time}ms")
     
-    mongo_client = None
-    
     try:
         # 1. Recuperar credenciais do Secrets Manager
         logger.info("=== INICIANDO PROCESSO ===")
+        # 'formato': 'json' (padrão), 'ndjson' (gzip, um registro por linha) ou 'parquet' (colunar, particionado por dt=)
+        formato = validar_formato((event or {}).get('formato', 'json'))
+        # Documentos por lote lido do cursor e tamanho alvo (MB) de cada arquivo exportado
+        batch_size = (event or {}).get('batch_size', 1000)
+        tamanho_arquivo_mb = (event or {}).get('tamanho_arquivo_mb')
+        tamanho_arquivo = int(tamanho_arquivo_mb * 1024 * 1024) if tamanho_arquivo_mb else None
+        # Coleções exportadas em paralelo; o pool do MongoClient tem uma conexão por worker
+        max_workers = max(1, min((event or {}).get('max_workers', len(COLLECTIONS)), len(COLLECTIONS)))
+        # Cursores paralelos por coleção grande (faixas de _id); cada um usa uma conexão
+        num_faixas = max(1, (event or {}).get('num_faixas', 1))
+        # 'modo': 'completo' (padrão), 'incremental' (watermark por coleção) ou 'change_stream'
+        modo = (event or {}).get('modo', 'completo')
+        if modo not in EXPORTADORES:
+            raise ValueError(f"Modo '{modo}' inválido; use um de {list(EXPORTADORES)}")
+        # Campo de atualização por coleção para o modo incremental (padrão: _id)
+        campos_atualizacao = (event or {}).get('campos_atualizacao', {})
+        # Por coleção: {"comments": {"projecao": {...}, "batch_size": 5000}}
+        config_colecoes = (event or {}).get('colecoes', {})
+        # Compressão do protocolo do MongoDB (ex.: "zstd,snappy,zlib")
+        compressores = (event or {}).get('compressores')
+        
         logger.info("Recuperando credenciais do Secrets Manager")
         secret = get_secret(SECRET_NAME)
         mongo_uri = secret['MONGO_URI']
         logger.info("Credenciais recuperadas com sucesso")
         
-        # 2. Conectar ao MongoDB
+        # 2. Conectar ao MongoDB. O cliente não é fechado ao fim da invocação:
+        # fica no container e é reaproveitado (após health check) nas invocações warm
         logger.info("=== CONECTANDO AO MONGODB ===")
-        mongo_client = connect_to_mongodb(mongo_uri)
+        try:
+            mongo_client = obter_cliente_mongo(
+                mongo_uri, max_pool_size=max_workers * num_faixas, compressors=compressores
+            )
+        except Exception:
+            # O secret em cache pode ter sido rotacionado: busca de novo e tenta mais uma vez
+            invalidar_secret(SECRET_NAME)
+            secret_atual = get_secret(SECRET_NAME)
+            if secret_atual['MONGO_URI'] == mongo_uri:
+                raise
+            mongo_uri = secret_atual['MONGO_URI']
+            mongo_client = obter_cliente_mongo(
+                mongo_uri, max_pool_size=max_workers * num_faixas, compressors=compressores
+            )
         db = mongo_client[DATABASE_NAME]
         
         # Verificar se conseguimos listar as coleções
         available_collections = db.list_collection_names()
         logger.info(f"Coleções disponíveis no banco: {available_collections}")
         
-        # 3. Conectar ao S3
+        # 3. Conectar ao S3 (cliente do container, reaproveitado nas invocações warm)
         logger.info("=== CONECTANDO AO S3 ===")
-        s3_client = boto3.client('s3')
+        s3_client = cliente_s3()
         
-        # 4. Processar cada coleção
-        logger.info("=== INICIANDO EXPORTAÇÃO ===")
+        # 4. Processar as coleções em paralelo (cliente S3 e MongoClient são thread-safe)
+        logger.info(f"=== INICIANDO EXPORTAÇÃO ({max_workers} workers) ===")
+        inicio = time.perf_counter()
         results = {}
+        collection_stats = {}
         
-        for collection_name in COLLECTIONS:
-            try:
-                logger.info(f"Processando coleção: {collection_name}")
-                
-                # Verificar se a coleção existe
-                if collection_name not in available_collections:
-                    logger.warning(f"Coleção {collection_name} não encontrada")
-                    results[collection_name] = "NOT_FOUND"
-                    continue
-                
-                collection = db[collection_name]
-                
-                # Exportar coleção
-                export_collection_to_s3(
-                    collection, 
-                    collection_name, 
-                    s3_client, 
-                    BUCKET_NAME, 
-                    S3_PREFIX
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ExportWorker') as executor:
+            futures = {}
+            for collection_name in COLLECTIONS:
+                config = config_colecoes.get(collection_name, {})
+                opcoes = {
+                    'formato': formato,
+                    'batch_size': config.get('batch_size', batch_size),
+                    'tamanho_arquivo': tamanho_arquivo
+                }
+                if modo == 'completo':
+                    opcoes['num_faixas'] = num_faixas
+                    opcoes['projecao'] = config.get('projecao')
+                elif modo == 'incremental':
+                    opcoes['campo_atualizacao'] = campos_atualizacao.get(collection_name)
+                    opcoes['projecao'] = config.get('projecao')
+                futures[collection_name] = executor.submit(
+                    processar_colecao, db, collection_name, available_collections,
+                    s3_client, BUCKET_NAME, S3_PREFIX, modo, **opcoes
                 )
-                results[collection_name] = "SUCCESS"
-                
-            except Exception as e:
-                logger.error(f"Erro ao processar coleção {collection_name}: {e}")
-                results[collection_name] = f"ERROR: {str(e)[:100]}..."
+            for collection_name, future in futures.items():
+                results[collection_name], collection_stats[collection_name] = future.result()
+        
+        total_duration = round(time.perf_counter() - inicio, 3)
+        logger.info(f"Exportação concluída em {total_duration}s: {collection_stats}")
         
         # 5. Preparar resposta de sucesso
         logger.info("=== PROCESSO CONCLUÍDO COM SUCESSO ===")
@@ -211,7 +778,12 @@ def lambda_handler(event, context):
                 'timestamp': datetime.now().isoformat(),
                 'results': results,
                 'available_collections': available_collections,
-                'processed_collections': len([k for k, v in results.items() if v == "SUCCESS"])
+                'processed_collections': len([k for k, v in results.items() if v == "SUCCESS"]),
+                'collection_stats': collection_stats,
+                'modo': modo,
+                'max_workers': max_workers,
+                'num_faixas': num_faixas,
+                'total_duration_s': total_duration
             }, ensure_ascii=False)
         }
         
@@ -228,12 +800,3 @@ def lambda_handler(event, context):
                 'message': 'Falha na execução da função Lambda'
             })
         }
-    
-    finally:
-        # Garantir que a conexão seja fechada
-        if mongo_client:
-            try:
-                mongo_client.close()
-                logger.info("Conexão MongoDB fechada")
-            except:
-                pass
\ No newline at end of file
@@ -1,60 +1,46 @@
-import urllib.request
-import urllib.error
-import xml.etree.ElementTree as ET
 import json
-import boto3
 from datetime import datetime
 
-s3_client = boto3.client('s3')
+from camara.armazenamento import obter_armazenamento
+from camara.cache import INALTERADO, CacheValidadores, chave_cache
+from camara.cliente import CAMINHO_DEPUTADOS, cliente_padrao
+from camara.esquemas import EXTRATOR_LISTA_DEPUTADOS
+from camara.parsers import iterar_elementos
+from camara.saida import ESQUEMAS, gravar, key_arquivo, validar_formato
+
 BUCKET = "dev-lab-02-us-east-2-landing"
 BASE_KEY = "camara/deputados"
+CACHE_KEY = f"{BASE_KEY}/_cache/validadores.json"
 
 
-def obter_deputados_xml(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/xml, text/xml, */*',
-    }
-
+def obter_deputados_xml(cache=None):
     try:
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            xml_content = response.read()
-        root = ET.fromstring(xml_content)
+        chave = chave_cache(CAMINHO_DEPUTADOS)
+        headers = cache.headers_condicionais(chave) if cache else None
         deputados = []
-
-        for dep_elem in root.findall('.//deputado'):
-            dep = {
-                'ideCadastro': dep_elem.findtext('ideCadastro'),
-                'condicao': dep_elem.findtext('condicao'),
-                'nome': dep_elem.findtext('nome'),
-                'nomeParlamentar': dep_elem.findtext('nomeParlamentar'),
-                'urlFoto': dep_elem.findtext('urlFoto'),
-                'sexo': dep_elem.findtext('sexo'),
-                'uf': dep_elem.findtext('uf'),
-                'partido': dep_elem.findtext('partido'),
-                'gabinete': dep_elem.findtext('gabinete'),
-                'anexo': dep_elem.findtext('anexo'),
-                'fone': dep_elem.findtext('fone'),
-                'email': dep_elem.findtext('email')
-            }
-            deputados.append(dep)
-
+        # O cliente compartilhado já tenta www.camara.gov.br se www.camara.leg.br falhar.
+        # O XML é parseado em streaming, sem manter o corpo inteiro em memória.
+        with cliente_padrao().abrir(CAMINHO_DEPUTADOS, headers=headers) as response:
+            response.raise_for_status()
+            if response.status != 304:
+                for dep_elem in iterar_elementos(response.iter_blocos(), 'deputado'):
+                    deputados.append(EXTRATOR_LISTA_DEPUTADOS(dep_elem))
+
+        # 304 (sem parse) ou corpo idêntico ao da última execução (sem serialização)
+        if cache and cache.verificar(chave, response):
+            return INALTERADO
+
+        if cache:
+            cache.atualizar(chave, response)
         return deputados
     except Exception as e:
-        print(f"Erro ao obter dados de {url}: {e}")
+        print(f"Erro ao obter dados de {CAMINHO_DEPUTADOS}: {e}")
         return None
 
 
-def salvar_no_s3(dados, bucket, key):
+def salvar_no_s3(dados, bucket, key, formato='json'):
     try:
-        json_data = json.dumps(dados, ensure_ascii=False, indent=2)
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json_data.encode('utf-8'),
-            ContentType='application/json; charset=utf-8'
-        )
+        gravar(obter_armazenamento(bucket), key, dados, formato, ESQUEMAS['deputados'])
         return True
     except Exception as e:
         print(f"Erro ao salvar no S3: {e}")
@@ -62,15 +48,25 @@ def salvar_no_s3(dados, bucket, key):
 
 
 def lambda_handler(event, context):
-    # URLs principal e alternativa
-    url_principal = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterDeputados"
-    url_alternativa = "https://www.camara.gov.br/SitCamaraWS/Deputados.asmx/ObterDeputados"
-
-    deputados = obter_deputados_xml(url_principal)
-
-    if not deputados:
-        print("Tentando URL alternativa...")
-        deputados = obter_deputados_xml(url_alternativa)
+    # 'forcar': ignora o cache de validadores e grava mesmo sem mudanças
+    forcar = (event or {}).get('forcar', False)
+    # 'formato': 'json' (padrão), 'ndjson' (gzip, um registro por linha) ou 'parquet' (colunar, particionado por dt=)
+    formato = validar_formato((event or {}).get('formato', 'json'))
+    cache = None if forcar else CacheValidadores(obter_armazenamento(BUCKET), CACHE_KEY)
+    if cache:
+        # Em outro formato a saída anterior não serve: grava de novo
+        cache.configurar_saida({'formato': formato})
+
+    deputados = obter_deputados_xml(cache)
+
+    if deputados is INALTERADO:
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Dados dos deputados inalterados desde a última execução - nenhum arquivo gravado',
+                'inalterado': True
+            }, ensure_ascii=False)
+        }
 
     if not deputados:
         return {
@@ -83,11 +79,14 @@ def lambda_handler(event, context):
 
     # Gerar nome do arquivo com timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    key = f"{BASE_KEY}/deputados_{timestamp}.json"
+    key = key_arquivo(BASE_KEY, 'deputados', timestamp, formato)
 
-    sucesso = salvar_no_s3(deputados, BUCKET, key)
+    sucesso = salvar_no_s3(deputados, BUCKET, key, formato)
 
     if sucesso:
+        # Validadores só são persistidos depois que os dados foram gravados
+        if cache:
+            cache.salvar()
         return {
             'statusCode': 200,
             'body': json.dumps({
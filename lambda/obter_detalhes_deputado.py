@@ -1,56 +1,75 @@
-import urllib.request
-import urllib.error
-import urllib.parse
 import xml.etree.ElementTree as ET
+import http.client
 import json
-import boto3
 from datetime import datetime
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import threading
 import time
 
+from camara.armazenamento import obter_armazenamento
+from camara.cache import CacheValidadores, chave_cache
+from camara.checkpoint import CheckpointColeta, separar_concluidos
+from camara.incremental import (
+    CAMPO_HASH, CAMPO_OBTIDO_EM, carregar_snapshot_anterior, hash_registro, planejar_atualizacao
+)
+from camara.concorrencia import ControladorAIMD
+from camara.esquemas import CAMPOS_DETALHES, EXTRATOR_DEPUTADO, EXTRATOR_DETALHES
+from camara.hedge import PoliticaHedge
+from camara.limitador import configuracao_ambiente, limitador_padrao
+from camara.metricas import Metricas
+from camara.fanout import (
+    NUM_SHARDS_PADRAO, TIMEOUT_LAMBDA_S, InvocadorLambda, InvocadorLocal, corpo, dividir_em_shards,
+    key_execucao, key_reaproveitados, key_shard, tempo_restante
+)
+from camara.parsers import DocumentoVazio, iterar_elementos
+from camara.resiliencia import CircuitBreaker, FilaRetentativas, PoliticaRetentativa, Resiliencia, retentavel
+from camara.saida import ESQUEMAS, gravar, key_arquivo, ler_registros, prefixo_snapshots, validar_formato
+from camara.tabelas import (
+    anexar_tabelas, carregar_tabelas, contar_itens, key_tabela, separar_tabelas
+)
+from camara.cliente import (
+    CAMINHO_DEPUTADOS, CAMINHO_DETALHES, ErroConexao, cliente_padrao, hosts_configurados
+)
+
 # Configurar logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Lock para logging thread-safe
-log_lock = threading.Lock()
-
-def obter_lista_deputados():
-    """Obtém lista de deputados"""
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterDeputados"
+BUCKET = 'dev-lab-02-us-east-2-landing'
+BASE_KEY = 'camara/detalhesDeputados'
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/xml, text/xml, */*',
-    }
+# Fan-out: funções invocadas pelo coordenador e parâmetros repassados aos workers
+FUNCAO_WORKER = 'obter-detalhes-deputado-worker'
+FUNCAO_MERGE = 'obter-detalhes-deputado-merge'
+# Tempo do coordenador reservado para invocar o merge depois dos workers
+MARGEM_MERGE_S = 60
+CAMPOS_WORKER = (
+    'engine', 'max_workers', 'max_conexoes', 'concorrencia', 'min_workers', 'workers_iniciais',
+    'checkpoint_intervalo_s', 'max_retentativas', 'circuit_breaker', 'pausa_circuito_s', 'max_circuito_aberto_s',
+    'hedge', 'hedge_percentil', 'hedge_orcamento', 'taxa_max', 'rajada'
+)
 
+def obter_lista_deputados(cache=None):
+    """
+    Obtém lista de deputados.
+    
+    A lista é sempre lida por inteiro (o cache não guarda registros); com
+    `cache`, o hash do corpo diz se ela mudou desde a última execução.
+    """
     try:
         logger.info("Obtendo lista de deputados...")
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            xml_content = response.read()
-
-        root = ET.fromstring(xml_content)
+        chave = chave_cache(CAMINHO_DEPUTADOS)
         deputados = []
+        # Corpo parseado em streaming: cada <deputado> é extraído ao chegar do socket
+        with cliente_padrao().abrir(CAMINHO_DEPUTADOS) as response:
+            response.raise_for_status()
+            for deputado_elem in iterar_elementos(response.iter_blocos(), 'deputado'):
+                deputados.append(EXTRATOR_DEPUTADO(deputado_elem))
 
-        for deputado_elem in root.findall('deputado'):
-            deputado = {
-                'ideCadastro': deputado_elem.findtext('ideCadastro'),
-                'nome': deputado_elem.findtext('nome'),
-                'nomeParlamentar': deputado_elem.findtext('nomeParlamentar'),
-                'partido': deputado_elem.findtext('partido'),
-                'uf': deputado_elem.findtext('uf'),
-                'urlFoto': deputado_elem.findtext('urlFoto'),
-                'condicao': deputado_elem.findtext('condicao'),
-                'gabinete': deputado_elem.findtext('gabinete'),
-                'anexo': deputado_elem.findtext('anexo'),
-                'fone': deputado_elem.findtext('fone'),
-                'email': deputado_elem.findtext('email')
-            }
-            deputados.append(deputado)
-
+        if cache and not cache.verificar(chave, response):
+            cache.atualizar(chave, response)
         logger.info(f"Encontrados {len(deputados)} deputados")
         return deputados
 
@@ -58,159 +77,235 @@ def obter_lista_deputados():
         logger.error(f"Erro ao obter lista de deputados: {e}")
         return None
 
-def obter_detalhes_deputado_thread_safe(deputado, contador_global):
-    """Obtém detalhes de um deputado específico (thread-safe)"""
-    ide_cadastro = deputado['ideCadastro']
-    nome = deputado['nomeParlamentar'] or deputado['nome']
-    thread_id = threading.current_thread().name
-    
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterDetalhesDeputado"
+def extrair_detalhes_deputado(deputado_elem):
+    """
+    Extrai os campos de interesse do elemento <Deputado> de ObterDetalhesDeputado.
     
-    params = {
+    Inclui as listas das tabelas filhas (comissoes, periodos_exercicio,
+    liderancas), retiradas dos registros por `separar_tabelas` antes da gravação.
+    """
+    return contar_itens(EXTRATOR_DETALHES(deputado_elem))
+
+def params_detalhes(ide_cadastro):
+    """Parâmetros de ObterDetalhesDeputado (como na URL que funciona no navegador)"""
+    return {
         'ideCadastro': ide_cadastro,
         'numLegislatura': ''
     }
+
+def headers_detalhes(cache, params):
+    """
+    Headers condicionais de ObterDetalhesDeputado.
     
-    query_string = urllib.parse.urlencode(params)
-    full_url = f"{url}?{query_string}"
+    Só há GET condicional se o registro da saída anterior estiver carregado
+    no cache: um 304 sem ele não teria de onde tirar os detalhes.
+    """
+    if cache is None:
+        return None
+    chave = chave_cache(CAMINHO_DETALHES, params)
+    return cache.headers_condicionais(chave) if cache.registro(chave) is not None else None
+
+def montar_resultado_detalhes(deputado, response, worker, cache=None):
+    """
+    Converte a resposta de ObterDetalhesDeputado no registro de saída.
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-    }
+    Compartilhado pelos motores de threads e asyncio: `response` pode ser uma
+    resposta já lida ou uma `RespostaStream`, cujo corpo é parseado à medida
+    que chega. Erros de parse do XML são propagados (ET.ParseError) para o
+    chamador classificar. Com `cache`, respostas inalteradas reaproveitam o
+    registro da saída anterior (`cache.registro`, carregado do último snapshot
+    unificado): 304 sempre sem parse; mesmo hash sem parse quando o corpo já
+    foi lido (em streaming o hash só é conhecido depois do parse).
+    """
+    chave = chave_cache(CAMINHO_DETALHES, params_detalhes(deputado['ideCadastro']))
+    lida = getattr(response, 'corpo', None) is not None
     
+    if cache is not None and (response.status == 304 or (lida and response.status == 200)) \
+            and cache.verificar(chave, response):
+        anterior = cache.registro(chave)
+        if anterior is not None:
+            # Como no parse: lista atual, sobrescrita pelos campos dos detalhes (ex.: email)
+            detalhes = {campo: valor for campo, valor in anterior.items()
+                        if campo not in deputado or campo in CAMPOS_DETALHES}
+            deputado_completo = {**deputado, **detalhes}
+            deputado_completo['detalhes_success'] = True
+            deputado_completo['processed_by_thread'] = worker
+            return deputado_completo
+    
+    if response.status != 200:
+        return {
+            **deputado,
+            'detalhes_error': f'HTTP {response.status}',
+            'error_type': 'http_error'
+        }
+    
+    blocos = response.iter_blocos()
     try:
-        req = urllib.request.Request(full_url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            status = response.getcode()
-            if status != 200:
-                with log_lock:
-                    contador_global['processados'] += 1
-                    logger.warning(f"[{thread_id}] HTTP {status} para {nome} (ID: {ide_cadastro}) - {contador_global['processados']}/{contador_global['total']}")
-                return {
-                    **deputado,
-                    'detalhes_error': f'HTTP {status}',
-                    'error_type': 'http_error'
-                }
-            
-            content = response.read().decode('utf-8').strip()
-        
-        if not content:
-            with log_lock:
-                contador_global['processados'] += 1
-                logger.warning(f"[{thread_id}] Resposta vazia para {nome} (ID: {ide_cadastro}) - {contador_global['processados']}/{contador_global['total']}")
-            return {
-                **deputado,
-                'detalhes_error': 'Resposta vazia',
-                'error_type': 'empty_response'
-            }
-        
-        # Parse do XML
-        root = ET.fromstring(content)
-        deputado_elem = root.find('.//Deputado')
-        
-        if deputado_elem is None:
-            with log_lock:
-                contador_global['processados'] += 1
-                logger.warning(f"[{thread_id}] Elemento 'Deputado' não encontrado para {nome} (ID: {ide_cadastro}) - {contador_global['processados']}/{contador_global['total']}")
-            return {
-                **deputado,
-                'detalhes_error': 'Elemento Deputado não encontrado',
-                'error_type': 'parse_error'
-            }
-        
-        # Extrair detalhes
-        detalhes = {}
-        campos_basicos = [
-            'email', 'nomeProfissao', 'dataNascimento', 'dataFalecimento',
-            'ufRepresentacaoAtual', 'situacaoNaLegislaturaAtual', 'ideCadastro',
-            'nomeParlamentarAtual', 'nomeCivil', 'sexo'
-        ]
-        
-        for campo in campos_basicos:
-            elemento = deputado_elem.find(campo)
-            detalhes[campo] = elemento.text.strip() if elemento is not None and elemento.text else None
-        
-        # Partido atual
-        partido_elem = deputado_elem.find('partidoAtual')
-        if partido_elem is not None:
-            detalhes['partidoAtual'] = {
-                'sigla': partido_elem.findtext('sigla'),
-                'nome': partido_elem.findtext('nome')
-            }
-        else:
-            detalhes['partidoAtual'] = {}
-        
-        # Gabinete
-        gabinete_elem = deputado_elem.find('gabinete')
-        if gabinete_elem is not None:
-            detalhes['gabinete_detalhes'] = {
-                'numero': gabinete_elem.findtext('numero'),
-                'anexo': gabinete_elem.findtext('anexo'),
-                'telefone': gabinete_elem.findtext('telefone')
-            }
-        else:
-            detalhes['gabinete_detalhes'] = {}
-        
-        # Contadores
-        comissoes_elem = deputado_elem.find('comissoes')
-        detalhes['num_comissoes'] = len(comissoes_elem) if comissoes_elem is not None else 0
-        
-        periodos_elem = deputado_elem.find('periodosExercicio')
-        detalhes['num_periodos_exercicio'] = len(periodos_elem) if periodos_elem is not None else 0
-        
-        historico_lider_elem = deputado_elem.find('historicoLider')
-        detalhes['num_liderancas'] = len(historico_lider_elem) if historico_lider_elem is not None else 0
-        
-        # Combinar dados básicos com detalhes
-        deputado_completo = {**deputado, **detalhes}
-        deputado_completo['detalhes_success'] = True
-        deputado_completo['processed_by_thread'] = thread_id
+        # Só o primeiro <Deputado> interessa; é extraído antes que o parser o descarte
+        deputado_elem = next(iterar_elementos(blocos, 'Deputado'), None)
+        detalhes = extrair_detalhes_deputado(deputado_elem) if deputado_elem is not None else None
+    except DocumentoVazio:
+        return {
+            **deputado,
+            'detalhes_error': 'Resposta vazia',
+            'error_type': 'empty_response'
+        }
+    # Restante do corpo lido sem parse, para a conexão voltar ao pool
+    for _ in blocos:
+        pass
+    
+    if detalhes is None:
+        return {
+            **deputado,
+            'detalhes_error': 'Elemento Deputado não encontrado',
+            'error_type': 'parse_error'
+        }
+    
+    if cache is not None and (lida or not cache.verificar(chave, response)):
+        cache.atualizar(chave, response)
+    
+    # Combinar dados básicos com detalhes
+    deputado_completo = {**deputado, **detalhes}
+    deputado_completo['detalhes_success'] = True
+    deputado_completo['processed_by_thread'] = worker
+    return deputado_completo
+
+def obter_detalhes_deputado_thread_safe(deputado, cache=None, fases=None):
+    """
+    Obtém detalhes de um deputado específico (thread-safe).
+    
+    Não conta nem loga o resultado: isso fica com quem consome os resultados
+    (`registrar_progresso`), sem lock compartilhado entre as threads. Com
+    `fases`, preenche os tempos de fila, conexão, transferência e parse.
+    """
+    thread_id = threading.current_thread().name
+    
+    params = params_detalhes(deputado['ideCadastro'])
+    headers = headers_detalhes(cache, params)
+    
+    try:
+        # Cliente compartilhado: as threads reaproveitam conexões keep-alive do pool
+        with cliente_padrao().abrir(CAMINHO_DETALHES, params, headers=headers) as response:
+            # Corpo lido em streaming durante o parse: a leitura do socket sai do tempo de parse
+            lido_antes = response.tempos['transferencia']
+            inicio = time.perf_counter()
+            resultado = montar_resultado_detalhes(deputado, response, thread_id, cache)
+            if fases is not None:
+                fases.update(response.tempos)
+                fases['parse'] = time.perf_counter() - inicio - (response.tempos['transferencia'] - lido_antes)
+        return resultado
         
-        # Log de sucesso (a cada 20 sucessos)
-        with log_lock:
-            contador_global['processados'] += 1
-            contador_global['sucessos'] += 1
-            if contador_global['sucessos'] % 20 == 0:
-                logger.info(f"[{thread_id}] ✓ {nome} processado com sucesso - {contador_global['sucessos']} sucessos de {contador_global['processados']} processados")
-        
-        return deputado_completo
-        
-    except urllib.error.URLError as e:
-        with log_lock:
-            contador_global['processados'] += 1
-            logger.error(f"[{thread_id}] URL Error para {nome} (ID: {ide_cadastro}): {e} - {contador_global['processados']}/{contador_global['total']}")
+    except (ErroConexao, OSError, http.client.HTTPException) as e:
         return {
             **deputado,
             'detalhes_error': f'URL Error: {str(e)}',
             'error_type': 'url_error'
         }
     except ET.ParseError as e:
-        with log_lock:
-            contador_global['processados'] += 1
-            logger.error(f"[{thread_id}] Parse Error para {nome} (ID: {ide_cadastro}): {e} - {contador_global['processados']}/{contador_global['total']}")
         return {
             **deputado,
             'detalhes_error': f'Parse error: {str(e)}',
             'error_type': 'xml_parse_error'
         }
     except Exception as e:
-        with log_lock:
-            contador_global['processados'] += 1
-            logger.error(f"[{thread_id}] Erro inesperado para {nome} (ID: {ide_cadastro}): {e} - {contador_global['processados']}/{contador_global['total']}")
         return {
             **deputado,
             'detalhes_error': f'Unexpected error: {str(e)}',
             'error_type': 'unexpected_error'
         }
 
-def obter_todos_detalhes_paralelo(deputados, max_workers=10):
-    """Obtém detalhes de todos os deputados usando ThreadPoolExecutor"""
-    logger.info(f"Iniciando processamento paralelo com {max_workers} workers para {len(deputados)} deputados")
+def registrar_metricas(metricas, resultado, fases, total):
+    """Registra as fases e o tempo total de uma requisição nas métricas da thread atual"""
+    worker = metricas.do_worker()
+    for fase, segundos in fases.items():
+        worker.registrar(fase, segundos)
+    if resultado and resultado.get('detalhes_success'):
+        tipo = 'sucesso'
+    else:
+        tipo = resultado.get('error_type', 'unknown') if resultado else 'future_exception'
+        worker.incrementar('erros')
+    worker.incrementar('requisicoes')
+    worker.registrar_resultado(tipo, total)
+
+def registrar_progresso(contador, resultado, origem):
+    """
+    Conta e loga um resultado final.
     
-    # Contador global compartilhado entre threads
-    contador_global = {
+    Chamado só pela thread do agendador (ou pelo event loop), então o
+    contador não precisa de lock.
+    """
+    contador['processados'] += 1
+    nome = resultado.get('nomeParlamentar') or resultado.get('nome')
+    if resultado.get('detalhes_success'):
+        contador['sucessos'] += 1
+        # Log de sucesso (a cada 20 sucessos)
+        if contador['sucessos'] % 20 == 0:
+            logger.info(f"[{origem}] ✓ {nome} processado com sucesso - {contador['sucessos']} sucessos de {contador['processados']} processados")
+    else:
+        logger.warning(f"[{origem}] {resultado['detalhes_error']} para {nome} (ID: {resultado['ideCadastro']}) - {contador['processados']}/{contador['total']}")
+
+def motivo_sobrecarga(resultado):
+    """Indica se o resultado sinaliza sobrecarga da API (para o controlador AIMD)"""
+    error_type = resultado.get('error_type') if resultado else 'future_exception'
+    if error_type == 'url_error':
+        return 'timeout' if 'timed out' in resultado.get('detalhes_error', '') else 'url_error'
+    if error_type in ('http_error', 'future_exception'):
+        return error_type
+    return None
+
+def obter_detalhes_controlado(deputado, controlador, cache=None, metricas=None, enviado_em=None):
+    """
+    Executa a coleta de um deputado dentro de uma vaga do controlador de concorrência.
+    
+    `enviado_em` (`time.monotonic()` do envio ao pool) marca o início da fila
+    nas métricas.
+    """
+    enviado_em = enviado_em if enviado_em is not None else time.monotonic()
+    controlador.adquirir()
+    inicio = time.monotonic()
+    resultado = None
+    fases = {}
+    try:
+        resultado = obter_detalhes_deputado_thread_safe(deputado, cache, fases)
+        return resultado
+    finally:
+        fim = time.monotonic()
+        # Latência do servidor para o AIMD: sem a espera no limitador e no pool do cliente
+        controlador.liberar(max(0.0, fim - inicio - fases.get('fila', 0.0)), motivo_sobrecarga(resultado))
+        if metricas is not None:
+            # Fila: espera por thread e vaga, mais a espera no limitador e no pool do cliente
+            fases['fila'] = inicio - enviado_em + fases.get('fila', 0.0)
+            registrar_metricas(metricas, resultado, fases, fim - enviado_em)
+
+def obter_todos_detalhes_paralelo(deputados, max_workers=10, controlador=None, cache=None, checkpoint=None,
+                                  resiliencia=None, metricas=None):
+    """
+    Obtém detalhes de todos os deputados usando ThreadPoolExecutor.
+    
+    O pool tem `controlador.maximo` threads, mas apenas `controlador.limite`
+    requisições ficam em voo ao mesmo tempo. Sem controlador, a concorrência
+    é fixa em `max_workers`. Com `checkpoint`, cada resultado concluído é
+    registrado para uma eventual retomada, em uma thread própria: a gravação
+    de uma parte no S3 não atrasa o agendamento dos próximos deputados.
+    
+    Com `resiliencia`, falhas transitórias voltam para uma fila e são
+    reenviadas após o backoff, e o circuit breaker pausa o envio de novos
+    deputados enquanto a API está fora do ar. Os deputados são enviados ao
+    pool aos poucos (até o limite atual do controlador), para que a pausa
+    tenha efeito.
+    
+    Progresso e logs de cada resultado ficam nesta thread, que consome os
+    resultados; as threads do pool só registram as próprias `metricas`.
+    """
+    if controlador is None:
+        controlador = ControladorAIMD.fixo(max_workers)
+    if resiliencia is None:
+        resiliencia = Resiliencia(PoliticaRetentativa(max_retentativas=0))
+    max_workers = controlador.maximo
+    logger.info(f"Iniciando processamento paralelo com até {max_workers} workers (inicial: {controlador.inicial}) para {len(deputados)} deputados")
+    
+    # Contador da thread agendadora (as threads do pool não o alteram)
+    contador = {
         'processados': 0,
         'sucessos': 0,
         'total': len(deputados)
@@ -219,33 +314,226 @@ def obter_todos_detalhes_paralelo(deputados, max_workers=10):
     resultados = []
     start_time = time.time()
     
+    # Uma única thread grava o checkpoint, na ordem de conclusão
+    gravador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Checkpoint") if checkpoint else None
+    
+    def concluir(resultado):
+        resultados.append(resultado)
+        registrar_progresso(contador, resultado, resultado.get('processed_by_thread', 'threads'))
+        if gravador:
+            gravador.submit(checkpoint.registrar, resultado)
+    
+    pendentes = deque((deputado, 0) for deputado in deputados)
+    fila = FilaRetentativas()
     with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DeputadoWorker") as executor:
-        # Submeter todas as tarefas
-        future_to_deputado = {
-            executor.submit(obter_detalhes_deputado_thread_safe, deputado, contador_global): deputado 
-            for deputado in deputados
-        }
+        em_voo = {}
+        while pendentes or fila or em_voo:
+            pendentes.extend(fila.prontos())
+            
+            # Circuito aberto por tempo demais: quem não foi enviado vira erro
+            if resiliencia.esgotado():
+                for deputado, _ in list(pendentes) + fila.esvaziar():
+                    concluir(resiliencia.resultado_circuito_aberto(deputado))
+                pendentes.clear()
+            
+            # Só o limite atual do controlador é enviado ao pool: nada fica na fila
+            # do pool para disparar depois que o circuito abrir
+            while pendentes and len(em_voo) < max(1, int(controlador.limite)) and resiliencia.permitir():
+                deputado, tentativa = pendentes.popleft()
+                enviado_em = time.monotonic()
+                future = executor.submit(obter_detalhes_controlado, deputado, controlador, cache, metricas, enviado_em)
+                em_voo[future] = (deputado, tentativa, enviado_em)
+            
+            # Acorda na próxima retentativa liberada ou no fim da pausa do circuito
+            esperas = [espera for espera in (
+                fila.espera(), resiliencia.espera() if pendentes else None
+            ) if espera is not None]
+            if not em_voo:
+                time.sleep(max(min(esperas, default=0.0), 0.01))
+                continue
+            concluidos, _ = wait(em_voo, timeout=min(esperas, default=None), return_when=FIRST_COMPLETED)
+            
+            for future in concluidos:
+                deputado, tentativa, enviado_em = em_voo.pop(future)
+                try:
+                    resultado = future.result()
+                except Exception as exc:
+                    nome = deputado['nomeParlamentar'] or deputado['nome']
+                    logger.error(f"Deputado {nome} gerou exceção: {exc}")
+                    # Adicionar como erro
+                    resultado = {
+                        **deputado,
+                        'detalhes_error': f'Future exception: {str(exc)}',
+                        'error_type': 'future_exception'
+                    }
+                atraso = resiliencia.registrar(resultado, tentativa, enviado_em)
+                if atraso is not None:
+                    fila.agendar(deputado, tentativa + 1, atraso)
+                else:
+                    concluir(resultado)
+    if gravador:
+        gravador.shutdown(wait=True)
+    
+    elapsed_time = time.time() - start_time
+    logger.info(f"Processamento paralelo concluído em {elapsed_time:.2f} segundos - concorrência final: {int(controlador.limite)}")
+    logger.info(f"Total: {len(resultados)}, Sucessos: {contador['sucessos']}, Erros: {len(resultados) - contador['sucessos']}")
+    
+    return resultados
+
+async def _obter_todos_detalhes_async(deputados, max_conexoes, controlador, cache, checkpoint=None, resiliencia=None,
+                                      hedge=None, metricas=None):
+    import asyncio
+    from camara.aio import PoolConexoesAsync, get_com_fallback
+    from camara.hedge import com_hedge
+    
+    contador = {'processados': 0, 'sucessos': 0, 'total': len(deputados)}
+    hosts = hosts_configurados()
+    
+    # Mesmo limitador de taxa do cliente das threads (e da lista de deputados)
+    limitador = limitador_padrao()
+    
+    async with PoolConexoesAsync(hosts[0], max_conexoes=max_conexoes, timeout=30, limitador=limitador) as pool:
+        # Pools próprios dos hosts alternativos (fallback, como no cliente das
+        # threads, e cópias do hedge): não disputam conexões com o principal.
+        # Nenhuma conexão é aberta enquanto o pool não é usado.
+        alternativos = [
+            PoolConexoesAsync(host, max_conexoes=max_conexoes, timeout=30, limitador=limitador)
+            for host in hosts[1:]
+        ]
+        pools = [pool, *alternativos]
         
-        # Coletar resultados conforme completam
-        for future in as_completed(future_to_deputado):
-            deputado = future_to_deputado[future]
+        async def buscar(pools_host, deputado, worker, fases):
             try:
-                resultado = future.result()
-                resultados.append(resultado)
-            except Exception as exc:
-                nome = deputado['nomeParlamentar'] or deputado['nome']
-                logger.error(f"Deputado {nome} gerou exceção: {exc}")
-                # Adicionar como erro
-                resultado_erro = {
+                params = params_detalhes(deputado['ideCadastro'])
+                headers = headers_detalhes(cache, params)
+                resposta = await get_com_fallback(pools_host, CAMINHO_DETALHES, params, headers=headers)
+                inicio = time.perf_counter()
+                resultado = montar_resultado_detalhes(deputado, resposta, worker, cache)
+                fases.update(resposta.tempos)
+                fases['parse'] = time.perf_counter() - inicio
+                return resultado
+            except asyncio.TimeoutError:
+                return {
                     **deputado,
-                    'detalhes_error': f'Future exception: {str(exc)}',
-                    'error_type': 'future_exception'
+                    'detalhes_error': 'URL Error: timeout',
+                    'error_type': 'url_error'
                 }
-                resultados.append(resultado_erro)
+            except OSError as e:
+                return {
+                    **deputado,
+                    'detalhes_error': f'URL Error: {str(e)}',
+                    'error_type': 'url_error'
+                }
+            except ET.ParseError as e:
+                return {
+                    **deputado,
+                    'detalhes_error': f'Parse error: {str(e)}',
+                    'error_type': 'xml_parse_error'
+                }
+            except Exception as e:
+                return {
+                    **deputado,
+                    'detalhes_error': f'Unexpected error: {str(e)}',
+                    'error_type': 'unexpected_error'
+                }
+        
+        async def tentar(deputado, aguardando_desde):
+            # Chamado com uma vaga do controlador adquirida; libera a vaga ao final
+            inicio = time.monotonic()
+            fases = {}
+            if hedge is None:
+                resultado = await buscar(pools, deputado, 'asyncio', fases)
+            else:
+                # Principal lento (acima do percentil): cópia no espelho, vence a primeira resposta definitiva
+                fases_espelho = {}
+                resultado, do_espelho = await com_hedge(
+                    lambda: buscar(pools, deputado, 'asyncio', fases),
+                    lambda: buscar(alternativos[:1], deputado, 'asyncio-espelho', fases_espelho),
+                    hedge, lambda resultado: not retentavel(resultado)
+                )
+                if do_espelho:
+                    fases = fases_espelho
+            fim = time.monotonic()
+            # Latência do servidor para o AIMD: sem a espera no limitador e no semáforo do pool
+            latencia = max(0.0, fim - inicio - fases.get('fila', 0.0))
+            await controlador.liberar_async(latencia, motivo_sobrecarga(resultado))
+            if metricas is not None:
+                fases['fila'] = inicio - aguardando_desde + fases.get('fila', 0.0)
+                registrar_metricas(metricas, resultado, fases, fim - aguardando_desde)
+            return resultado
+        
+        async def processar(deputado):
+            tentativa = 0
+            while True:
+                aguardando_desde = time.monotonic()
+                await controlador.adquirir_async()
+                # Circuito conferido já com a vaga: tarefas que esperavam vaga não
+                # disparam requisições depois que ele abriu
+                if not resiliencia.permitir():
+                    await controlador.devolver_async()
+                    if resiliencia.esgotado():
+                        resultado = resiliencia.resultado_circuito_aberto(deputado)
+                        break
+                    await asyncio.sleep(max(resiliencia.espera() or 0.0, 0.1))
+                    continue
+                enviado_em = time.monotonic()
+                resultado = await tentar(deputado, aguardando_desde)
+                atraso = resiliencia.registrar(resultado, tentativa, enviado_em)
+                if atraso is None:
+                    break
+                # Falha transitória: nova tentativa depois do backoff
+                tentativa += 1
+                await asyncio.sleep(atraso)
+            
+            # Sem lock: todas as tarefas rodam no mesmo event loop
+            registrar_progresso(contador, resultado, 'asyncio')
+            if checkpoint:
+                # Em uma thread: a gravação da parte no S3 bloquearia o event loop
+                await asyncio.to_thread(checkpoint.registrar, resultado)
+            return resultado
+        
+        if resiliencia is None:
+            resiliencia = Resiliencia(PoliticaRetentativa(max_retentativas=0))
+        try:
+            resultados = await asyncio.gather(*(processar(deputado) for deputado in deputados))
+        finally:
+            for alternativo in alternativos:
+                await alternativo.fechar()
+        logger.info(f"Pool asyncio: {pool.requisicoes} requisições em {pool.conexoes_abertas} conexões abertas")
+        if hedge is not None:
+            logger.info(f"Hedge: {json.dumps(hedge.resumo())}")
+    
+    return list(resultados), contador
+
+def obter_todos_detalhes_async(deputados, max_conexoes=16, controlador=None, cache=None, checkpoint=None,
+                               resiliencia=None, hedge=None, metricas=None):
+    """
+    Obtém detalhes de todos os deputados com asyncio e conexões keep-alive.
+    
+    Todas as requisições ficam em voo como tarefas do event loop e
+    compartilham no máximo `max_conexoes` conexões persistentes com o host,
+    sem o custo de DNS/TCP/TLS por deputado nem uma thread por requisição.
+    O controlador (fixo em `max_conexoes` por padrão) limita quantas
+    requisições disputam as conexões ao mesmo tempo. Com `hedge`
+    (PoliticaHedge), requisições lentas ao host principal ganham uma cópia no
+    segundo host configurado.
+    """
+    # asyncio e o cliente assíncrono são importados só neste motor: o
+    # `engine='threads'` (padrão) não paga essa importação no cold start
+    import asyncio
+    
+    if controlador is None:
+        controlador = ControladorAIMD.fixo(max_conexoes)
+    logger.info(f"Iniciando processamento asyncio com {max_conexoes} conexões para {len(deputados)} deputados")
+    start_time = time.time()
+    
+    resultados, contador = asyncio.run(_obter_todos_detalhes_async(
+        deputados, max_conexoes, controlador, cache, checkpoint, resiliencia, hedge, metricas
+    ))
     
     elapsed_time = time.time() - start_time
-    logger.info(f"Processamento paralelo concluído em {elapsed_time:.2f} segundos")
-    logger.info(f"Total: {len(resultados)}, Sucessos: {contador_global['sucessos']}, Erros: {len(resultados) - contador_global['sucessos']}")
+    logger.info(f"Processamento asyncio concluído em {elapsed_time:.2f} segundos")
+    logger.info(f"Total: {len(resultados)}, Sucessos: {contador['sucessos']}, Erros: {len(resultados) - contador['sucessos']}")
     
     return resultados
 
@@ -265,41 +553,302 @@ def analisar_resultados(resultados):
     
     return sucessos, erros, contadores_erro
 
-def salvar_s3(dados, bucket, key):
+def salvar_s3(dados, bucket, key, formato='json', esquema=None):
     try:
-        s3_client = boto3.client('s3')
-        json_data = json.dumps(dados, ensure_ascii=False, indent=2)
-        
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json_data.encode('utf-8'),
-            ContentType='application/json; charset=utf-8'
-        )
+        armazenamento = obter_armazenamento(bucket)
+        gravar(armazenamento, key, dados, formato, esquema)
         
-        logger.info(f"Dados salvos com sucesso no S3: s3://{bucket}/{key}")
+        logger.info(f"Dados salvos com sucesso: {armazenamento.uri(key)}")
         return True
         
     except Exception as e:
         logger.error(f"Erro ao salvar no S3: {e}")
         return False
 
+def criar_controlador(event, teto):
+    """Controlador de concorrência do `event`: 'adaptativa' (AIMD, padrão) ou 'fixa' no teto"""
+    if event.get('concorrencia', 'adaptativa') == 'fixa':
+        return ControladorAIMD.fixo(teto)
+    return ControladorAIMD(
+        minimo=event.get('min_workers', 2),
+        maximo=teto,
+        inicial=event.get('workers_iniciais', 8)
+    )
+
+def criar_resiliencia(event):
+    """Retentativas ('max_retentativas', padrão 3) e circuit breaker ('circuit_breaker', padrão ligado) do `event`"""
+    breaker = CircuitBreaker(
+        pausa_s=event.get('pausa_circuito_s', 5),
+        max_aberto_s=event.get('max_circuito_aberto_s', 60)
+    ) if event.get('circuit_breaker', True) else None
+    return Resiliencia(PoliticaRetentativa(max_retentativas=event.get('max_retentativas', 3)), breaker)
+
+def criar_limitador(event):
+    """
+    Configura o limitador de taxa do processo com 'taxa_max' (req/s) e 'rajada' do `event`.
+    
+    Sem as chaves, valem CAMARA_TAXA_MAX e CAMARA_RAJADA (ausentes = sem
+    limite). Os contadores são zerados a cada invocação.
+    """
+    taxa, rajada = configuracao_ambiente()
+    limitador = limitador_padrao()
+    limitador.configurar(event.get('taxa_max', taxa), event.get('rajada', rajada))
+    return limitador
+
+def criar_hedge(event, engine):
+    """Hedge no host espelho ('hedge', padrão desligado) do `event`; só no motor asyncio e com dois hosts"""
+    if not event.get('hedge', False):
+        return None
+    if engine != 'asyncio':
+        logger.warning("Hedge só é suportado no engine 'asyncio' - ignorado")
+        return None
+    if len(hosts_configurados()) < 2:
+        logger.warning("Hedge requer um host espelho em CAMARA_HOSTS - ignorado")
+        return None
+    return PoliticaHedge(
+        percentil=event.get('hedge_percentil', 95),
+        orcamento=event.get('hedge_orcamento', 0.1)
+    )
+
+def carregar_snapshot_unificado(bucket, base_key, formato):
+    """
+    Último snapshot unificado no `formato`, com as listas das tabelas filhas anexadas.
+
+    Returns:
+        tuple: (key, registros); registros vazios se não houver snapshot ou se
+        as tabelas filhas dele não existirem
+    """
+    armazenamento = obter_armazenamento(bucket)
+    key_anterior, anteriores = carregar_snapshot_anterior(
+        armazenamento, prefixo_snapshots(base_key, 'deputados_unificado', formato)
+    )
+    if not key_anterior:
+        return None, []
+    # Registros reaproveitados precisam das linhas das tabelas filhas do mesmo snapshot
+    tabelas_anteriores = carregar_tabelas(armazenamento, key_anterior)
+    if tabelas_anteriores is None:
+        logger.warning(f"Snapshot {key_anterior} sem tabelas filhas - todos os detalhes serão buscados")
+        return key_anterior, []
+    return key_anterior, anexar_tabelas(anteriores, tabelas_anteriores)
+
+def planejar_coleta(deputados, bucket, base_key, formato, incremental=False, max_idade_horas=168, snapshot=None):
+    """
+    Separa os deputados cujos detalhes serão buscados dos reaproveitados.
+
+    Sem `incremental`, todos são buscados. Os deputados a buscar recebem o
+    hash do registro da lista, que permite a próxima execução incremental.
+    `snapshot` é o retorno de `carregar_snapshot_unificado`, se já carregado.
+
+    Returns:
+        tuple: (a_buscar, reaproveitados, stats_incremental ou None)
+    """
+    reaproveitados = []
+    stats_incremental = None
+    if incremental:
+        key_anterior, anteriores = snapshot or carregar_snapshot_unificado(bucket, base_key, formato)
+        a_buscar, reaproveitados, hashes, stats_incremental = planejar_atualizacao(
+            deputados, anteriores, max_idade_horas
+        )
+        stats_incremental['snapshot_anterior'] = key_anterior
+        logger.info(f"Incremental - {len(a_buscar)} a buscar, {len(reaproveitados)} reaproveitados de {key_anterior}")
+    else:
+        a_buscar = deputados
+        hashes = {deputado['ideCadastro']: hash_registro(deputado) for deputado in deputados}
+
+    a_buscar = [{**deputado, CAMPO_HASH: hashes[deputado['ideCadastro']]} for deputado in a_buscar]
+    return a_buscar, reaproveitados, stats_incremental
+
+def coletar_detalhes(a_buscar, engine='threads', max_workers=32, max_conexoes=16, controlador=None, cache=None,
+                     checkpoint=None, resiliencia=None, hedge=None, metricas=None):
+    """
+    Busca os detalhes com o motor escolhido e marca o horário da coleta em cada resultado.
+    
+    Com `checkpoint`, os deputados já concluídos nele não são buscados de
+    novo (voltam no fim da lista) e os novos resultados são registrados nele.
+    """
+    retomados = []
+    if checkpoint:
+        a_buscar, retomados = separar_concluidos(a_buscar, checkpoint.carregar())
+        checkpoint.retomados = len(retomados)
+        if retomados:
+            logger.info(f"Retomada: {len(retomados)} deputados já concluídos no checkpoint, {len(a_buscar)} restantes")
+    
+    if engine == 'asyncio':
+        buscados = obter_todos_detalhes_async(
+            a_buscar, max_conexoes, controlador, cache, checkpoint, resiliencia, hedge, metricas
+        )
+    else:
+        buscados = obter_todos_detalhes_paralelo(
+            a_buscar, max_workers, controlador, cache, checkpoint, resiliencia, metricas
+        )
+    if checkpoint:
+        checkpoint.descarregar()
+    
+    obtido_em = datetime.now().isoformat(timespec='seconds')
+    for resultado in buscados:
+        resultado[CAMPO_OBTIDO_EM] = obtido_em
+    return buscados + retomados
+
+def gravar_resultados(resultados, sucessos, erros, bucket, base_key, timestamp, formato='json'):
+    """
+    Grava os arquivos de saída: unificado, sucessos, erros, resumo e tabelas filhas.
+
+    As listas das tabelas filhas são retiradas dos registros (`separar_tabelas`).
+
+    Returns:
+        tuple: (tabelas, arquivos_salvos, todos_salvos)
+    """
+    # Comissões, períodos e lideranças saem dos registros para tabelas próprias
+    tabelas = separar_tabelas(resultados)
+
+    # 1. Arquivo unificado (TODOS os resultados)
+    key_unificado = key_arquivo(base_key, 'deputados_unificado', timestamp, formato)
+    sucesso_unificado = salvar_s3(resultados, bucket, key_unificado, formato, ESQUEMAS['deputados_unificado'])
+
+    # 2. Apenas sucessos
+    key_sucessos = key_arquivo(base_key, 'deputados_sucessos', timestamp, formato)
+    sucesso_sucessos = salvar_s3(
+        sucessos, bucket, key_sucessos, formato, ESQUEMAS['deputados_sucessos']
+    ) if sucessos else True
+
+    # 3. Apenas erros (para análise)
+    key_erros = key_arquivo(base_key, 'deputados_erros', timestamp, formato)
+    sucesso_erros = salvar_s3(erros, bucket, key_erros, formato, ESQUEMAS['deputados_erros']) if erros else True
+
+    # 4. Resumo compacto (apenas campos essenciais dos sucessos)
+    deputados_resumo = []
+    for resultado in sucessos:
+        resumo = {
+            'ideCadastro': resultado.get('ideCadastro'),
+            'nome': resultado.get('nome'),
+            'nomeParlamentar': resultado.get('nomeParlamentar'),
+            'nomeParlamentarAtual': resultado.get('nomeParlamentarAtual'),
+            'partido': resultado.get('partido'),
+            'partidoAtual': resultado.get('partidoAtual', {}),
+            'uf': resultado.get('uf'),
+            'ufRepresentacaoAtual': resultado.get('ufRepresentacaoAtual'),
+            'condicao': resultado.get('condicao'),
+            'situacaoNaLegislaturaAtual': resultado.get('situacaoNaLegislaturaAtual'),
+            'email': resultado.get('email'),
+            'sexo': resultado.get('sexo'),
+            'dataNascimento': resultado.get('dataNascimento'),
+            'num_comissoes': resultado.get('num_comissoes', 0),
+            'num_periodos_exercicio': resultado.get('num_periodos_exercicio', 0),
+            'num_liderancas': resultado.get('num_liderancas', 0)
+        }
+        deputados_resumo.append(resumo)
+
+    key_resumo = key_arquivo(base_key, 'deputados_resumo', timestamp, formato)
+    sucesso_resumo = salvar_s3(deputados_resumo, bucket, key_resumo, formato, ESQUEMAS['deputados_resumo'])
+
+    # 5. Tabelas filhas normalizadas, chaveadas por ideCadastro
+    arquivos_tabelas = {}
+    for nome, linhas in tabelas.items():
+        key_filha = key_tabela(key_unificado, nome)
+        salvo = salvar_s3(linhas, bucket, key_filha, formato, ESQUEMAS[f'deputados_{nome}'])
+        arquivos_tabelas[nome] = f"s3://{bucket}/{key_filha}" if salvo else None
+    sucesso_tabelas = all(arquivos_tabelas.values())
+
+    arquivos_salvos = {
+        'unificado': f"s3://{bucket}/{key_unificado}" if sucesso_unificado else None,
+        'sucessos': f"s3://{bucket}/{key_sucessos}" if sucesso_sucessos else None,
+        'erros': f"s3://{bucket}/{key_erros}" if sucesso_erros and erros else None,
+        'resumo': f"s3://{bucket}/{key_resumo}" if sucesso_resumo else None,
+        'tabelas_filhas': arquivos_tabelas
+    }
+    todos_salvos = sucesso_unificado and sucesso_sucessos and sucesso_erros and sucesso_resumo and sucesso_tabelas
+    return tabelas, arquivos_salvos, todos_salvos
+
+def adicionar_exemplos(stats, sucessos, erros):
+    """Inclui nas estatísticas alguns exemplos de sucessos e de erros"""
+    # Exemplos de sucessos
+    exemplos_sucessos = []
+    for deputado in sucessos[:5]:
+        nome = deputado.get('nomeParlamentarAtual', deputado.get('nomeParlamentar', 'N/A'))
+        partido = deputado.get('partidoAtual', {}).get('sigla', deputado.get('partido', 'N/A'))
+        uf = deputado.get('ufRepresentacaoAtual', deputado.get('uf', 'N/A'))
+        comissoes = deputado.get('num_comissoes', 0)
+        exemplos_sucessos.append(f"{nome} ({partido}-{uf}), {comissoes} comissões")
+
+    if exemplos_sucessos:
+        stats['exemplos_sucessos'] = exemplos_sucessos
+
+    # Exemplos de erros
+    exemplos_erros = []
+    for erro in erros[:3]:
+        nome = erro.get('nomeParlamentar', erro.get('nome', 'N/A'))
+        tipo_erro = erro.get('error_type', 'unknown')
+        msg_erro = erro.get('detalhes_error', 'N/A')
+        exemplos_erros.append(f"{nome}: {tipo_erro} - {msg_erro}")
+
+    if exemplos_erros:
+        stats['exemplos_erros'] = exemplos_erros
+
 def lambda_handler(event, context):
     try:
         # Configurações
-        bucket = 'dev-lab-02-us-east-2-landing'
-        base_key = 'camara/detalhesDeputados'
+        bucket = BUCKET
+        base_key = BASE_KEY
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Configurações de paralelismo e limite
-        max_workers = event.get('max_workers', 20) if event else 8  # Reduzido para evitar sobrecarregar a API
-        limite = event.get('limite', None) if event else None
+        event = event or {}
+        limite = event.get('limite', None)
+        
+        # Motor de coleta: 'threads' (padrão) ou 'asyncio' (conexões keep-alive)
+        engine = event.get('engine', 'threads')
+        max_workers = event.get('max_workers', 32)  # Teto de threads
+        max_conexoes = event.get('max_conexoes', 16)  # Teto de conexões no modo asyncio
+        
+        # Concorrência 'adaptativa' (AIMD, padrão) ou 'fixa' no teto configurado
+        concorrencia = event.get('concorrencia', 'adaptativa')
+        teto = max_conexoes if engine == 'asyncio' else max_workers
+        controlador = criar_controlador(event, teto)
+        
+        # Atualização incremental a partir do último snapshot unificado
+        incremental = event.get('incremental', False)
+        max_idade_horas = event.get('max_idade_horas', 168)
+        
+        # Formato dos arquivos: 'json' (padrão), 'ndjson' (gzip, um registro por linha) ou 'parquet' (colunar, particionado por dt=)
+        formato = validar_formato(event.get('formato', 'json'))
+        
+        # Cache de validadores (ETag/Last-Modified/SHA-256); 'forcar' ignora o cache
+        forcar = event.get('forcar', False)
+        cache = None if forcar else CacheValidadores(
+            obter_armazenamento(bucket), f"{base_key}/_cache/validadores.json"
+        )
+        if cache:
+            # Outro formato ou limite: a saída anterior não serve, nada é "inalterado"
+            cache.configurar_saida({'formato': formato, 'limite': limite})
+        
+        # Checkpoints periódicos dos detalhes concluídos; 'retomar' continua de onde
+        # uma execução interrompida parou em vez de descartar os checkpoints
+        checkpoint = CheckpointColeta(
+            obter_armazenamento(bucket), f"{base_key}/_checkpoint",
+            intervalo_s=event.get('checkpoint_intervalo_s', 30)
+        ) if event.get('checkpoint', True) else None
+        if checkpoint and not event.get('retomar', False) and not checkpoint.limpar():
+            # Partes antigas que não puderam ser removidas não podem ser retomadas
+            logger.warning("Checkpoint desativado nesta execução")
+            checkpoint = None
+        
+        # Falhas transitórias são reenviadas com backoff; o circuit breaker pausa o envio com a API fora do ar
+        resiliencia = criar_resiliencia(event)
+        
+        # Hedge: requisições lentas ao host principal ganham uma cópia no espelho (engine asyncio)
+        hedge = criar_hedge(event, engine)
+        
+        # Limite de taxa (token bucket) compartilhado por todas as requisições à API
+        limitador = criar_limitador(event)
         
-        logger.info(f"Configurações - Limite: {limite}, Max workers: {max_workers}")
+        # Histogramas por fase (fila, conexão, transferência, parse, total) em cada worker
+        metricas = Metricas()
+        
+        logger.info(f"Configurações - Limite: {limite}, Engine: {engine}, Concorrência: {concorrencia}, Teto: {teto}, Cache: {cache is not None}, Checkpoint: {checkpoint is not None}, Taxa máxima: {limitador.taxa}")
         
         # Obter lista de deputados
         logger.info("=== FASE 1: Obtendo lista de deputados ===")
-        deputados = obter_lista_deputados()
+        deputados = obter_lista_deputados(cache)
         
         if not deputados:
             return {
@@ -315,9 +864,25 @@ def lambda_handler(event, context):
             deputados = deputados[:limite]
             logger.info(f"Aplicado limite de {limite} deputados")
         
+        # Último snapshot unificado: reaproveitado no modo incremental e nas respostas 304
+        snapshot = carregar_snapshot_unificado(bucket, base_key, formato) if incremental or cache else None
+        if cache:
+            cache.carregar_registros({
+                chave_cache(CAMINHO_DETALHES, params_detalhes(registro['ideCadastro'])): registro
+                for registro in snapshot[1] if registro.get('detalhes_success')
+            })
+        
+        # Modo incremental: só busca detalhes de deputados novos, alterados ou expirados
+        a_buscar, reaproveitados, stats_incremental = planejar_coleta(
+            deputados, bucket, base_key, formato, incremental, max_idade_horas, snapshot
+        )
+        
         # Obter detalhes de todos os deputados em paralelo
         logger.info("=== FASE 2: Obtendo detalhes em paralelo ===")
-        resultados = obter_todos_detalhes_paralelo(deputados, max_workers)
+        buscados = coletar_detalhes(
+            a_buscar, engine, max_workers, max_conexoes, controlador, cache, checkpoint, resiliencia, hedge, metricas
+        )
+        resultados = buscados + reaproveitados
         
         if not resultados:
             return {
@@ -332,103 +897,81 @@ def lambda_handler(event, context):
         logger.info("=== FASE 3: Analisando resultados ===")
         sucessos, erros, contadores_erro = analisar_resultados(resultados)
         
-        logger.info(f"Análise concluída - Sucessos: {len(sucessos)}, Erros: {len(erros)}")
+        # Retentativas por tipo de erro (inclusive as que terminaram em sucesso)
+        contadores_erro['retentativas'] = resiliencia.retentativas
         
-        # Salvar arquivos no S3
-        logger.info("=== FASE 4: Salvando arquivos no S3 ===")
+        logger.info(f"Análise concluída - Sucessos: {len(sucessos)}, Erros: {len(erros)}")
         
-        # 1. Arquivo unificado (TODOS os resultados)
-        key_unificado = f"{base_key}/deputados_unificado_{timestamp}.json"
-        sucesso_unificado = salvar_s3(resultados, bucket, key_unificado)
-        
-        # 2. Apenas sucessos
-        key_sucessos = f"{base_key}/deputados_sucessos_{timestamp}.json"
-        sucesso_sucessos = salvar_s3(sucessos, bucket, key_sucessos) if sucessos else True
-        
-        # 3. Apenas erros (para análise)
-        key_erros = f"{base_key}/deputados_erros_{timestamp}.json"
-        sucesso_erros = salvar_s3(erros, bucket, key_erros) if erros else True
-        
-        # 4. Resumo compacto (apenas campos essenciais dos sucessos)
-        deputados_resumo = []
-        for resultado in sucessos:
-            resumo = {
-                'ideCadastro': resultado.get('ideCadastro'),
-                'nome': resultado.get('nome'),
-                'nomeParlamentar': resultado.get('nomeParlamentar'),
-                'nomeParlamentarAtual': resultado.get('nomeParlamentarAtual'),
-                'partido': resultado.get('partido'),
-                'partidoAtual': resultado.get('partidoAtual', {}),
-                'uf': resultado.get('uf'),
-                'ufRepresentacaoAtual': resultado.get('ufRepresentacaoAtual'),
-                'condicao': resultado.get('condicao'),
-                'situacaoNaLegislaturaAtual': resultado.get('situacaoNaLegislaturaAtual'),
-                'email': resultado.get('email'),
-                'sexo': resultado.get('sexo'),
-                'dataNascimento': resultado.get('dataNascimento'),
-                'num_comissoes': resultado.get('num_comissoes', 0),
-                'num_periodos_exercicio': resultado.get('num_periodos_exercicio', 0),
-                'num_liderancas': resultado.get('num_liderancas', 0)
+        # Lista e todos os detalhes idênticos aos da última execução: nada a gravar
+        # (uma retomada grava sempre: a execução interrompida não chegou a gravar)
+        retomada = bool(checkpoint and checkpoint.retomados)
+        if cache and cache.alterados == 0 and not erros and not retomada:
+            logger.info("Nenhuma resposta mudou desde a última execução - arquivos não regravados")
+            if checkpoint:
+                checkpoint.limpar()
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Dados inalterados desde a última execução - nenhum arquivo gravado',
+                    'inalterado': True,
+                    'stats': {
+                        'timestamp': timestamp,
+                        'total_deputados': len(resultados),
+                        'cache': cache.resumo()
+                    }
+                }, ensure_ascii=False, indent=2)
             }
-            deputados_resumo.append(resumo)
         
-        key_resumo = f"{base_key}/deputados_resumo_{timestamp}.json"
-        sucesso_resumo = salvar_s3(deputados_resumo, bucket, key_resumo)
+        # Salvar arquivos no S3
+        logger.info("=== FASE 4: Salvando arquivos no S3 ===")
+        tabelas, arquivos_salvos, todos_salvos = gravar_resultados(
+            resultados, sucessos, erros, bucket, base_key, timestamp, formato
+        )
         
         # Compilar estatísticas detalhadas
         stats = {
             'timestamp': timestamp,
             'configuracoes': {
                 'limite_aplicado': limite,
-                'max_workers': max_workers,
+                'engine': engine,
+                'formato': formato,
+                'max_workers': max_workers if engine != 'asyncio' else None,
+                'max_conexoes': max_conexoes if engine == 'asyncio' else None,
+                'concorrencia': controlador.resumo(),
+                'cache': cache.resumo() if cache else None,
+                'checkpoint': checkpoint.resumo() if checkpoint else None,
+                'resiliencia': resiliencia.resumo(),
+                'hedge': hedge.resumo() if hedge else None,
+                'limitador': limitador.resumo(),
+                'incremental': stats_incremental,
                 'total_solicitados': len(deputados),
-                'total_processados': len(resultados)
+                'total_processados': len(resultados),
+                'detalhes_requisitados': len(a_buscar)
             },
             'resultados': {
                 'total_deputados': len(resultados),
                 'sucessos': len(sucessos),
                 'erros': len(erros),
-                'taxa_sucesso': f"{(len(sucessos)/len(resultados)*100):.1f}%" if resultados else "0%"
+                'taxa_sucesso': f"{(len(sucessos)/len(resultados)*100):.1f}%" if resultados else "0%",
+                'tabelas_filhas': {nome: len(linhas) for nome, linhas in tabelas.items()}
             },
             'tipos_erro': contadores_erro,
-            'arquivos_salvos': {
-                'unificado': f"s3://{bucket}/{key_unificado}" if sucesso_unificado else None,
-                'sucessos': f"s3://{bucket}/{key_sucessos}" if sucesso_sucessos else None,
-                'erros': f"s3://{bucket}/{key_erros}" if sucesso_erros and erros else None,
-                'resumo': f"s3://{bucket}/{key_resumo}" if sucesso_resumo else None
-            }
+            'metricas': metricas.resumo(),
+            'arquivos_salvos': arquivos_salvos
         }
-        
-        # Exemplos de sucessos
-        exemplos_sucessos = []
-        for deputado in sucessos[:5]:
-            nome = deputado.get('nomeParlamentarAtual', deputado.get('nomeParlamentar', 'N/A'))
-            partido = deputado.get('partidoAtual', {}).get('sigla', deputado.get('partido', 'N/A'))
-            uf = deputado.get('ufRepresentacaoAtual', deputado.get('uf', 'N/A'))
-            comissoes = deputado.get('num_comissoes', 0)
-            exemplos_sucessos.append(f"{nome} ({partido}-{uf}), {comissoes} comissões")
-        
-        if exemplos_sucessos:
-            stats['exemplos_sucessos'] = exemplos_sucessos
-        
-        # Exemplos de erros
-        exemplos_erros = []
-        for erro in erros[:3]:
-            nome = erro.get('nomeParlamentar', erro.get('nome', 'N/A'))
-            tipo_erro = erro.get('error_type', 'unknown')
-            msg_erro = erro.get('detalhes_error', 'N/A')
-            exemplos_erros.append(f"{nome}: {tipo_erro} - {msg_erro}")
-        
-        if exemplos_erros:
-            stats['exemplos_erros'] = exemplos_erros
+        adicionar_exemplos(stats, sucessos, erros)
         
         logger.info("=== PROCESSAMENTO CONCLUÍDO ===")
         logger.info(f"Estatísticas finais: {json.dumps(stats, ensure_ascii=False, indent=2)}")
         
         # Determinar status da resposta
-        todos_salvos = sucesso_unificado and sucesso_sucessos and sucesso_erros and sucesso_resumo
-        
         if todos_salvos:
+            # Validadores só são persistidos (e o checkpoint descartado) depois que os dados foram gravados;
+            # uma falha ao remover o checkpoint é só logada, os arquivos já estão salvos
+            if cache:
+                cache.salvar()
+            if checkpoint:
+                checkpoint.limpar()
             status_code = 200
             message = 'Processamento paralelo concluído com sucesso - todos os arquivos salvos no S3'
         else:
@@ -451,4 +994,309 @@ def lambda_handler(event, context):
                 'message': 'Erro interno da função Lambda',
                 'error': str(e)
             })
-        }
\ No newline at end of file
+        }
+
+def criar_invocador(event, context=None):
+    """
+    Invocador do fan-out: 'lambda' (padrão) ou 'local' (processos nesta máquina).
+    
+    Na Lambda, a espera por cada worker fica limitada ao tempo restante do
+    coordenador menos `MARGEM_MERGE_S`: um worker que não responde a tempo
+    vira falha do shard, e o coordenador ainda invoca o merge antes do seu
+    próprio timeout.
+    """
+    if event.get('invocacao', 'lambda') == 'local':
+        return InvocadorLocal({
+            event.get('funcao_worker', FUNCAO_WORKER): f"{__name__}.worker_handler",
+            event.get('funcao_merge', FUNCAO_MERGE): f"{__name__}.merge_handler",
+        }, processos=event.get('processos'))
+    timeout = TIMEOUT_LAMBDA_S
+    restante = tempo_restante(context)
+    if restante is not None:
+        timeout = min(timeout, max(1, int(restante - MARGEM_MERGE_S)))
+    return InvocadorLambda(max_paralelo=event.get('num_shards', NUM_SHARDS_PADRAO), timeout=timeout)
+
+def coordenador_handler(event, context):
+    """
+    Coordenador do fan-out: divide os deputados em shards e invoca workers e merge.
+    
+    Cada worker recebe os deputados do seu shard no payload; shards cujo
+    worker falhou entram no merge como erros ('shard_error'), para que o
+    unificado continue com todos os deputados. O cache de validadores não é
+    usado no fan-out (os workers o gravariam concorrentemente).
+    
+    As invocações dos workers são síncronas, dentro do timeout do próprio
+    coordenador: sem pelo menos `MARGEM_MERGE_S` restantes, nenhum worker é
+    invocado; depois, a espera por eles é limitada (ver `criar_invocador`).
+    Um worker que estoura essa espera continua rodando; se ele gravar o
+    arquivo do shard depois do merge, o arquivo fica em `_fanout/<execucao>/`.
+    """
+    try:
+        event = event or {}
+        inicio = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        execucao = event.get('execucao', timestamp)
+        formato = validar_formato(event.get('formato', 'json'))
+        num_shards = max(1, event.get('num_shards', NUM_SHARDS_PADRAO))
+        funcao_worker = event.get('funcao_worker', FUNCAO_WORKER)
+        funcao_merge = event.get('funcao_merge', FUNCAO_MERGE)
+        invocador = criar_invocador(event, context)
+        limitador = criar_limitador(event)
+        
+        logger.info("=== FAN-OUT: Obtendo lista de deputados ===")
+        deputados = obter_lista_deputados()
+        if not deputados:
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'message': 'Falha ao obter lista de deputados',
+                    'error': 'API_ERROR'
+                })
+            }
+        limite = event.get('limite')
+        if limite:
+            deputados = deputados[:limite]
+        
+        a_buscar, reaproveitados, stats_incremental = planejar_coleta(
+            deputados, BUCKET, BASE_KEY, formato,
+            event.get('incremental', False), event.get('max_idade_horas', 168)
+        )
+        armazenamento = obter_armazenamento(BUCKET)
+        key_reaproveitados_execucao = None
+        if reaproveitados:
+            key_reaproveitados_execucao = key_reaproveitados(BASE_KEY, execucao)
+            gravar(armazenamento, key_reaproveitados_execucao, reaproveitados, 'ndjson')
+        
+        shards = dividir_em_shards(a_buscar, num_shards)
+        config_worker = {campo: event[campo] for campo in CAMPOS_WORKER if campo in event}
+        # A taxa máxima (do event ou do ambiente) vale para a execução inteira:
+        # cada worker fica com uma fração dela (0 = sem limite, mesmo que o
+        # ambiente do worker defina CAMARA_TAXA_MAX)
+        if shards:
+            config_worker['taxa_max'] = (limitador.taxa or 0) / len(shards)
+            if limitador.taxa is not None:
+                config_worker['rajada'] = limitador.rajada / len(shards)
+        payloads = [
+            {'execucao': execucao, 'indice': indice, 'deputados': shard, **config_worker}
+            for indice, shard in enumerate(shards)
+        ]
+        restante = tempo_restante(context)
+        if restante is not None and restante <= MARGEM_MERGE_S:
+            logger.error(f"Tempo restante insuficiente para o fan-out: {restante:.0f} s")
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'message': 'Tempo restante insuficiente para invocar workers e merge',
+                    'error': 'TIMEOUT'
+                })
+            }
+        logger.info(f"=== FAN-OUT: {len(a_buscar)} deputados em {len(shards)} shards ({funcao_worker}) ===")
+        inicio_workers = time.perf_counter()
+        respostas = invocador.invocar_varios(funcao_worker, payloads)
+        duracao_workers = round(time.perf_counter() - inicio_workers, 3)
+        
+        stats_shards = []
+        retentativas = {}
+        for payload, resposta in zip(payloads, respostas):
+            dados = corpo(resposta)
+            for tipo, quantidade in ((dados.get('resiliencia') or {}).get('retentativas') or {}).items():
+                retentativas[tipo] = retentativas.get(tipo, 0) + quantidade
+            if resposta.get('statusCode') != 200:
+                # Deputados do shard viram erros no unificado, como falhas de coleta
+                erro = dados.get('error', 'sem resposta')
+                logger.error(f"Shard {payload['indice']} falhou: {erro}")
+                obtido_em = datetime.now().isoformat(timespec='seconds')
+                gravar(armazenamento, key_shard(BASE_KEY, execucao, payload['indice']), [
+                    {**deputado, 'detalhes_error': f'Shard error: {erro}', 'error_type': 'shard_error',
+                     CAMPO_OBTIDO_EM: obtido_em}
+                    for deputado in payload['deputados']
+                ], 'ndjson')
+            stats_shards.append({
+                'indice': payload['indice'],
+                'deputados': len(payload['deputados']),
+                'statusCode': resposta.get('statusCode'),
+                'sucessos': dados.get('sucessos'),
+                'hedge': dados.get('hedge'),
+                'duracao_s': dados.get('duracao_s')
+            })
+        
+        logger.info(f"=== FAN-OUT: Merge ({funcao_merge}) ===")
+        inicio_merge = time.perf_counter()
+        resposta_merge = invocador.invocar(funcao_merge, {
+            'execucao': execucao,
+            'timestamp': timestamp,
+            'formato': formato,
+            'shards': [key_shard(BASE_KEY, execucao, payload['indice']) for payload in payloads],
+            'reaproveitados': key_reaproveitados_execucao,
+            'incremental': stats_incremental,
+            'retentativas': retentativas
+        })
+        duracao_merge = round(time.perf_counter() - inicio_merge, 3)
+        
+        stats = {
+            'timestamp': timestamp,
+            'execucao': execucao,
+            'num_shards': len(shards),
+            'total_deputados': len(deputados),
+            'detalhes_requisitados': len(a_buscar),
+            'reaproveitados': len(reaproveitados),
+            'shards': stats_shards,
+            'duracao_workers_s': duracao_workers,
+            'duracao_merge_s': duracao_merge,
+            'duracao_total_s': round(time.perf_counter() - inicio, 3),
+            'merge': corpo(resposta_merge).get('stats')
+        }
+        status_code = resposta_merge.get('statusCode', 500)
+        if status_code == 200 and any(shard['statusCode'] != 200 for shard in stats_shards):
+            status_code = 207
+        logger.info(f"Fan-out concluído: {json.dumps(stats, ensure_ascii=False)}")
+        return {
+            'statusCode': status_code,
+            'body': json.dumps({
+                'message': 'Fan-out concluído' if status_code == 200 else 'Fan-out concluído com falhas',
+                'stats': stats
+            }, ensure_ascii=False, indent=2)
+        }
+        
+    except Exception as e:
+        logger.error(f"Erro geral no coordenador: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Erro interno do coordenador',
+                'error': str(e)
+            })
+        }
+
+def worker_handler(event, context):
+    """Worker do fan-out: busca os detalhes dos deputados do shard e grava o arquivo do shard"""
+    inicio = time.perf_counter()
+    try:
+        deputados = event['deputados']
+        engine = event.get('engine', 'threads')
+        max_workers = event.get('max_workers', 32)
+        max_conexoes = event.get('max_conexoes', 16)
+        controlador = criar_controlador(event, max_conexoes if engine == 'asyncio' else max_workers)
+        
+        # Checkpoint do shard: uma nova invocação do mesmo shard continua de onde parou
+        checkpoint = CheckpointColeta(
+            obter_armazenamento(BUCKET),
+            f"{key_execucao(BASE_KEY, event['execucao'])}/checkpoint-{event['indice']:05d}",
+            intervalo_s=event.get('checkpoint_intervalo_s', 30)
+        )
+        
+        logger.info(f"Worker do shard {event['indice']}: {len(deputados)} deputados")
+        resiliencia = criar_resiliencia(event)
+        hedge = criar_hedge(event, engine)
+        limitador = criar_limitador(event)
+        metricas = Metricas()
+        buscados = coletar_detalhes(
+            deputados, engine, max_workers, max_conexoes, controlador, checkpoint=checkpoint, resiliencia=resiliencia,
+            hedge=hedge, metricas=metricas
+        )
+        
+        key = key_shard(BASE_KEY, event['execucao'], event['indice'])
+        gravar(obter_armazenamento(BUCKET), key, buscados, 'ndjson')
+        
+        sucessos = sum(1 for resultado in buscados if resultado.get('detalhes_success'))
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'shard': key,
+                'indice': event['indice'],
+                'total': len(buscados),
+                'sucessos': sucessos,
+                'erros': len(buscados) - sucessos,
+                'concorrencia': controlador.resumo(),
+                'checkpoint': checkpoint.resumo(),
+                'resiliencia': resiliencia.resumo(),
+                'hedge': hedge.resumo() if hedge else None,
+                'limitador': limitador.resumo(),
+                'metricas': metricas.resumo(),
+                'duracao_s': round(time.perf_counter() - inicio, 3)
+            }, ensure_ascii=False)
+        }
+        
+    except Exception as e:
+        logger.error(f"Erro no worker do shard {(event or {}).get('indice')}: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': str(e),
+                'duracao_s': round(time.perf_counter() - inicio, 3)
+            })
+        }
+
+def merge_handler(event, context):
+    """
+    Merge do fan-out: junta os shards nos arquivos unificado, sucessos, erros e resumo.
+    
+    Os arquivos intermediários só são removidos se toda a saída for gravada;
+    em caso de falha, o merge pode ser invocado de novo com o mesmo payload.
+    """
+    try:
+        armazenamento = obter_armazenamento(BUCKET)
+        formato = validar_formato(event.get('formato', 'json'))
+        keys = list(event['shards'])
+        if event.get('reaproveitados'):
+            keys.append(event['reaproveitados'])
+        
+        resultados = []
+        for key in keys:
+            conteudo = armazenamento.ler(key)
+            if conteudo is None:
+                raise ValueError(f"Arquivo do fan-out não encontrado: {key}")
+            resultados.extend(ler_registros(conteudo, key))
+        
+        sucessos, erros, contadores_erro = analisar_resultados(resultados)
+        contadores_erro['retentativas'] = event.get('retentativas', {})
+        logger.info(f"Merge de {len(keys)} arquivos - Sucessos: {len(sucessos)}, Erros: {len(erros)}")
+        
+        tabelas, arquivos_salvos, todos_salvos = gravar_resultados(
+            resultados, sucessos, erros, BUCKET, BASE_KEY, event['timestamp'], formato
+        )
+        
+        stats = {
+            'timestamp': event['timestamp'],
+            'configuracoes': {
+                'formato': formato,
+                'fan_out': {'execucao': event['execucao'], 'shards': len(event['shards'])},
+                'incremental': event.get('incremental')
+            },
+            'resultados': {
+                'total_deputados': len(resultados),
+                'sucessos': len(sucessos),
+                'erros': len(erros),
+                'taxa_sucesso': f"{(len(sucessos)/len(resultados)*100):.1f}%" if resultados else "0%",
+                'tabelas_filhas': {nome: len(linhas) for nome, linhas in tabelas.items()}
+            },
+            'tipos_erro': contadores_erro,
+            'arquivos_salvos': arquivos_salvos
+        }
+        adicionar_exemplos(stats, sucessos, erros)
+        
+        if todos_salvos:
+            # Saída já gravada: uma falha ao remover os intermediários é só logada
+            try:
+                for key in armazenamento.listar(key_execucao(BASE_KEY, event['execucao']) + '/'):
+                    armazenamento.remover(key)
+            except Exception as e:
+                logger.warning(f"Falha ao remover os arquivos intermediários do fan-out: {e}")
+        
+        return {
+            'statusCode': 200 if todos_salvos else 207,
+            'body': json.dumps({
+                'message': 'Merge concluído' if todos_salvos else 'Merge concluído com falhas parciais no salvamento de arquivos',
+                'stats': stats
+            }, ensure_ascii=False, indent=2)
+        }
+        
+    except Exception as e:
+        logger.error(f"Erro no merge: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Erro interno do merge',
+                'error': str(e)
+            })
+        }
@@ -1,55 +1,46 @@
-import requests
 import xml.etree.ElementTree as ET
 import json
-import boto3
 from datetime import datetime
 import logging
 
+from camara.armazenamento import obter_armazenamento
+from camara.cache import INALTERADO, CacheValidadores, chave_cache
+from camara.cliente import CAMINHO_PARTIDOS, ErroCamara, cliente_padrao
+from camara.esquemas import EXTRATOR_PARTIDO
+from camara.parsers import iterar_elementos
+from camara.saida import ESQUEMAS, gravar, key_arquivo, validar_formato
+
 # Configurar logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def obter_partidos_json():
-    url = "https://www.camara.leg.br/SitCamaraWS/Deputados.asmx/ObterPartidosCD"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
-    
+def obter_partidos_json(cache=None):
     try:
         logger.info("Fazendo requisição para a API de partidos...")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  
-        
-        logger.info("Processando dados XML...")
-        root = ET.fromstring(response.content)
-        
+        chave = chave_cache(CAMINHO_PARTIDOS)
+        headers = cache.headers_condicionais(chave) if cache else None
         partidos = []
         
-        for partido_elem in root.findall('partido'):
-            partido = {}
-            
-            campos = [
-                'idPartido', 'siglaPartido', 'nomePartido', 
-                'dataCriacao', 'dataExtincao'
-            ]
+        # O cliente compartilhado já tenta www.camara.gov.br se www.camara.leg.br falhar
+        with cliente_padrao().abrir(CAMINHO_PARTIDOS, headers=headers) as response:
+            response.raise_for_status()
             
-            for campo in campos:
-                elemento = partido_elem.find(campo)
-                if elemento is not None and elemento.text is not None:
-                    partido[campo] = elemento.text.strip()
-                else:
-                    partido[campo] = None
-            
-            partidos.append(partido)
-        
+            if response.status != 304:
+                # XML processado em streaming, à medida que chega
+                logger.info("Processando dados XML...")
+                for partido_elem in iterar_elementos(response.iter_blocos(), 'partido'):
+                    partidos.append(EXTRATOR_PARTIDO(partido_elem))
+        
+        # 304 (sem parse) ou corpo idêntico ao da última execução (sem serialização)
+        if cache and cache.verificar(chave, response):
+            logger.info("Partidos inalterados desde a última execução")
+            return INALTERADO
+        
+        if cache:
+            cache.atualizar(chave, response)
         return partidos
         
-    except requests.exceptions.RequestException as e:
+    except ErroCamara as e:
         logger.error(f"Erro na requisição HTTP: {e}")
         return None
     except ET.ParseError as e:
@@ -59,51 +50,9 @@ def obter_partidos_json():
         logger.error(f"Erro inesperado: {e}")
         return None
 
-def obter_partidos_alternativo():
-    url_alternativa = "https://www.camara.gov.br/SitCamaraWS/Deputados.asmx/ObterPartidosCD"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/xml, text/xml, */*',
-    }
-    
+def salvar_s3(dados, bucket, key, formato='json'):
     try:
-        logger.info("Tentando URL alternativa...")
-        response = requests.get(url_alternativa, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        logger.info("Processando dados XML da URL alternativa...")
-        root = ET.fromstring(response.content)
-        partidos = []
-        
-        for partido_elem in root.findall('.//partido'):
-            partido = {
-                'idPartido': partido_elem.findtext('idPartido'),
-                'siglaPartido': partido_elem.findtext('siglaPartido'),
-                'nomePartido': partido_elem.findtext('nomePartido'),
-                'dataCriacao': partido_elem.findtext('dataCriacao'),
-                'dataExtincao': partido_elem.findtext('dataExtincao')
-            }
-            partidos.append(partido)
-        
-        return partidos
-        
-    except Exception as e:
-        logger.error(f"Erro na URL alternativa: {e}")
-        return None
-
-def salvar_s3(dados, bucket, key):
-    try:
-        s3_client = boto3.client('s3')
-        
-        json_data = json.dumps(dados, ensure_ascii=False, indent=2)
-        
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json_data.encode('utf-8'),
-            ContentType='application/json; charset=utf-8'
-        )
+        gravar(obter_armazenamento(bucket), key, dados, formato, ESQUEMAS['partidos_completo'])
         
         logger.info(f"Dados salvos com sucesso no S3: s3://{bucket}/{key}")
         return True
@@ -120,11 +69,28 @@ def filtrar_partidos_extintos(partidos):
 
 def lambda_handler(event, context):
     try:
-        partidos = obter_partidos_json()
+        bucket = 'dev-lab-02-us-east-2-landing'
+        base_key = 'camara/partidos'
         
-        if not partidos:
-            logger.info("Tentando método alternativo...")
-            partidos = obter_partidos_alternativo()
+        # 'forcar': ignora o cache de validadores e grava mesmo sem mudanças
+        forcar = (event or {}).get('forcar', False)
+        # 'formato': 'json' (padrão), 'ndjson' (gzip, um registro por linha) ou 'parquet' (colunar, particionado por dt=)
+        formato = validar_formato((event or {}).get('formato', 'json'))
+        cache = None if forcar else CacheValidadores(obter_armazenamento(bucket), f"{base_key}/_cache/validadores.json")
+        if cache:
+            # Em outro formato a saída anterior não serve: grava de novo
+            cache.configurar_saida({'formato': formato})
+        
+        partidos = obter_partidos_json(cache)
+        
+        if partidos is INALTERADO:
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Dados dos partidos inalterados desde a última execução - nenhum arquivo gravado',
+                    'inalterado': True
+                }, ensure_ascii=False)
+            }
         
         if not partidos:
             return {
@@ -138,12 +104,9 @@ def lambda_handler(event, context):
         # Gerar timestamp para o arquivo
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        bucket = 'dev-lab-02-us-east-2-landing'
-        base_key = 'camara/partidos'
-        
         # Salvar dados completos
-        key_completo = f"{base_key}/partidos_completo_{timestamp}.json"
-        sucesso_completo = salvar_s3(partidos, bucket, key_completo)
+        key_completo = key_arquivo(base_key, 'partidos_completo', timestamp, formato)
+        sucesso_completo = salvar_s3(partidos, bucket, key_completo, formato)
         
         # Estatísticas
         stats = {
@@ -157,6 +120,9 @@ def lambda_handler(event, context):
         logger.info(f"Processamento concluído: {stats}")
         
         if sucesso_completo:
+            # Validadores só são persistidos depois que os dados foram gravados
+            if cache:
+                cache.salvar()
             return {
                 'statusCode': 200,
                 'body': json.dumps({
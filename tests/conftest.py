@@ -0,0 +1,92 @@
+import http.server
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+# Handlers das Lambdas são importados pelo nome do módulo, como no pacote da função
+sys.path.insert(0, os.path.join(RAIZ, 'lambda'))
+
+
+class _Manipulador(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        servidor = self.server
+        servidor.requisicoes += 1
+        corpo = servidor.corpo
+        self.send_response(servidor.status)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    """Fábrica de servidores HTTP locais: servidor(status=200, corpo=b'...') -> objeto com `.url`"""
+    criados = []
+
+    def criar(status=200, corpo=b'<ok/>'):
+        instancia = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Manipulador)
+        instancia.daemon_threads = True
+        instancia.status = status
+        instancia.corpo = corpo
+        instancia.requisicoes = 0
+        instancia.url = f"http://127.0.0.1:{instancia.server_address[1]}"
+        threading.Thread(target=instancia.serve_forever, daemon=True).start()
+        criados.append(instancia)
+        return instancia
+
+    yield criar
+    for instancia in criados:
+        instancia.shutdown()
+        instancia.server_close()
+
+
+@pytest.fixture
+def porta_fechada():
+    """URL de uma porta local sem servidor (conexão recusada)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        porta = sock.getsockname()[1]
+    return f"http://127.0.0.1:{porta}"
+
+
+@pytest.fixture
+def sockets_encerrados():
+    """
+    Fábrica de sockets já conectados cujo servidor os fechou: simulam
+    conexões ociosas expiradas. sockets_encerrados(3) -> lista de sockets
+    """
+    criados = []
+
+    def criar(quantidade):
+        with socket.socket() as escuta:
+            escuta.bind(('127.0.0.1', 0))
+            escuta.listen(quantidade)
+            for _ in range(quantidade):
+                sock = socket.create_connection(escuta.getsockname(), timeout=5)
+                aceita, _ = escuta.accept()
+                aceita.close()
+                criados.append(sock)
+        return criados[-quantidade:]
+
+    yield criar
+    for sock in criados:
+        sock.close()
+
+
+@pytest.fixture
+def armazenamento(tmp_path):
+    """Armazenamento local em um diretório temporário"""
+    from camara.armazenamento import ArmazenamentoLocal
+    return ArmazenamentoLocal(str(tmp_path), 'bucket')
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from camara.aio import PoolConexoesAsync, _Conexao, get_com_fallback
+
+
+def test_conexoes_ociosas_expiradas_repetem_em_conexao_nova(servidor, sockets_encerrados):
+    alvo = servidor()
+
+    async def executar():
+        async with PoolConexoesAsync(alvo.url, timeout=5) as pool:
+            for sock in sockets_encerrados(3):
+                pool._ociosas.append(_Conexao(*await asyncio.open_connection(sock=sock)))
+            resposta = await pool.get('/x')
+            return resposta, pool.conexoes_abertas, len(pool._ociosas)
+
+    resposta, abertas, ociosas = asyncio.run(executar())
+    assert resposta.status == 200
+    assert alvo.requisicoes == 1
+    assert abertas == 1
+    # As demais ociosas foram descartadas; só a conexão nova voltou ao pool
+    assert ociosas == 1
+
+
+def test_fallback_para_espelho_em_5xx(servidor):
+    principal = servidor(status=503)
+    espelho = servidor(corpo=b'<espelho/>')
+
+    async def executar():
+        pools = [PoolConexoesAsync(principal.url, timeout=5), PoolConexoesAsync(espelho.url, timeout=5)]
+        return await get_com_fallback(pools, '/x')
+
+    resposta = asyncio.run(executar())
+    assert resposta.status == 200
+    assert resposta.corpo == b'<espelho/>'
+    assert principal.requisicoes == 1
+
+
+def test_fallback_para_espelho_em_falha_de_rede(servidor, porta_fechada):
+    espelho = servidor()
+
+    async def executar():
+        pools = [PoolConexoesAsync(porta_fechada, timeout=5), PoolConexoesAsync(espelho.url, timeout=5)]
+        return await get_com_fallback(pools, '/x')
+
+    assert asyncio.run(executar()).status == 200
+
+
+def test_ultimo_host_com_5xx_devolve_resposta(servidor, porta_fechada):
+    principal = servidor(status=503)
+
+    async def executar(urls):
+        return await get_com_fallback([PoolConexoesAsync(url, timeout=5) for url in urls], '/x')
+
+    assert asyncio.run(executar([porta_fechada, principal.url])).status == 503
+    with pytest.raises(OSError):
+        asyncio.run(executar([principal.url, porta_fechada]))
@@ -0,0 +1,94 @@
+import hashlib
+from types import SimpleNamespace
+
+from camara.cache import CacheValidadores, chave_cache
+from camara.cliente import ClienteCamara
+
+KEY = 'x/_cache/validadores.json'
+
+
+def _resposta(status=200, corpo=b'<ok/>', etag='"v1"', last_modified=None):
+    headers = {'etag': etag, 'last-modified': last_modified}
+    return SimpleNamespace(status=status, headers=headers, sha256=hashlib.sha256(corpo).hexdigest())
+
+
+def test_chave_independe_da_ordem_dos_parametros():
+    assert chave_cache('/d', {'b': '2', 'a': '1'}) == chave_cache('/d', {'a': '1', 'b': '2'}) == '/d?a=1&b=2'
+    assert chave_cache('/d') == '/d'
+
+
+def test_headers_condicionais_usam_os_validadores_registrados(armazenamento):
+    cache = CacheValidadores(armazenamento, KEY)
+    assert cache.headers_condicionais('/d') == {}
+
+    cache.atualizar('/d', _resposta(etag='"v1"', last_modified='Mon, 05 Oct 2026 10:00:00 GMT'))
+
+    assert cache.headers_condicionais('/d') == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 05 Oct 2026 10:00:00 GMT'
+    }
+
+
+def test_verificar_304_ou_mesmo_hash(armazenamento):
+    cache = CacheValidadores(armazenamento, KEY)
+    # Sem entrada, nem um 304 é considerado inalterado
+    assert not cache.verificar('/d', _resposta(status=304))
+
+    cache.atualizar('/d', _resposta(corpo=b'<a/>'))
+
+    assert cache.verificar('/d', _resposta(status=304))
+    assert cache.verificar('/d', _resposta(corpo=b'<a/>', etag=None))
+    assert not cache.verificar('/d', _resposta(corpo=b'<b/>'))
+    assert not cache.verificar('/d', _resposta(status=500, corpo=b'<a/>'))
+    assert cache.resumo() == {'inalterados': 2, 'alterados': 3}
+
+
+def test_salvar_persiste_so_validadores(armazenamento):
+    cache = CacheValidadores(armazenamento, KEY)
+    cache.carregar_registros({'/d': {'id': 1}})
+    cache.atualizar('/d', _resposta(corpo=b'<a/>'))
+    assert cache.registro('/d') == {'id': 1}
+    assert cache.salvar()
+
+    recarregado = CacheValidadores(armazenamento, KEY)
+    assert recarregado.registro('/d') is None
+    assert recarregado.headers_condicionais('/d') == {'If-None-Match': '"v1"'}
+    assert recarregado.verificar('/d', _resposta(corpo=b'<a/>'))
+    assert b'{"id"' not in armazenamento.ler(KEY)
+
+
+def test_outros_parametros_de_saida_descartam_o_cache(armazenamento):
+    cache = CacheValidadores(armazenamento, KEY)
+    cache.configurar_saida({'formato': 'json', 'limite': None})
+    cache.atualizar('/d', _resposta(corpo=b'<a/>'))
+    cache.salvar()
+
+    mesmo = CacheValidadores(armazenamento, KEY)
+    mesmo.configurar_saida({'formato': 'json', 'limite': None})
+    assert mesmo.verificar('/d', _resposta(corpo=b'<a/>'))
+    # Sem alterações, os mesmos parâmetros não regravam o cache
+    assert not mesmo._alterado
+
+    outro = CacheValidadores(armazenamento, KEY)
+    outro.configurar_saida({'formato': 'parquet', 'limite': None})
+    assert outro.headers_condicionais('/d') == {}
+    assert not outro.verificar('/d', _resposta(corpo=b'<a/>'))
+
+
+def test_salvar_sem_alteracoes_nao_grava(armazenamento):
+    assert CacheValidadores(armazenamento, KEY).salvar()
+    assert armazenamento.ler(KEY) is None
+
+
+def test_cache_corrompido_e_ignorado(armazenamento):
+    armazenamento.gravar(KEY, b'{corrompido')
+    assert CacheValidadores(armazenamento, KEY).registro('/d') is None
+
+
+def test_resposta_do_cliente_com_mesmo_corpo_e_inalterada(servidor, armazenamento):
+    alvo = servidor(corpo=b'<deputados/>')
+    cliente = ClienteCamara(hosts=[alvo.url], timeout=5)
+    cache = CacheValidadores(armazenamento, KEY)
+
+    cache.atualizar('/d', cliente.get('/d'))
+
+    assert cache.verificar('/d', cliente.get('/d'))
@@ -0,0 +1,61 @@
+from camara.checkpoint import CheckpointColeta, separar_concluidos
+from camara.incremental import CAMPO_HASH
+
+
+def _deputado(ide, hash_registro='h'):
+    return {'ideCadastro': ide, CAMPO_HASH: hash_registro}
+
+
+def _resultado(ide, hash_registro='h'):
+    return {**_deputado(ide, hash_registro), 'detalhes_success': True}
+
+
+def test_separar_concluidos_retoma_so_registros_com_mesmo_hash():
+    a_buscar = [_deputado('1'), _deputado('2', 'novo'), _deputado('3')]
+    concluidos = {'1': _resultado('1'), '2': _resultado('2', 'antigo')}
+
+    restantes, retomados = separar_concluidos(a_buscar, concluidos)
+
+    assert [deputado['ideCadastro'] for deputado in restantes] == ['2', '3']
+    assert retomados == [concluidos['1']]
+
+
+def test_separar_concluidos_sem_checkpoint():
+    a_buscar = [_deputado('1'), _deputado('2')]
+
+    assert separar_concluidos(a_buscar, {}) == (a_buscar, [])
+
+
+def test_partes_gravadas_sao_retomadas_por_outra_execucao(armazenamento):
+    relogio = [0.0]
+    checkpoint = CheckpointColeta(armazenamento, 'x/_checkpoint', intervalo_s=30, max_pendentes=2,
+                                  relogio=lambda: relogio[0])
+    checkpoint.registrar(_resultado('1'))
+    checkpoint.registrar({**_resultado('9'), 'detalhes_success': False})
+    assert checkpoint.gravados == 0
+    checkpoint.registrar(_resultado('2'))
+    assert checkpoint.gravados == 2
+    relogio[0] = 31.0
+    checkpoint.registrar(_resultado('3'))
+
+    retomada = CheckpointColeta(armazenamento, 'x/_checkpoint')
+    concluidos = retomada.carregar()
+    restantes, retomados = separar_concluidos([_deputado(ide) for ide in '1234'], concluidos)
+
+    assert sorted(concluidos) == ['1', '2', '3']
+    assert [deputado['ideCadastro'] for deputado in restantes] == ['4']
+    assert len(retomados) == 3
+    # Novas partes continuam a numeração das já gravadas
+    assert retomada.resumo()['partes'] == 2
+
+
+def test_limpar_com_falha_na_remocao_nao_levanta(armazenamento):
+    checkpoint = CheckpointColeta(armazenamento, 'x/_checkpoint', max_pendentes=1)
+    checkpoint.registrar(_resultado('1'))
+
+    def negar(key):
+        raise PermissionError('AccessDenied')
+    armazenamento.remover = negar
+
+    assert checkpoint.limpar() is False
+    assert checkpoint.carregar()
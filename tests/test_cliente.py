@@ -0,0 +1,91 @@
+import http.client
+import threading
+
+import pytest
+
+from camara.cliente import ClienteCamara, ErroConexao
+
+
+def test_fallback_para_espelho_em_5xx(servidor):
+    principal = servidor(status=503)
+    espelho = servidor(corpo=b'<espelho/>')
+    cliente = ClienteCamara(hosts=[principal.url, espelho.url], timeout=5)
+
+    with cliente.abrir('/x') as resposta:
+        assert resposta.status == 200
+        assert resposta.ler() == b'<espelho/>'
+    assert principal.requisicoes == 1
+
+
+def test_5xx_seguido_de_falha_de_rede_levanta_erro(servidor, porta_fechada):
+    principal = servidor(status=503)
+    cliente = ClienteCamara(hosts=[principal.url, porta_fechada], timeout=5)
+
+    # A resposta 503 do principal já foi fechada: não pode ser devolvida
+    with pytest.raises(ErroConexao) as erro:
+        cliente.abrir('/x')
+    assert 'HTTP 503' in str(erro.value)
+
+
+def test_ultimo_host_com_5xx_devolve_resposta_legivel(servidor):
+    principal = servidor(status=503)
+    espelho = servidor(status=502, corpo=b'<erro/>')
+    cliente = ClienteCamara(hosts=[principal.url, espelho.url], timeout=5)
+
+    with cliente.abrir('/x') as resposta:
+        assert resposta.status == 502
+        assert resposta.ler() == b'<erro/>'
+
+
+def test_4xx_nao_passa_para_espelho(servidor):
+    principal = servidor(status=404)
+    espelho = servidor()
+    cliente = ClienteCamara(hosts=[principal.url, espelho.url], timeout=5)
+
+    with cliente.abrir('/x') as resposta:
+        assert resposta.status == 404
+    assert espelho.requisicoes == 0
+
+
+def test_conexoes_ociosas_expiradas_repetem_em_conexao_nova(servidor, sockets_encerrados):
+    alvo = servidor()
+    cliente = ClienteCamara(hosts=[alvo.url], timeout=5)
+    pool = cliente._pool(alvo.url)
+    for sock in sockets_encerrados(3):
+        conexao = http.client.HTTPConnection(*sock.getpeername(), timeout=5)
+        conexao.sock = sock
+        pool.ociosas.put(conexao)
+
+    resposta = cliente.get('/x')
+
+    assert resposta.status == 200
+    assert alvo.requisicoes == 1
+    # As demais ociosas foram descartadas; só a conexão nova voltou ao pool
+    assert pool.ociosas.qsize() == 1
+
+
+def test_sem_vaga_no_pool_levanta_erro_no_timeout(servidor):
+    alvo = servidor()
+    cliente = ClienteCamara(hosts=[alvo.url], max_conexoes_por_host=1, timeout=0.2)
+    ocupada = cliente.abrir('/x')
+    try:
+        with pytest.raises(ErroConexao):
+            cliente.abrir('/x')
+    finally:
+        ocupada.fechar()
+
+    # Vaga devolvida: nova requisição volta a funcionar
+    assert cliente.get('/x').status == 200
+
+
+def test_conexao_volta_ao_pool_depois_de_lida(servidor):
+    alvo = servidor()
+    cliente = ClienteCamara(hosts=[alvo.url], timeout=5)
+    threads = [threading.Thread(target=cliente.get, args=('/x',)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert alvo.requisicoes == 4
+    assert 1 <= cliente._pool(alvo.url).ociosas.qsize() <= 4
@@ -0,0 +1,88 @@
+import asyncio
+
+from camara.hedge import PoliticaHedge, com_hedge
+
+
+def _politica(latencia_s=0.02, **kwargs):
+    politica = PoliticaHedge(**{'percentil': 50, 'orcamento': 1.0, 'min_amostras': 1, 'minimo_s': 0.01, **kwargs})
+    politica.registrar_latencia(latencia_s)
+    return politica
+
+
+def _resposta(resultado, atraso_s, canceladas=None):
+    async def executar():
+        try:
+            await asyncio.sleep(atraso_s)
+        except asyncio.CancelledError:
+            if canceladas is not None:
+                canceladas.append(resultado)
+            raise
+        return resultado
+    return executar
+
+
+def _aceitar(resultado):
+    return resultado != 'erro'
+
+
+def test_espelho_vence_principal_lento_que_e_cancelado():
+    politica = _politica()
+    canceladas = []
+
+    resultado = asyncio.run(com_hedge(_resposta('principal', 1.0, canceladas), _resposta('espelho', 0.0),
+                                      politica, _aceitar))
+
+    assert resultado == ('espelho', True)
+    assert canceladas == ['principal']
+    assert (politica.hedges, politica.vitorias_espelho, politica.vitorias_principal) == (1, 1, 0)
+
+
+def test_principal_rapido_nao_dispara_copia():
+    politica = _politica(latencia_s=0.5)
+    chamadas = []
+
+    async def espelho():
+        chamadas.append('espelho')
+        return 'espelho'
+
+    resultado = asyncio.run(com_hedge(_resposta('principal', 0.0), espelho, politica, _aceitar))
+
+    assert resultado == ('principal', False)
+    assert chamadas == []
+    assert politica.hedges == 0
+
+
+def test_primeira_resposta_inaceitavel_aguarda_a_outra():
+    politica = _politica()
+
+    resultado = asyncio.run(com_hedge(_resposta('principal', 0.1), _resposta('erro', 0.0), politica, _aceitar))
+
+    assert resultado == ('principal', False)
+    assert politica.vitorias_principal == 1
+
+
+def test_sem_resposta_aceitavel_fica_a_do_principal():
+    politica = _politica()
+
+    resultado = asyncio.run(com_hedge(_resposta('erro', 0.1), _resposta('erro', 0.0), politica, lambda r: False))
+
+    assert resultado == ('erro', False)
+
+
+def test_orcamento_esgotado_espera_o_principal():
+    politica = _politica(orcamento=0.0)
+
+    resultado = asyncio.run(com_hedge(_resposta('principal', 0.1), _resposta('espelho', 0.0), politica, _aceitar))
+
+    assert resultado == ('principal', False)
+    assert politica.negados_orcamento == 1
+
+
+def test_sem_amostras_suficientes_nao_ha_hedge():
+    politica = PoliticaHedge(min_amostras=5, minimo_s=0.01)
+
+    resultado = asyncio.run(com_hedge(_resposta('principal', 0.1), _resposta('espelho', 0.0), politica, _aceitar))
+
+    assert resultado == ('principal', False)
+    assert politica.limiar() is None
+    assert len(politica.latencias) == 1
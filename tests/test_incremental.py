@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from camara.incremental import CAMPO_HASH, CAMPO_OBTIDO_EM, hash_registro, planejar_atualizacao
+
+AGORA = datetime(2024, 5, 10, 12, 0, 0)
+
+
+def _deputado(ide, nome='Fulano'):
+    return {'ideCadastro': ide, 'nome': nome}
+
+
+def _anterior(deputado, horas=1, sucesso=True, obtido_em=None):
+    return {
+        **deputado,
+        CAMPO_HASH: hash_registro(deputado),
+        CAMPO_OBTIDO_EM: obtido_em if obtido_em is not None else (AGORA - timedelta(hours=horas)).isoformat(),
+        'detalhes_success': sucesso,
+    }
+
+
+def test_planejar_atualizacao_separa_por_motivo():
+    deputados = [_deputado('1'), _deputado('2', 'Novo nome'), _deputado('3'), _deputado('4'), _deputado('5')]
+    anteriores = [
+        _anterior(_deputado('1')),
+        _anterior(_deputado('2')),
+        _anterior(_deputado('3'), horas=48),
+        _anterior(_deputado('4'), sucesso=False),
+        _anterior(_deputado('9')),
+    ]
+
+    a_buscar, reaproveitados, hashes, contagens = planejar_atualizacao(deputados, anteriores, 24, agora=AGORA)
+
+    assert [deputado['ideCadastro'] for deputado in a_buscar] == ['2', '3', '4', '5']
+    assert reaproveitados == [anteriores[0]]
+    assert hashes == {deputado['ideCadastro']: hash_registro(deputado) for deputado in deputados}
+    # Registro anterior com falha nos detalhes conta como novo; '9' saiu da lista
+    assert contagens == {'novos': 2, 'alterados': 1, 'expirados': 1, 'reaproveitados': 1, 'removidos': 1}
+
+
+def test_data_de_obtencao_do_parquet_ou_invalida():
+    deputados = [_deputado('1'), _deputado('2')]
+    anteriores = [
+        _anterior(_deputado('1'), obtido_em=AGORA - timedelta(hours=2)),
+        _anterior(_deputado('2'), obtido_em='?'),
+    ]
+
+    a_buscar, reaproveitados, _, contagens = planejar_atualizacao(deputados, anteriores, 24, agora=AGORA)
+
+    assert reaproveitados == [anteriores[0]]
+    assert a_buscar == [deputados[1]]
+    assert contagens['expirados'] == 1
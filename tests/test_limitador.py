@@ -0,0 +1,31 @@
+import pytest
+
+from camara.limitador import LimitadorTaxa, configuracao_ambiente
+
+
+@pytest.mark.parametrize('valor, esperado', [(None, None), ('', None), ('0', None), ('50', 50.0)])
+def test_taxa_do_ambiente(monkeypatch, valor, esperado):
+    monkeypatch.delenv('CAMARA_RAJADA', raising=False)
+    if valor is None:
+        monkeypatch.delenv('CAMARA_TAXA_MAX', raising=False)
+    else:
+        monkeypatch.setenv('CAMARA_TAXA_MAX', valor)
+    assert configuracao_ambiente() == (esperado, None)
+
+
+def test_so_espera_quem_passa_da_rajada():
+    relogio = [0.0]
+    limitador = LimitadorTaxa(taxa=2, rajada=2, relogio=lambda: relogio[0])
+
+    esperas = [limitador._reservar() for _ in range(4)]
+
+    assert esperas == [0.0, 0.0, 0.5, 1.0]
+    relogio[0] = 10.0
+    assert limitador._reservar() == 0.0
+    assert limitador.resumo()['esperas'] == 2
+
+
+def test_sem_taxa_nao_limita():
+    limitador = LimitadorTaxa(taxa=0)
+    assert limitador.taxa is None
+    assert all(limitador._reservar() == 0.0 for _ in range(100))
@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip('bson')
+
+from mongo_mflix import calcular_faixas  # noqa: E402
+
+
+class _Colecao:
+    """Coleção falsa: `$sample` devolve os _id dados, na ordem dada"""
+    name = 'movies'
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def aggregate(self, pipeline):
+        return [{'_id': valor} for valor in self.ids]
+
+
+def _na_faixa(valor, filtro):
+    """Avalia um filtro de faixa como o MongoDB: $lt/$gte só comparam o mesmo tipo"""
+    if '$or' in filtro:
+        return any(_na_faixa(valor, condicao) for condicao in filtro['$or'])
+    condicao = filtro['_id']
+    if '$not' in condicao:
+        return not isinstance(valor, int)
+    if not isinstance(valor, int):
+        return False
+    return valor < condicao.get('$lt', float('inf')) and valor >= condicao.get('$gte', float('-inf'))
+
+
+def test_faixas_cobrem_a_colecao_sem_sobreposicao():
+    faixas = calcular_faixas(_Colecao(list(range(999, -1, -1))), 4)
+
+    assert len(faixas) == 4
+    assert faixas[1] == {'_id': {'$gte': 250, '$lt': 500}}
+    assert faixas[-1] == {'_id': {'$gte': 750}}
+    # A primeira faixa também recebe os _id de outro tipo BSON
+    for valor in [-5, 0, 249, 250, 999, 10 ** 6, 'texto']:
+        assert sum(_na_faixa(valor, faixa) for faixa in faixas) == 1, valor
+
+
+def test_cortes_repetidos_sao_descartados():
+    faixas = calcular_faixas(_Colecao([1] * 50 + [2] * 50), 4)
+
+    assert faixas == [
+        {'$or': [{'_id': {'$lt': 1}}, {'_id': {'$not': {'$type': 'number'}}}]},
+        {'_id': {'$gte': 1, '$lt': 2}},
+        {'_id': {'$gte': 2}},
+    ]
+
+
+@pytest.mark.parametrize('ids, num_faixas', [
+    (list(range(100)), 1),
+    ([1, 'a', 2], 3),
+    ([b'x', b'y'], 2),
+])
+def test_sem_divisao_devolve_uma_faixa_com_a_colecao_inteira(ids, num_faixas):
+    assert calcular_faixas(_Colecao(ids), num_faixas) == [{}]
@@ -0,0 +1,121 @@
+from camara.resiliencia import ABERTO, FECHADO, MEIO_ABERTO, CircuitBreaker, PoliticaRetentativa, retentavel
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def _breaker(relogio, **kwargs):
+    return CircuitBreaker(**{'janela': 4, 'min_amostras': 4, 'limiar_falhas': 0.5, 'pausa_s': 5.0,
+                             'max_aberto_s': 20.0, 'relogio': relogio, **kwargs})
+
+
+def _abrir(breaker):
+    for falha in (True, False, True, True):
+        breaker.registrar(falha)
+
+
+def test_abre_so_com_amostras_suficientes_acima_do_limiar():
+    breaker = _breaker(Relogio())
+    for _ in range(3):
+        breaker.registrar(True)
+    assert breaker.estado == FECHADO
+    breaker.registrar(False)
+    assert breaker.estado == ABERTO
+    assert breaker.aberturas == 1
+
+
+def test_abaixo_do_limiar_continua_fechado():
+    breaker = _breaker(Relogio())
+    for falha in (True, False, False, False, True, False):
+        breaker.registrar(falha)
+    assert breaker.estado == FECHADO
+    assert breaker.permitir()
+
+
+def test_aberto_bloqueia_ate_a_pausa_e_libera_uma_sonda():
+    relogio = Relogio()
+    breaker = _breaker(relogio)
+    _abrir(breaker)
+
+    relogio.agora = 3.0
+    assert not breaker.permitir()
+    assert breaker.espera() == 2.0
+
+    relogio.agora = 5.0
+    assert breaker.permitir()
+    assert breaker.estado == MEIO_ABERTO
+    # Só uma sonda em voo no meio-aberto
+    assert not breaker.permitir()
+
+
+def test_sonda_com_sucesso_fecha_e_limpa_a_janela():
+    relogio = Relogio()
+    breaker = _breaker(relogio)
+    _abrir(breaker)
+    relogio.agora = 5.0
+    breaker.permitir()
+
+    breaker.registrar(False, enviado_em=5.0)
+
+    assert breaker.estado == FECHADO
+    assert len(breaker.janela) == 0
+    assert breaker.resumo() == {'estado': FECHADO, 'aberturas': 1, 'tempo_aberto_s': 5.0}
+
+
+def test_sonda_com_falha_reabre():
+    relogio = Relogio()
+    breaker = _breaker(relogio)
+    _abrir(breaker)
+    relogio.agora = 5.0
+    breaker.permitir()
+
+    breaker.registrar(True, enviado_em=5.0)
+
+    assert breaker.estado == ABERTO
+    assert breaker.aberturas == 2
+    assert not breaker.permitir()
+
+
+def test_respostas_anteriores_a_sonda_nao_decidem_o_meio_aberto():
+    relogio = Relogio()
+    breaker = _breaker(relogio)
+    _abrir(breaker)
+    # Resposta atrasada de uma requisição enviada antes da abertura
+    breaker.registrar(False)
+    assert breaker.estado == ABERTO
+
+    relogio.agora = 5.0
+    breaker.permitir()
+    breaker.registrar(False, enviado_em=1.0)
+    assert breaker.estado == MEIO_ABERTO
+
+
+def test_esgotado_soma_o_tempo_aberto_de_todas_as_aberturas():
+    relogio = Relogio()
+    breaker = _breaker(relogio)
+    _abrir(breaker)
+    relogio.agora = 15.0
+    breaker.permitir()
+    breaker.registrar(True, enviado_em=15.0)
+    assert not breaker.esgotado()
+
+    relogio.agora = 20.0
+    assert breaker.esgotado()
+
+
+def test_backoff_com_jitter_limitado_ao_teto():
+    politica = PoliticaRetentativa(base_s=0.5, maximo_s=2.0, aleatorio=lambda: 1.0)
+    assert [politica.atraso(tentativa) for tentativa in (1, 2, 3, 4)] == [0.5, 1.0, 2.0, 2.0]
+
+
+def test_retentavel_so_para_erros_transitorios():
+    assert retentavel({'error_type': 'url_error'})
+    assert retentavel({'error_type': 'http_error', 'detalhes_error': 'HTTP 503: Service Unavailable'})
+    assert not retentavel({'error_type': 'http_error', 'detalhes_error': 'HTTP 404: Not Found'})
+    assert not retentavel({'error_type': 'parse_error'})
+    assert not retentavel({'detalhes_success': True})
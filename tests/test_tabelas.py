@@ -0,0 +1,40 @@
+import copy
+
+from camara.tabelas import TABELAS_FILHAS, anexar_tabelas, separar_tabelas
+
+
+def _registro(ide, comissoes=0):
+    return {
+        'ideCadastro': ide,
+        'nome': f"Deputado {ide}",
+        'comissoes': [{'siglaComissao': f"C{i}", 'dataSaida': None} for i in range(comissoes)],
+        'periodos_exercicio': [{'dataInicio': '2023-02-01', 'dataFim': None}],
+        'liderancas': [],
+    }
+
+
+def test_separar_e_anexar_devolvem_os_registros_originais():
+    originais = [_registro('1', comissoes=2), _registro('2'), _registro('3', comissoes=1)]
+    registros = copy.deepcopy(originais)
+
+    tabelas = separar_tabelas(registros)
+
+    assert set(tabelas) == set(TABELAS_FILHAS)
+    assert all(set(registro) == {'ideCadastro', 'nome'} for registro in registros)
+    assert tabelas['comissoes'] == [
+        {'ideCadastro': '1', 'siglaComissao': 'C0', 'dataSaida': None},
+        {'ideCadastro': '1', 'siglaComissao': 'C1', 'dataSaida': None},
+        {'ideCadastro': '3', 'siglaComissao': 'C0', 'dataSaida': None},
+    ]
+    assert tabelas['liderancas'] == []
+
+    assert anexar_tabelas(registros, tabelas) == originais
+
+
+def test_anexar_nao_altera_as_linhas_das_tabelas():
+    tabelas = separar_tabelas([_registro('1', comissoes=1)])
+    linhas = copy.deepcopy(tabelas)
+
+    anexar_tabelas([{'ideCadastro': '1'}, {'ideCadastro': '9'}], tabelas)
+
+    assert tabelas == linhas